@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SuspicionRankingAnalyzer.fetch_data, full-width vs projected Arrow
+
+Writes a synthetic month of classified searches (5M rows by default, with
+the extra raw columns the real export carries) as local Parquet exports and
+runs the in-memory report pipeline - fetch, score, statistics, high-risk
+table - through the DuckDB storage backend twice:
+
+  legacy     c.* + to_dataframe() (every column, object / str dtypes)
+  projected  fetch_data(): needed_columns() + to_arrow(), categoricals
+
+Each mode runs in a fresh subprocess so its peak RSS is measured cleanly.
+Against BigQuery the projected path additionally reads through the Storage
+Read API; the column projection and dtype savings are the same.
+
+Usage:
+  python benchmark_fetch_data.py
+  python benchmark_fetch_data.py --rows 1000000 --data-dir local_data_bench
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+import numpy as np
+import pandas as pd
+
+from benchmark_suspicion_scoring import make_synthetic_searches
+
+MODES = ('legacy', 'projected')
+
+
+def write_month(data_dir: str, rows: int, seed: int = 0):
+    """Synthetic October2025_classified + org_name_rule_based_matches exports"""
+    rng = np.random.default_rng(seed)
+    searches = make_synthetic_searches(rows, seed)
+    participating = searches.pop('is_participating_agency')
+    # Raw export columns the report never reads
+    searches['search_id'] = np.arange(rows)
+    searches['search_time'] = pd.Timestamp('2025-10-01') + pd.to_timedelta(rng.integers(0, 31 * 86400, rows), unit='s')
+    searches['user_name'] = np.array([f'user{i:05d}' for i in range(20_000)], dtype=object)[rng.integers(0, 20_000, rows)]
+    searches['network_count'] = rng.integers(1, 4000, rows)
+    searches['device_count'] = rng.integers(1, 90_000, rows)
+    searches['time_frame'] = np.array(['1 hour', '1 day', '7 days', '30 days'], dtype=object)[rng.integers(0, 4, rows)]
+    searches['license_plate'] = np.array([f'{i:07X}' for i in range(500_000)], dtype=object)[rng.integers(0, 500_000, rows)]
+    searches['moderation'] = np.array(['Unmoderated', 'Approved', None], dtype=object)[rng.integers(0, 3, rows)]
+    searches['classification_confidence'] = rng.random(rows)
+    searches['classification_timestamp'] = pd.Timestamp('2025-11-01')
+
+    matches = searches[['org_name']].drop_duplicates().copy()
+    matches['is_participating_agency'] = participating.iloc[matches.index].fillna(False).astype(bool).to_numpy()
+    matches['matched_agency'] = matches['org_name'].str.upper()
+    matches['matched_state'] = np.array(['CO', 'TX', 'FL', 'GA', 'AZ'], dtype=object)[rng.integers(0, 5, len(matches))]
+    matches['matched_type'] = np.array(['police', 'sheriff'], dtype=object)[rng.integers(0, 2, len(matches))]
+
+    os.makedirs(os.path.join(data_dir, 'DurangoPD'), exist_ok=True)
+    os.makedirs(os.path.join(data_dir, 'FlockML'), exist_ok=True)
+    searches.to_parquet(os.path.join(data_dir, 'DurangoPD', 'October2025_classified.parquet'))
+    matches.to_parquet(os.path.join(data_dir, 'FlockML', 'org_name_rule_based_matches.parquet'))
+
+
+def run_mode(mode: str, data_dir: str) -> dict:
+    """Run the in-memory report pipeline once and measure it"""
+    from storage_backend import DuckDBClient
+    from suspicion_ranking_report import SuspicionRankingAnalyzer
+
+    analyzer = SuspicionRankingAnalyzer(client=DuckDBClient(data_dir, database=':memory:'))
+    start = time.perf_counter()
+    if mode == 'legacy':
+        df = analyzer.client.query(analyzer.source_query()).to_dataframe()
+    else:
+        df = analyzer.fetch_data()
+    fetch_seconds = time.perf_counter() - start
+    frame_mb = df.memory_usage(deep=True).sum() / 2**20
+
+    df = analyzer.analyze_data(df)
+    stats = analyzer.generate_summary_statistics(df)
+    high_risk = analyzer.get_high_risk_searches(df, min_score=analyzer.HIGH_RISK_MIN_SCORE)
+    return {
+        'columns': len(df.columns) - 2,
+        'fetch_seconds': fetch_seconds,
+        'total_seconds': time.perf_counter() - start,
+        'frame_mb': frame_mb,
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'stats': {key: float(value) for key, value in stats.items()},
+        'high_risk': high_risk.astype(str).values.tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SuspicionRankingAnalyzer.fetch_data')
+    parser.add_argument('--rows', type=int, default=5_000_000, help='Synthetic rows (default: 5M)')
+    parser.add_argument('--data-dir', help='Reuse / write exports here (default: temp dir)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)  # Subprocess entry point
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.data_dir)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        if not os.path.exists(os.path.join(data_dir, 'DurangoPD', 'October2025_classified.parquet')):
+            print(f'Writing {args.rows:,} synthetic rows to {data_dir}...')
+            write_month(data_dir, args.rows, args.seed)
+
+        results = {}
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--mode', mode, '--data-dir', data_dir],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output.splitlines()[-1])
+
+    legacy, projected = results['legacy'], results['projected']
+    assert legacy['stats'] == projected['stats'] and legacy['high_risk'] == projected['high_risk']
+    for mode in MODES:
+        r = results[mode]
+        print(f"{mode:<10} {r['columns']:>3} cols  fetch {r['fetch_seconds']:6.2f}s  "
+              f"total {r['total_seconds']:6.2f}s  frame {r['frame_mb']:7.0f} MB  peak RSS {r['peak_rss_mb']:7.0f} MB")
+    print(f"Wall time:  {legacy['total_seconds'] / projected['total_seconds']:.1f}x faster")
+    print(f"Peak RSS:   {legacy['peak_rss_mb'] / projected['peak_rss_mb']:.1f}x lower")
+    print('✓ Statistics and high-risk table identical')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+"""
+Deterministic Agency State Rules
+
+Local rule layer between OrgNameParser and the LLM classifier: resolves
+agency names that carry no state code but are recognizable from a keyword,
+acronym or place (federal agencies, state investigative bureaus,
+universities, transit police, tribal agencies, counties whose name exists
+in only one state) without a paid API call.
+
+Rules are phrases of one or more whole words, compiled into a token trie so
+a name is classified in one pass over its words, however many rules there
+are.
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple, List, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+# Words that, right after "federal", "national", "us" or "ice", make the
+# name a federal agency rather than a place ("Federal Way", "National City")
+FEDERAL_AGENCY_WORDS = (
+    'agency', 'agent', 'agents', 'bureau', 'police', 'officer', 'officers', 'marshal', 'marshals',
+    'service', 'task force', 'enforcement', 'investigations', 'attorney', 'attorneys', 'court',
+    'guard', 'park service', 'ero',
+)
+
+# (phrase, state, kind, city) - city is set when the rule pins the agency to
+# a place precise enough to geocode
+DEFAULT_RULES: List[Tuple[str, str, str, Optional[str]]] = [
+    # Federal and national agencies
+    *[(phrase, 'DC', 'federal', None) for phrase in (
+        'united states', 'usa', 'u s', 'postal', 'usps', 'fbi', 'atf', 'dea', 'ncmec', 'hsi', 'cbp',
+        'usms', 'secret service', 'border patrol', 'homeland security', 'dhs',
+        'transportation security administration', 'amtrak', 'inspector general', 'interpol',
+    )],
+    *[(f'{prefix} {word}', 'DC', 'federal', None)
+      for prefix in ('federal', 'national', 'us', 'ice') for word in FEDERAL_AGENCY_WORDS],
+
+    # Places whose names contain a federal keyword
+    ('national city', 'CA', 'city', 'National City'),
+    ('federal way', 'WA', 'city', 'Federal Way'),
+    ('federal heights', 'CO', 'city', 'Federal Heights'),
+
+    # State investigative bureaus and state-level agencies known by acronym
+    ('chp', 'CA', 'state_agency', None),
+    ('cbi', 'CO', 'state_agency', None),
+    ('fdle', 'FL', 'state_agency', None),
+    ('gbi', 'GA', 'state_agency', None),
+    ('kbi', 'KS', 'state_agency', None),
+    ('osbi', 'OK', 'state_agency', None),
+    ('sled', 'SC', 'state_agency', None),
+    ('tbi', 'TN', 'state_agency', None),
+    ('nysp', 'NY', 'state_agency', None),
+    ('njsp', 'NJ', 'state_agency', None),
+    ('txdps', 'TX', 'state_agency', None),
+    ('txdot', 'TX', 'state_agency', None),
+    ('cdot', 'CO', 'state_agency', None),
+    ('penndot', 'PA', 'state_agency', None),
+    ('caltrans', 'CA', 'state_agency', None),
+
+    # Big-city and county departments known by acronym
+    ('nypd', 'NY', 'city', 'New York'),
+    ('lapd', 'CA', 'city', 'Los Angeles'),
+    ('lasd', 'CA', 'county', 'Los Angeles'),
+
+    # Universities (campus police)
+    ('ucla', 'CA', 'university', 'Los Angeles'),
+    ('ucsd', 'CA', 'university', 'San Diego'),
+    ('ucsf', 'CA', 'university', 'San Francisco'),
+    ('uc berkeley', 'CA', 'university', 'Berkeley'),
+    ('uc davis', 'CA', 'university', 'Davis'),
+    ('stanford', 'CA', 'university', 'Stanford'),
+    ('harvard', 'MA', 'university', 'Cambridge'),
+    ('massachusetts institute of technology', 'MA', 'university', 'Cambridge'),
+    ('yale', 'CT', 'university', 'New Haven'),
+    ('princeton university', 'NJ', 'university', 'Princeton'),
+    ('rutgers', 'NJ', 'university', 'New Brunswick'),
+    ('duke university', 'NC', 'university', 'Durham'),
+    ('unc chapel hill', 'NC', 'university', 'Chapel Hill'),
+    ('purdue', 'IN', 'university', 'West Lafayette'),
+    ('clemson', 'SC', 'university', 'Clemson'),
+    ('auburn university', 'AL', 'university', 'Auburn'),
+    ('vanderbilt', 'TN', 'university', 'Nashville'),
+    ('emory', 'GA', 'university', 'Atlanta'),
+    ('uga', 'GA', 'university', 'Athens'),
+    ('lsu', 'LA', 'university', 'Baton Rouge'),
+    ('fsu', 'FL', 'university', 'Tallahassee'),
+    ('ucf', 'FL', 'university', 'Orlando'),
+    ('asu', 'AZ', 'university', 'Tempe'),
+    ('unm', 'NM', 'university', 'Albuquerque'),
+    ('unlv', 'NV', 'university', 'Las Vegas'),
+    ('utep', 'TX', 'university', 'El Paso'),
+    ('utsa', 'TX', 'university', 'San Antonio'),
+    ('byu', 'UT', 'university', 'Provo'),
+    ('cu boulder', 'CO', 'university', 'Boulder'),
+    ('fort lewis college', 'CO', 'university', 'Durango'),
+
+    # Transit police
+    ('bart', 'CA', 'transit', 'Oakland'),
+    ('marta', 'GA', 'transit', 'Atlanta'),
+    ('septa', 'PA', 'transit', 'Philadelphia'),
+    ('wmata', 'DC', 'transit', 'Washington'),
+    ('mbta', 'MA', 'transit', 'Boston'),
+    ('metra', 'IL', 'transit', 'Chicago'),
+    ('lirr', 'NY', 'transit', 'New York'),
+    ('metro north', 'NY', 'transit', 'New York'),
+    ('trimet', 'OR', 'transit', 'Portland'),
+    ('dallas area rapid transit', 'TX', 'transit', 'Dallas'),
+    ('rtd', 'CO', 'transit', 'Denver'),
+
+    # Tribal agencies
+    ('navajo nation', 'AZ', 'tribal', 'Window Rock'),
+    ('southern ute', 'CO', 'tribal', 'Ignacio'),
+    ('ute mountain ute', 'CO', 'tribal', 'Towaoc'),
+    ('jicarilla apache', 'NM', 'tribal', 'Dulce'),
+    ('mescalero apache', 'NM', 'tribal', 'Mescalero'),
+    ('white mountain apache', 'AZ', 'tribal', 'Whiteriver'),
+    ('hopi', 'AZ', 'tribal', 'Kykotsmovi Village'),
+    ('tohono o odham', 'AZ', 'tribal', 'Sells'),
+    ('gila river', 'AZ', 'tribal', 'Sacaton'),
+    ('salt river pima', 'AZ', 'tribal', 'Scottsdale'),
+    ('cherokee nation', 'OK', 'tribal', 'Tahlequah'),
+    ('eastern band of cherokee', 'NC', 'tribal', 'Cherokee'),
+    ('muscogee', 'OK', 'tribal', 'Okmulgee'),
+    ('chickasaw', 'OK', 'tribal', 'Ada'),
+    ('choctaw nation', 'OK', 'tribal', 'Durant'),
+    ('oglala sioux', 'SD', 'tribal', 'Pine Ridge'),
+    ('rosebud sioux', 'SD', 'tribal', 'Rosebud'),
+    ('blackfeet', 'MT', 'tribal', 'Browning'),
+    ('crow tribe', 'MT', 'tribal', 'Crow Agency'),
+    ('lummi', 'WA', 'tribal', 'Bellingham'),
+    ('tulalip', 'WA', 'tribal', 'Tulalip'),
+    ('puyallup tribe', 'WA', 'tribal', 'Tacoma'),
+    ('menominee tribal', 'WI', 'tribal', 'Keshena'),
+]
+
+# Census place suffixes treated as county equivalents
+COUNTY_SUFFIXES = ('county', 'parish', 'borough', 'census area', 'municipality')
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+# Specific rules (which locate the agency) beat the catch-all federal words
+_KIND_PRIORITY = {'federal': 0}
+
+
+def tokenize(name: str) -> List[str]:
+    """Lowercase words of a name; punctuation splits words ("O'odham" -> "o", "odham")."""
+    return _NON_WORD.sub(' ', name.lower()).split()
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    """State resolved by a local rule."""
+    state: str
+    kind: str  # federal, city, county, state_agency, university, transit, tribal
+    phrase: str
+    city: Optional[str] = None
+
+
+class AgencyRuleClassifier:
+    """
+    Token-trie classifier over a table of (phrase, state, kind, city) rules.
+
+    Every word position of a name is walked down the trie, so all rule
+    phrases are matched in one pass. When several rules match, the longest
+    (in words) non-federal phrase wins (a transit or county rule says more about where
+    the agency is than "federal" does); if equally good matches disagree on
+    the state the name is left for the LLM.
+
+    Results are remembered per name, so stats count each distinct name
+    once however many callers (run_geocoding, LLMStateClassifier) ask.
+    """
+
+    _END = ''  # Trie key holding the rule payload at a phrase's last word
+
+    def __init__(self, rules: Iterable[Tuple[str, str, str, Optional[str]]] = DEFAULT_RULES):
+        """
+        Compile the rule table.
+
+        Args:
+            rules: (phrase, state, kind, city) tuples
+        """
+        self._trie: Dict = {}
+        self._results: Dict[str, Optional[RuleMatch]] = {}
+        self.rule_count = 0
+        for phrase, state, kind, city in rules:
+            self.add_rule(phrase, state, kind, city)
+        self.stats = {'matched': 0, 'unmatched': 0, 'ambiguous': 0}
+
+    def add_rule(self, phrase: str, state: str, kind: str, city: Optional[str] = None) -> None:
+        """Add one rule; a later rule for the same phrase replaces the earlier one."""
+        words = tokenize(phrase)
+        if not words:
+            return
+        node = self._trie
+        for word in words:
+            node = node.setdefault(word, {})
+        if self._END not in node:
+            self.rule_count += 1
+        self._results.clear()
+        node[self._END] = RuleMatch(state=state, kind=kind, phrase=' '.join(words), city=city)
+
+    def add_unique_counties(self, gazetteer) -> int:
+        """
+        Add a rule for every county name that exists in exactly one state.
+
+        Args:
+            gazetteer: GazetteerIndex loaded with a Census counties file
+
+        Returns:
+            Number of county rules added
+        """
+        states_by_county: Dict[str, set] = {}
+        for key in gazetteer.keys:
+            state, place = key.split('|', 1)
+            if place.endswith(COUNTY_SUFFIXES):
+                states_by_county.setdefault(place, set()).add(state)
+
+        added = 0
+        for place, states in states_by_county.items():
+            if len(states) == 1:
+                self.add_rule(place, next(iter(states)), 'county')
+                added += 1
+        logger.info(f'Added {added} unique county rules ({len(states_by_county) - added} ambiguous)')
+        return added
+
+    def matches(self, org_name: str) -> List[RuleMatch]:
+        """Every rule phrase found in the name."""
+        words = tokenize(org_name)
+        found = []
+        for start in range(len(words)):
+            node = self._trie
+            for word in words[start:]:
+                node = node.get(word)
+                if node is None:
+                    break
+                if self._END in node:
+                    found.append(node[self._END])
+        return found
+
+    def classify(self, org_name: str) -> Optional[RuleMatch]:
+        """
+        Resolve a name to a state, or None if no rule (or conflicting rules) match.
+
+        Example: "Fort Lewis College Police" -> RuleMatch('CO', 'university', ...)
+        """
+        if org_name not in self._results:
+            self._results[org_name] = self._classify(org_name)
+        return self._results[org_name]
+
+    def _classify(self, org_name: str) -> Optional[RuleMatch]:
+        found = self.matches(org_name)
+        if not found:
+            self.stats['unmatched'] += 1
+            return None
+
+        def rank(match: RuleMatch) -> Tuple[int, int]:
+            return _KIND_PRIORITY.get(match.kind, 1), match.phrase.count(' ') + 1
+
+        best_rank = max(rank(match) for match in found)
+        best = [match for match in found if rank(match) == best_rank]
+        if len({match.state for match in best}) > 1:
+            logger.debug(f'Conflicting rules for {org_name}: {[m.phrase for m in best]}')
+            self.stats['ambiguous'] += 1
+            return None
+
+        self.stats['matched'] += 1
+        return best[0]
+
+    def classify_many(self, org_names: Iterable[str]) -> Dict[str, Optional[RuleMatch]]:
+        """Classify each distinct name once."""
+        return {org_name: self.classify(org_name) for org_name in dict.fromkeys(org_names)}
@@ -0,0 +1,239 @@
+"""
+Detailed Export for the Suspicion Report
+
+Writes the per-search detailed data either as CSV (one file) or as a
+compressed Parquet dataset: a directory of zstd Parquet files with
+dictionary-encoded columns, optionally split into hive-style partitions
+(matched_state=CO/, suspicion_level=High%20Suspicion/) so downstream tools
+and the map front end can read just the slice they need:
+
+    pd.read_parquet('report_detailed_data', filters=[('matched_state', '=', 'CO')])
+    SELECT * FROM read_parquet('report_detailed_data/*/*.parquet', hive_partitioning = true)
+
+Batches are appended with write(), so streaming runs never hold the whole
+month. Each Parquet file is staged next to its published path; on close()
+a partition whose rows are unchanged since the last run (same row count
+and order-independent content fingerprint, recorded in _manifest.json)
+keeps its published file untouched, changed ones are replaced atomically
+and partitions that no longer have rows are removed. The fingerprint is
+only known once every batch is in, so unchanged partitions are still
+encoded to their staged file; what a rerun skips is the publish (the
+published file, its mtime and anything syncing it stay as they were).
+
+Usage:
+    with DetailedExport('report_detailed_data', columns, fmt='parquet', partition_by='matched_state') as export:
+        for batch in batches:
+            export.write(batch)
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'parquet')
+PARTITIONS = ('matched_state', 'suspicion_level')
+# Directory value for NULL partition keys (what Hive, Spark and pyarrow use)
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+PART_FILE = 'part-0.parquet'
+MANIFEST_FILE = '_manifest.json'
+
+
+class DetailedExport:
+    """CSV file or Parquet dataset of scored searches (see module docstring)."""
+
+    def __init__(self, path: str, columns: List[str], fmt: str = 'csv',
+                 partition_by: Optional[str] = None, spec=None, compression: str = 'zstd'):
+        """
+        Args:
+            path: CSV file, or Parquet dataset directory
+            columns: Columns to export, in order
+            fmt: 'csv' or 'parquet'
+            partition_by: 'matched_state' or 'suspicion_level' (Parquet only)
+            spec: ScoringSpec that names the suspicion levels (required for
+                  partition_by='suspicion_level')
+            compression: Parquet codec
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f'Unknown export format {fmt!r} (expected one of {FORMATS})')
+        if partition_by is not None:
+            if fmt != 'parquet':
+                raise ValueError('Partitioned export requires fmt="parquet"')
+            if partition_by not in PARTITIONS:
+                raise ValueError(f'Unknown partition column {partition_by!r} (expected one of {PARTITIONS})')
+            if partition_by == 'suspicion_level' and spec is None:
+                raise ValueError('partition_by="suspicion_level" needs the scoring spec')
+        self.path = path
+        self.columns = list(columns)
+        self.fmt = fmt
+        self.partition_by = partition_by
+        self.spec = spec
+        self.compression = compression
+        self.rows = 0
+        self._schema = None
+        # Partition directory ('' when unpartitioned) -> open writer, row count, fingerprint
+        self._writers: Dict[str, object] = {}
+        self._row_counts: Dict[str, int] = {}
+        self._fingerprints: Dict[str, int] = {}
+
+    def __enter__(self) -> 'DetailedExport':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    # -- Writing ------------------------------------------------------------
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append one batch of scored searches."""
+        if self.fmt == 'csv':
+            df[self.columns].to_csv(self.path, mode='w' if self.rows == 0 else 'a',
+                                    header=self.rows == 0, index=False)
+        elif self.partition_by is None:
+            self._write_partition('', df[self.columns])
+        else:
+            keys = self._partition_keys(df)
+            file_columns = [column for column in self.columns if column != self.partition_by]
+            for key, positions in keys.groupby(keys, dropna=False, sort=True).indices.items():
+                value = NULL_PARTITION if pd.isna(key) else quote(str(key), safe='')
+                self._write_partition(f'{self.partition_by}={value}', df[file_columns].iloc[positions])
+        self.rows += len(df)
+
+    def _partition_keys(self, df: pd.DataFrame) -> pd.Series:
+        if self.partition_by == 'suspicion_level':
+            scores = df['suspicion_score']
+            levels = {score: self.spec.level(score) for score in scores.unique()}
+            return scores.map(levels).astype(object)
+        return df[self.partition_by].astype(object)
+
+    def _write_partition(self, directory: str, df: pd.DataFrame) -> None:
+        import pyarrow.parquet as pq
+
+        table = self._to_arrow(df)
+        writer = self._writers.get(directory)
+        if writer is None:
+            os.makedirs(os.path.join(self.path, directory), exist_ok=True)
+            writer = pq.ParquetWriter(self._staged_path(directory), self._schema,
+                                      compression=self.compression, use_dictionary=True)
+            self._writers[directory] = writer
+            self._row_counts[directory] = 0
+            self._fingerprints[directory] = 0
+        writer.write_table(table)
+        self._row_counts[directory] += len(df)
+        # Sum of row hashes mod 2**64: independent of row order and batch
+        # boundaries (numpy wraps the batch sum; the running total is an int)
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        self._fingerprints[directory] = (self._fingerprints[directory] + int(hashes.sum(dtype=np.uint64))) % 2**64
+
+    def _to_arrow(self, df: pd.DataFrame):
+        """Batch as a pyarrow Table with the dataset's fixed schema."""
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+        if self._schema is None:
+            # Categoricals are plain strings in the file (Parquet dictionary-
+            # encodes them anyway); batch-local dictionaries would make every
+            # batch's schema different
+            fields = []
+            for field in table.schema:
+                kind = field.type
+                if pa.types.is_dictionary(kind):
+                    kind = kind.value_type
+                if pa.types.is_large_string(kind) or pa.types.is_null(kind):
+                    kind = pa.string()
+                fields.append(pa.field(field.name, kind))
+            self._schema = pa.schema(fields)
+        return table.cast(self._schema)
+
+    def _staged_path(self, directory: str) -> str:
+        # Dot prefix: pyarrow and DuckDB globs skip it while it is written
+        return os.path.join(self.path, directory, f'.{PART_FILE}.tmp')
+
+    # -- Publishing ---------------------------------------------------------
+
+    def _settings(self) -> Dict:
+        return {'columns': self.columns, 'partition_by': self.partition_by, 'compression': self.compression}
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.path, MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if manifest.get('settings') == self._settings() else {}
+
+    def close(self) -> Dict[str, int]:
+        """
+        Publish the export.
+
+        Returns:
+            Counts of Parquet partitions written, left unchanged and removed
+            (all zero for CSV)
+        """
+        counts = {'written': 0, 'unchanged': 0, 'removed': 0}
+        if self.fmt == 'csv':
+            if self.rows == 0:
+                pd.DataFrame(columns=self.columns).to_csv(self.path, index=False)
+            logger.info(f'Detailed data saved to {self.path}')
+            return counts
+
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        previous = self._read_manifest().get('partitions', {})
+        partitions = {}
+        for directory in sorted(self._row_counts):
+            entry = {'rows': self._row_counts[directory], 'fingerprint': f'{self._fingerprints[directory]:016x}'}
+            published = os.path.join(self.path, directory, PART_FILE)
+            staged = self._staged_path(directory)
+            if previous.get(directory) == entry and os.path.exists(published):
+                os.remove(staged)
+                counts['unchanged'] += 1
+            else:
+                os.replace(staged, published)
+                counts['written'] += 1
+            partitions[directory] = entry
+
+        for directory in self._published_partitions():
+            if directory not in partitions:
+                os.remove(os.path.join(self.path, directory, PART_FILE))
+                if directory and not os.listdir(os.path.join(self.path, directory)):
+                    os.rmdir(os.path.join(self.path, directory))
+                counts['removed'] += 1
+
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, MANIFEST_FILE), 'w') as f:
+            json.dump({'settings': self._settings(), 'rows': self.rows, 'partitions': partitions}, f, indent=2)
+        logger.info(
+            f"Detailed data saved to {self.path}/ ({counts['written']} partitions written, "
+            f"{counts['unchanged']} unchanged, {counts['removed']} removed)"
+        )
+        return counts
+
+    def _published_partitions(self) -> List[str]:
+        """Partition directories ('' for the top level) holding a published file."""
+        if not os.path.isdir(self.path):
+            return []
+        found = [''] if os.path.exists(os.path.join(self.path, PART_FILE)) else []
+        for name in sorted(os.listdir(self.path)):
+            if '=' in name and os.path.exists(os.path.join(self.path, name, PART_FILE)):
+                found.append(name)
+        return found
+
+    def abort(self) -> None:
+        """Drop staged files; the published export is left as it was."""
+        for directory, writer in self._writers.items():
+            writer.close()
+            staged = self._staged_path(directory)
+            if os.path.exists(staged):
+                os.remove(staged)
+        self._writers.clear()
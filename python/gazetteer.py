@@ -0,0 +1,289 @@
+"""
+Offline Place Gazetteer Index
+
+Compact, array-backed lookup of US place/county coordinates built from
+Census Bureau Gazetteer files, used to geocode agencies without a
+network round trip.
+
+Source files (tab-separated, one row per place):
+    https://www.census.gov/geographies/reference-files/time-series/geo/gazetteer-files.html
+    e.g. 2023_Gaz_place_national.txt, 2023_Gaz_counties_national.txt
+
+Required columns: USPS, NAME, INTPTLAT, INTPTLONG
+"""
+
+import csv
+import re
+import bisect
+import logging
+from array import array
+from typing import Optional, Tuple, List, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+# Legal/statistical area descriptions appended to Census place names
+# ("Houston city", "Amberley village", "Aspen Park CDP")
+LSAD_SUFFIXES = (
+    'city and borough', 'consolidated government', 'unified government',
+    'metropolitan government', 'urban county', 'city', 'town', 'village',
+    'borough', 'township', 'municipality', 'cdp', 'comunidad', 'zona urbana',
+)
+
+_LSAD_PATTERN = re.compile(
+    r'\s+(?:' + '|'.join(re.escape(s) for s in LSAD_SUFFIXES) + r')$', re.IGNORECASE
+)
+_PUNCTUATION = re.compile(r"[.,'()]")
+
+
+def strip_lsad(name: str) -> str:
+    """
+    Remove the trailing Census LSAD description from a place name.
+
+    Example: "Kansas City city" -> "Kansas City"
+    """
+    return _LSAD_PATTERN.sub('', name.strip())
+
+
+def normalize_place(name: str) -> str:
+    """
+    Normalize a place name for index keys.
+
+    Lowercases, drops punctuation, expands "st" to "saint" and collapses
+    whitespace.
+
+    Example: "Bay St. Louis" -> "bay saint louis"
+    """
+    name = _PUNCTUATION.sub(' ', name.lower())
+    return ' '.join('saint' if word == 'st' else word for word in name.split())
+
+
+class GazetteerIndex:
+    """
+    Sorted, array-backed (state, place) -> coordinate index.
+
+    Keys are "ST|normalized place" strings kept in one sorted list, with
+    coordinates in parallel float arrays, so exact lookups are a bisect,
+    state slices and prefix ranges are contiguous, and memory stays at a
+    few bytes per place beyond the key string itself.
+
+    Fuzzy lookups use a trigram inverted index (built on first use) whose
+    posting lists are sorted key positions, so candidates are restricted to
+    one state with a bisect per trigram and then verified by edit distance.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, float, float]]):
+        """
+        Build the index.
+
+        Args:
+            entries: (state, place name, latitude, longitude) tuples. When two
+                     entries normalize to the same key the first one wins.
+        """
+        rows: Dict[str, Tuple[str, float, float]] = {}
+        for state, name, lat, lon in entries:
+            key = f'{state.upper()}|{normalize_place(name)}'
+            if key not in rows:
+                rows[key] = (name, lat, lon)
+
+        self.keys: List[str] = sorted(rows)
+        self.names: List[str] = [rows[key][0] for key in self.keys]
+        self.latitudes = array('d', (rows[key][1] for key in self.keys))
+        self.longitudes = array('d', (rows[key][2] for key in self.keys))
+
+        self._postings: Optional[Dict[str, array]] = None
+        self._trigram_counts: Optional[array] = None
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str]) -> 'GazetteerIndex':
+        """
+        Load one or more Census Gazetteer files (places, counties, ...).
+
+        Census LSAD descriptions are stripped from place names ("Houston
+        city" is indexed as "Houston"); county names keep "County".
+
+        Args:
+            paths: Paths to tab-separated Gazetteer files
+
+        Returns:
+            GazetteerIndex over all rows of all files
+        """
+        def read_rows():
+            for path in paths:
+                count = 0
+                with open(path, newline='', encoding='utf-8-sig') as f:
+                    reader = csv.reader(f, delimiter='\t')
+                    header = [column.strip() for column in next(reader)]
+                    usps = header.index('USPS')
+                    name = header.index('NAME')
+                    lat = header.index('INTPTLAT')
+                    lon = header.index('INTPTLONG')
+                    for row in reader:
+                        if len(row) <= max(usps, name, lat, lon):
+                            continue
+                        try:
+                            yield row[usps].strip(), strip_lsad(row[name]), float(row[lat]), float(row[lon])
+                            count += 1
+                        except ValueError:
+                            continue
+                logger.info(f'Loaded {count} gazetteer rows from {path}')
+
+        return cls(read_rows())
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _entry(self, i: int) -> Dict:
+        """Return the record at position i."""
+        state = self.keys[i].split('|', 1)[0]
+        return {
+            'name': self.names[i],
+            'state': state,
+            'latitude': self.latitudes[i],
+            'longitude': self.longitudes[i],
+        }
+
+    def _state_range(self, state: str) -> Tuple[int, int]:
+        """Index range [lo, hi) of all keys for a state."""
+        prefix = f'{state.upper()}|'
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + '\uffff')
+        return lo, hi
+
+    def lookup(self, place: str, state: str) -> Optional[Dict]:
+        """Exact lookup on the normalized (place, state) key."""
+        key = f'{state.upper()}|{normalize_place(place)}'
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self._entry(i)
+        return None
+
+    def complete(self, prefix: str, state: str, limit: int = 10) -> List[Dict]:
+        """All places in a state whose normalized name starts with prefix."""
+        key = f'{state.upper()}|{normalize_place(prefix)}'
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_left(self.keys, key + '\uffff')
+        return [self._entry(i) for i in range(lo, min(hi, lo + limit))]
+
+    def lookup_prefix(self, place: str, state: str) -> Optional[Dict]:
+        """
+        Longest indexed place that is a whole-word prefix of the query.
+
+        Handles trailing agency words: "Cleveland Division" -> "Cleveland".
+        """
+        words = normalize_place(place).split()
+        for end in range(len(words) - 1, 0, -1):
+            entry = self.lookup(' '.join(words[:end]), state)
+            if entry:
+                return entry
+        return None
+
+    def _build_trigram_index(self) -> None:
+        """Build trigram -> sorted key positions postings."""
+        postings: Dict[str, array] = {}
+        counts = array('H')
+        for i, key in enumerate(self.keys):
+            grams = trigrams(key.split('|', 1)[1])
+            counts.append(len(grams))
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                posting.append(i)
+        self._postings = postings
+        self._trigram_counts = counts
+
+    def fuzzy_candidates(self, place: str, state: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Top places in a state by trigram similarity (Dice coefficient).
+
+        Returns:
+            (key position, score) pairs, best first
+        """
+        if self._postings is None:
+            self._build_trigram_index()
+
+        lo, hi = self._state_range(state)
+        if lo == hi:
+            return []
+
+        query_grams = trigrams(normalize_place(place))
+        overlap: Dict[int, int] = {}
+        for gram in query_grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                continue
+            start = bisect.bisect_left(posting, lo)
+            end = bisect.bisect_left(posting, hi, start)
+            for i in posting[start:end]:
+                overlap[i] = overlap.get(i, 0) + 1
+
+        scored = [
+            (i, 2.0 * shared / (len(query_grams) + self._trigram_counts[i]))
+            for i, shared in overlap.items()
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def lookup_fuzzy(self, place: str, state: str, max_distance: Optional[int] = None) -> Optional[Dict]:
+        """
+        Closest place in the state within an edit-distance budget.
+
+        Trigram candidates are verified with Levenshtein distance; the
+        smallest distance wins, ties broken by trigram score.
+
+        Args:
+            place: Query place name
+            state: State code
+            max_distance: Max edits allowed (default scales with length:
+                          0 below 4 chars, 1 below 8, else 2)
+
+        Returns:
+            Entry dict with an extra 'distance' key, or None
+        """
+        query = normalize_place(place)
+        if max_distance is None:
+            max_distance = 0 if len(query) < 4 else 1 if len(query) < 8 else 2
+
+        prefix_len = len(state) + 1
+        best = None
+        for i, score in self.fuzzy_candidates(query, state):
+            distance = edit_distance(query, self.keys[i][prefix_len:], max_distance)
+            if distance <= max_distance and (best is None or distance < best[1]):
+                best = (i, distance)
+
+        if best is None:
+            return None
+        entry = self._entry(best[0])
+        entry['distance'] = best[1]
+        return entry
+
+
+def trigrams(text: str) -> set:
+    """Set of padded character trigrams ("  houston " -> {"  h", " ho", ...})."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between a and b, capped at limit + 1.
+
+    Stops early once every cell of a row exceeds the limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
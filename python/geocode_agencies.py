@@ -14,16 +14,30 @@ Estimated runtime: ~1 hour for 3,500 agencies
 
 import re
 import time
+import random
+import hashlib
+import atexit
 import logging
 import json
-from typing import Optional, Tuple, Dict, List
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Optional, Tuple, Dict, List, Any, Sequence, Iterable, Iterator
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from datetime import datetime
 
 import requests
 from google.cloud import bigquery
 from google.api_core.exceptions import AlreadyExists, BadRequest
 
+from gazetteer import GazetteerIndex
+from agency_rules import AgencyRuleClassifier
+from stage_profiler import PROFILER, start_code_profiler
+from stage_pipeline import StagePipeline
+from storage_backend import make_client
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -77,6 +91,45 @@ class ParsedOrgName:
     confidence: str  # 'high', 'medium', 'low'
 
 
+@dataclass
+class ParsedOrgNameColumns:
+    """
+    Columnar output of OrgNameParser.parse_many.
+
+    Each column has one entry per input name (None where parsing failed).
+    Columns are lists for list input and NumPy object arrays for pandas/Arrow
+    input. `index` carries the pandas index of a Series input so results can
+    be joined back onto the source frame.
+    """
+    city: Sequence[Optional[str]]
+    state: Sequence[Optional[str]]
+    agency: Sequence[Optional[str]]
+    confidence: Sequence[Optional[str]]
+    unique_count: int = 0
+    index: Any = None
+
+    FIELDS = ('city', 'state', 'agency', 'confidence')
+
+    def __len__(self) -> int:
+        return len(self.city)
+
+    def to_pandas(self):
+        """Return a pandas DataFrame (requires pandas), aligned to the input index."""
+        import pandas as pd
+        return pd.DataFrame(
+            {field: getattr(self, field) for field in self.FIELDS},
+            index=self.index
+        )
+
+    def to_arrow(self):
+        """Return a pyarrow Table of string columns (requires pyarrow)."""
+        import pyarrow as pa
+        return pa.table({
+            field: pa.array(list(getattr(self, field)), type=pa.string())
+            for field in self.FIELDS
+        })
+
+
 class OrgNameParser:
     """Parse police agency names like 'Houston TX PD' -> city='Houston', state='TX'."""
 
@@ -166,6 +219,32 @@ class OrgNameParser:
         ),
     ]
 
+    # Valid US state/territory abbreviations
+    VALID_STATES = frozenset({
+        'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
+        'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
+        'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
+        'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
+        'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY',
+        'DC', 'AS', 'GU', 'MP', 'PR', 'UM', 'VI'
+    })
+
+    # Compiled once at import. Every pattern has exactly two capture groups, so
+    # alternative k owns groups (2k+1, 2k+2) and match.lastindex identifies it.
+    # Alternation tries branches in list order, so the first branch to match is
+    # the same pattern the old sequential re.match loop would have picked.
+    _COMBINED_PATTERN = re.compile('|'.join(f'(?:{pattern})' for pattern, _ in PATTERNS))
+    _COMPILED_PATTERNS = [(re.compile(pattern), confidence) for pattern, confidence in PATTERNS]
+
+    # State-name scanner: the lookahead reports the longest state name starting
+    # at every position (overlaps included), in a single C-level pass.
+    _STATE_NAMES_BY_LENGTH = sorted(STATE_NAMES.keys(), key=len, reverse=True)
+    _STATE_NAME_RANK = {name: rank for rank, name in enumerate(_STATE_NAMES_BY_LENGTH)}
+    _STATE_NAME_SCANNER = re.compile(
+        '(?=(' + '|'.join(re.escape(name) for name in _STATE_NAMES_BY_LENGTH) + '))'
+    )
+    _STATE_NAME_BY_ABBREV = {abbrev: name.title() for name, abbrev in reversed(list(STATE_NAMES.items()))}
+
     @staticmethod
     def parse(org_name: str) -> Optional[ParsedOrgName]:
         """
@@ -184,109 +263,522 @@ class OrgNameParser:
 
         org_name = org_name.strip()
 
-        # Try standard city+state patterns first
-        for pattern, confidence in OrgNameParser.PATTERNS:
-            match = re.match(pattern, org_name)
-            if match:
-                group1 = match.group(1).strip()
-                group2 = match.group(2).strip().upper()
-
-                # Determine which is city and which is state
-                # Pattern 7 ("ST - City Agency") has state in group1, city in group2
-                if len(group1) == 2 and OrgNameParser._is_valid_us_state(group1):
-                    # State is first
-                    state = group1
-                    city = group2
-                else:
-                    # City is first (normal case)
-                    city = group1
-                    state = group2
-
-                # Validate state code
-                if not OrgNameParser._is_valid_us_state(state):
-                    continue
-
-                agency = 'Police Department'  # Default
-                if 'Sheriff' in org_name or 'SO' in org_name:
-                    agency = 'Sheriff Office'
-
-                return ParsedOrgName(
-                    city=city,
-                    state=state,
-                    agency=agency,
-                    confidence=confidence
-                )
+        # Try standard city+state patterns first (single pass over all patterns)
+        match = OrgNameParser._COMBINED_PATTERN.match(org_name)
+        if match:
+            index = (match.lastindex - 1) // 2
+            parsed = OrgNameParser._build_parsed(
+                org_name,
+                match.group(2 * index + 1),
+                match.group(2 * index + 2),
+                OrgNameParser.PATTERNS[index][1]
+            )
+            if parsed:
+                return parsed
+
+            # Matched pattern had an invalid state code - try the remaining
+            # patterns in order, exactly as the sequential loop did
+            for pattern, confidence in OrgNameParser._COMPILED_PATTERNS[index + 1:]:
+                match = pattern.match(org_name)
+                if match:
+                    parsed = OrgNameParser._build_parsed(
+                        org_name, match.group(1), match.group(2), confidence
+                    )
+                    if parsed:
+                        return parsed
 
         # Fallback: Try to extract state name even if city extraction fails
         # For state-level agencies like "California Department of Corrections"
         extracted_state = OrgNameParser._extract_state_from_name(org_name)
         if extracted_state:
             # Use state name as city (generic for state-level agencies)
-            state_name = None
-            for name, abbrev in OrgNameParser.STATE_NAMES.items():
-                if abbrev == extracted_state:
-                    state_name = name.title()
-                    break
-
-            agency = 'Police Department'  # Default
-            if 'Sheriff' in org_name or 'SO' in org_name:
-                agency = 'Sheriff Office'
+            state_name = OrgNameParser._STATE_NAME_BY_ABBREV.get(extracted_state)
 
             return ParsedOrgName(
                 city=state_name or extracted_state,  # Use state name as city placeholder
                 state=extracted_state,
-                agency=agency,
+                agency=OrgNameParser._agency_type(org_name),
                 confidence='low'  # Lower confidence since we're using state-level
             )
 
         return None
 
+    @staticmethod
+    def parse_many(names) -> ParsedOrgNameColumns:
+        """
+        Parse many organization names at once into columnar output.
+
+        Inputs are deduplicated first: each distinct value is parsed once and
+        the results are scattered back to every row, so parsing millions of raw
+        search rows costs one parse() per distinct org_name.
+
+        Args:
+            names: list/iterable of strings, pandas Series, or pyarrow
+                   (Chunked)Array of strings. Nulls yield None in every column.
+
+        Returns:
+            ParsedOrgNameColumns with city, state, agency, confidence columns
+        """
+        with PROFILER.stage('parse.factorize'):
+            codes, uniques, index = OrgNameParser._factorize(names)
+
+        with PROFILER.stage('parse.parse', items=len(uniques)):
+            parsed = [OrgNameParser.parse(name) for name in uniques]
+
+        # Trailing None slot so that code -1 (missing value) scatters to None
+        columns = {}
+        for field in ParsedOrgNameColumns.FIELDS:
+            values = [getattr(p, field) if p else None for p in parsed]
+            values.append(None)
+            columns[field] = OrgNameParser._scatter(values, codes)
+
+        return ParsedOrgNameColumns(unique_count=len(uniques), index=index, **columns)
+
+    @staticmethod
+    def _factorize(names) -> Tuple[Any, List[Any], Any]:
+        """
+        Encode names as (codes, uniques, index), with code -1 for missing values.
+
+        pandas and Arrow inputs are factorized natively (vectorized); anything
+        else goes through a dict.
+        """
+        module = type(names).__module__ or ''
+
+        if module.startswith('pyarrow'):
+            import pyarrow as pa
+            if isinstance(names, pa.ChunkedArray):
+                names = names.combine_chunks()
+            encoded = names.dictionary_encode()
+            codes = encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+            return codes, encoded.dictionary.to_pylist(), None
+
+        if module.startswith('pandas'):
+            import pandas as pd
+            codes, uniques = names.factorize()
+            # A Series carries its index for joining back; an Index or
+            # array is positional
+            return codes, list(uniques), names.index if isinstance(names, pd.Series) else None
+
+        lookup: Dict[Any, int] = {}
+        codes = []
+        for name in names:
+            if name is None:
+                codes.append(-1)
+                continue
+            code = lookup.get(name)
+            if code is None:
+                code = lookup[name] = len(lookup)
+            codes.append(code)
+        return codes, list(lookup), None
+
+    @staticmethod
+    def _scatter(values: List[Optional[str]], codes) -> Sequence[Optional[str]]:
+        """Expand per-unique values back to per-row values using factorize codes."""
+        if isinstance(codes, list):
+            return [values[code] for code in codes]
+
+        import numpy as np
+        return np.asarray(values, dtype=object)[codes]
+
+    @staticmethod
+    def _build_parsed(org_name: str, group1: str, group2: str, confidence: str) -> Optional[ParsedOrgName]:
+        """
+        Build a ParsedOrgName from the two captured groups of a pattern match.
+
+        Returns:
+            ParsedOrgName, or None if the captured state code is not valid
+        """
+        group1 = group1.strip()
+        group2 = group2.strip().upper()
+
+        # Determine which is city and which is state
+        # Pattern 7 ("ST - City Agency") has state in group1, city in group2
+        if len(group1) == 2 and OrgNameParser._is_valid_us_state(group1):
+            # State is first
+            state = group1
+            city = group2
+        else:
+            # City is first (normal case)
+            city = group1
+            state = group2
+
+        # Validate state code
+        if not OrgNameParser._is_valid_us_state(state):
+            return None
+
+        return ParsedOrgName(
+            city=city,
+            state=state,
+            agency=OrgNameParser._agency_type(org_name),
+            confidence=confidence
+        )
+
+    @staticmethod
+    def _agency_type(org_name: str) -> str:
+        """Classify agency type from the raw organization name."""
+        if 'Sheriff' in org_name or 'SO' in org_name:
+            return 'Sheriff Office'
+        return 'Police Department'  # Default
+
     @staticmethod
     def _extract_state_from_name(org_name: str) -> Optional[str]:
         """
         Try to extract state abbreviation from organization name by looking for state names.
 
+        The longest state name found anywhere in the name wins (e.g. "West Virginia"
+        over "Virginia"), matching the previous longest-first substring scan.
+
         Args:
             org_name: Organization name (e.g., "Alabama Department of Corrections")
 
         Returns:
             State abbreviation if found, None otherwise
         """
-        org_lower = org_name.lower()
-
-        # Try multi-word state names first (e.g., "New York", "North Carolina")
-        for state_name in sorted(OrgNameParser.STATE_NAMES.keys(), key=len, reverse=True):
-            if state_name in org_lower:
-                return OrgNameParser.STATE_NAMES[state_name]
+        found = OrgNameParser._STATE_NAME_SCANNER.findall(org_name.lower())
+        if not found:
+            return None
 
-        return None
+        best = min(found, key=OrgNameParser._STATE_NAME_RANK.__getitem__)
+        return OrgNameParser.STATE_NAMES[best]
 
     @staticmethod
     def _is_valid_us_state(state_code: str) -> bool:
         """Check if state code is valid US state/territory abbreviation."""
-        valid_states = {
-            'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
-            'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
-            'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
-            'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
-            'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY',
-            'DC', 'AS', 'GU', 'MP', 'PR', 'UM', 'VI'
-        }
-        return state_code in valid_states
+        return state_code in OrgNameParser.VALID_STATES
+
+
+class LLMClassificationCache:
+    """
+    Persistent SQLite cache of LLM state classifications.
+
+    Keyed by (normalized org_name, model, prompt version), so changing the
+    model or editing a prompt starts a fresh set of entries instead of
+    reusing answers to a different question. Each entry stores the state
+    (NULL when the model answered UNKNOWN or something invalid), the
+    model's confidence and a fetch timestamp. Only real model answers are
+    stored; HTTP errors, timeouts and unparseable replies are never cached.
+    The file can be copied between machines or kept on a shared volume to
+    share classifications.
+    """
+
+    DEFAULT_PATH = 'llm_state_cache.sqlite3'
+    NEGATIVE_TTL = 30 * 24 * 3600  # Ask again about UNKNOWN names after a month
+
+    def __init__(self, path: str = DEFAULT_PATH, negative_ttl: Optional[float] = NEGATIVE_TTL):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path (':memory:' for a throwaway cache)
+            negative_ttl: Max age in seconds for UNKNOWN entries (None = forever)
+        """
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_state_cache (
+                org_key TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                state TEXT,
+                confidence TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (org_key, model, prompt_version)
+            )
+            """
+        )
+        self._conn.commit()
+        self.stats = {'loaded': 0, 'writes': 0}
+
+    @staticmethod
+    def normalize(org_name: str) -> str:
+        """Normalize an org_name for use as a cache key."""
+        return ' '.join(org_name.lower().split())
+
+    def load(self, model: str, prompt_version: str) -> Dict[str, Optional[str]]:
+        """
+        Read every live entry for a model/prompt version in one query.
+
+        Returns:
+            Dict of normalized org_name -> state (None for UNKNOWN)
+        """
+        min_negative = time.time() - self.negative_ttl if self.negative_ttl is not None else 0
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT org_key, state FROM llm_state_cache '
+                'WHERE model = ? AND prompt_version = ? AND (state IS NOT NULL OR fetched_at >= ?)',
+                (model, prompt_version, min_negative)
+            ).fetchall()
+        self.stats['loaded'] = len(rows)
+        return dict(rows)
+
+    def put_many(
+        self,
+        entries: Iterable[Tuple[str, Optional[str], Optional[str]]],
+        model: str,
+        prompt_version: str
+    ) -> None:
+        """
+        Store model answers in one transaction.
+
+        Args:
+            entries: (org_name, state or None, confidence or None) tuples
+            model: Model that produced the answers
+            prompt_version: LLMStateClassifier.PROMPT_VERSION
+        """
+        now = time.time()
+        rows = [
+            (self.normalize(org_name), model, prompt_version, state, confidence, now)
+            for org_name, state, confidence in entries
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO llm_state_cache '
+                '(org_key, model, prompt_version, state, confidence, fetched_at) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+            self.stats['writes'] += len(rows)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
 
 
 class LLMStateClassifier:
     """Use Claude LLM via Anthropic API to classify state from organization names."""
 
     API_URL = 'https://api.anthropic.com/v1/messages'
+    MODEL = 'claude-opus-4-6'
+    BATCH_PROMPT_SIZE = 50  # Names per multi-name prompt
+    BATCH_POLL_INTERVAL = 10.0  # Seconds between batch status checks
+    BATCH_TIMEOUT = 3600.0  # Give up waiting for a batch after this long
+    BATCH_RETRIES = 1  # Extra rounds for names whose prompt failed
+
+    SYSTEM_PROMPT = '''You are a US state classifier. Given a police or law enforcement agency name,
+extract the US state abbreviation (2 letters like AL, TX, CA, etc).
+
+If the name clearly references a specific state/city, return that state abbreviation.
+If it's a federal agency or national organization, return "DC".
+If you cannot determine the state with reasonable confidence, return "UNKNOWN".
+
+Respond with ONLY the state abbreviation, nothing else.'''
+
+    BATCH_SYSTEM_PROMPT = '''You are a US state classifier. You are given a numbered list of police or
+law enforcement agency names. For each one, extract the US state abbreviation
+(2 letters like AL, TX, CA, etc).
+
+If the name clearly references a specific state/city, use that state abbreviation.
+If it's a federal agency or national organization, use "DC".
+If you cannot determine the state with reasonable confidence, use "UNKNOWN".
+
+For each answer also give your confidence: "high", "medium" or "low".
+
+Respond with ONLY a JSON object mapping each number (as a string) to its answer,
+e.g. {"1": {"state": "TX", "confidence": "high"}, "2": {"state": "UNKNOWN", "confidence": "low"}}.'''
+
+    # Cache entries are only reused for the same prompts
+    PROMPT_VERSION = hashlib.sha1((SYSTEM_PROMPT + BATCH_SYSTEM_PROMPT).encode('utf-8')).hexdigest()[:12]
+
+    VALID_RESPONSES = frozenset({
+        'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
+        'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
+        'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
+        'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
+        'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY', 'DC', 'UNKNOWN'
+    })
+
+    MAX_WORKERS = 4  # Concurrent classify_state calls in classify_stream
+    MAX_RETRIES = 4  # Retries for 429/529/5xx responses and connection errors
+    BACKOFF_BASE = 1.0  # Seconds; doubled per attempt, plus jitter
+    BACKOFF_MAX = 60.0
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504, 529})
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_url: Optional[str] = None,
+        cache: Optional[LLMClassificationCache] = None,
+        max_workers: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        rules: Optional[AgencyRuleClassifier] = None,
+        batch_timeout: Optional[float] = None
+    ):
+        """
+        Initialize with API key from environment.
 
-    def __init__(self):
-        """Initialize with API key from environment."""
-        import os
-        self.api_key = os.environ.get('ANTHROPIC_API_KEY')
+        Args:
+            api_key: Anthropic API key (default: ANTHROPIC_API_KEY)
+            api_url: Messages endpoint (default: API_URL); the batch endpoint
+                     is derived from it, so a local fake server can stand in
+            cache: Persistent cache, warm-loaded here with one bulk read
+                   (None = in-memory for this run only)
+            max_workers: Concurrent requests in classify_stream (default: MAX_WORKERS)
+            requests_per_minute: Request budget shared by all workers (None = unlimited)
+            tokens_per_minute: Estimated input+output token budget (None = unlimited)
+            rules: Local rules tried before any API call (default: built-in table)
+            batch_timeout: Seconds to wait for a Message Batch before cancelling
+                           it (default: BATCH_TIMEOUT)
+        """
+        self.api_key = api_key or os.environ.get('ANTHROPIC_API_KEY')
         if not self.api_key:
             logger.warning('ANTHROPIC_API_KEY not set - LLM state classification will be skipped')
-        self.cache = {}  # Simple cache to avoid redundant API calls
+        self.api_url = api_url or self.API_URL
+        self.rules = rules or AgencyRuleClassifier()
+        self.batch_url = f'{self.api_url.rstrip("/")}/batches'
+        self.persistent_cache = cache
+        # Normalized org_name -> state, to avoid redundant API calls
+        self.cache: Dict[str, Optional[str]] = {}
+        if cache:
+            self.cache = cache.load(self.MODEL, self.PROMPT_VERSION)
+            logger.info(f'Warm-loaded {len(self.cache)} LLM classifications from {cache.path}')
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.batch_timeout = batch_timeout or self.BATCH_TIMEOUT
+        self.session = requests.Session()
+        self.session.headers.update({
+            'x-api-key': self.api_key or '',
+            'anthropic-version': '2023-06-01',
+            'content-type': 'application/json'
+        })
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.request_limiter = TokenBucket(requests_per_minute / 60.0) if requests_per_minute else None
+        # A second's worth of tokens may burst, so one request is never starved
+        self.token_limiter = (
+            TokenBucket(tokens_per_minute / 60.0, capacity=tokens_per_minute / 60.0)
+            if tokens_per_minute else None
+        )
+
+        self._stats_lock = threading.Lock()
+        self.api_requests = 0  # HTTP requests made (including retries and batch polls)
+        self.stats = {'succeeded': 0, 'retries': 0, 'rate_limited': 0, 'errors': 0, 'classified': 0}
+        self._started = time.monotonic()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            if key == 'api_requests':
+                self.api_requests += amount
+            else:
+                self.stats[key] += amount
+
+    def run_stats(self) -> Dict[str, float]:
+        """Per-run counters plus throughput and error rate."""
+        elapsed = time.monotonic() - self._started
+        with self._stats_lock:
+            stats = dict(self.stats, api_requests=self.api_requests, elapsed=elapsed)
+        stats['requests_per_second'] = stats['api_requests'] / elapsed if elapsed > 0 else 0.0
+        stats['error_rate'] = (
+            (stats['errors'] + stats['retries']) / stats['api_requests'] if stats['api_requests'] else 0.0
+        )
+        return stats
+
+    @staticmethod
+    def _estimate_tokens(payload: Dict) -> int:
+        """Rough token cost of a Messages request (~4 characters per token)."""
+        text = payload.get('system', '') + ''.join(m['content'] for m in payload.get('messages', []))
+        return len(text) // 4 + payload.get('max_tokens', 0)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """
+        Seconds to wait before a retry: retry-after if given, else jittered exponential.
+
+        retry-after is honored in full (retrying sooner only earns another
+        429); BACKOFF_MAX caps the exponential branch only.
+        """
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            if retry_after:
+                try:
+                    return max(float(retry_after), 0.0) + random.uniform(0, self.BACKOFF_BASE / 4)
+                except ValueError:
+                    pass
+        delay = min(self.BACKOFF_BASE * (2 ** attempt), self.BACKOFF_MAX)
+        return random.uniform(delay / 2, delay)
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        payload: Optional[Dict] = None,
+        timeout: float = 10
+    ) -> Optional[requests.Response]:
+        """
+        Send one API request under the rate budgets, retrying transient failures.
+
+        429/529/5xx responses and connection errors are retried up to
+        MAX_RETRIES times, honoring retry-after and otherwise backing off
+        exponentially with jitter.
+
+        Returns:
+            The final response (possibly a non-retryable error status), or
+            None if every attempt failed
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            if self.request_limiter:
+                PROFILER.record('llm.rate_limit_wait', self.request_limiter.acquire())
+            if self.token_limiter and payload:
+                PROFILER.record('llm.token_budget_wait', self.token_limiter.acquire(self._estimate_tokens(payload)))
+
+            response = None
+            self._count('api_requests')
+            try:
+                with PROFILER.stage('llm.request'):
+                    response = self.session.request(method, url, json=payload, timeout=timeout)
+                if response.status_code not in self.RETRY_STATUSES:
+                    self._count('succeeded' if response.status_code == 200 else 'errors')
+                    return response
+                if response.status_code in (429, 529):
+                    self._count('rate_limited')
+                problem = f'HTTP {response.status_code}'
+            except requests.exceptions.RequestException as e:
+                problem = str(e)
+
+            if attempt == self.MAX_RETRIES:
+                self._count('errors')
+                logger.error(f'LLM request failed after {attempt + 1} attempts: {problem}')
+                return response
+
+            delay = self._backoff(attempt, response)
+            self._count('retries')
+            logger.debug(f'LLM request {problem}; retrying in {delay:.1f}s')
+            time.sleep(delay)
+            PROFILER.record('llm.backoff', delay)
+        return None
+
+    def _rule_state(self, org_name: str) -> Optional[str]:
+        """State from the local rule table (federal agencies → DC), without an API call."""
+        match = self.rules.classify(org_name)
+        if match:
+            logger.debug(f'Classified by {match.kind} rule "{match.phrase}": {org_name} → {match.state}')
+            return match.state
+        return None
+
+    def _remember(self, answers: List[Tuple[str, Optional[str], Optional[str]]]) -> None:
+        """Cache (org_name, state, confidence) model answers in memory and on disk."""
+        for org_name, state, _ in answers:
+            self.cache[LLMClassificationCache.normalize(org_name)] = state
+        if self.persistent_cache:
+            self.persistent_cache.put_many(answers, self.MODEL, self.PROMPT_VERSION)
+
+    def _validate(self, org_name: str, answer: Any) -> Optional[str]:
+        """Map a raw model answer to a state code, or None."""
+        response_text = str(answer).strip().upper()
+        if response_text not in self.VALID_RESPONSES:
+            logger.debug(f'LLM returned invalid state for {org_name}: {response_text}')
+            return None
+        if response_text == 'UNKNOWN':
+            logger.debug(f'LLM could not determine state for {org_name}')
+            return None
+        logger.debug(f'LLM classified: {org_name} → {response_text}')
+        return response_text
 
     def classify_state(self, org_name: str) -> Optional[str]:
         """
@@ -298,86 +790,683 @@ class LLMStateClassifier:
         Returns:
             State abbreviation (e.g., "AL") or None if unable to classify
         """
+        # Local rules (federal agencies, acronyms, universities, ...) first
+        ruled = self._rule_state(org_name)
+        if ruled:
+            return ruled
+
         if not self.api_key:
             return None
 
-        if org_name in self.cache:
-            return self.cache[org_name]
-
-        # Check for federal agencies - default to DC
-        if any(keyword in org_name.lower() for keyword in ['federal', 'national', 'us ', 'usa', 'united states', 'postal', 'fbi', 'atf', 'ncmec']):
-            logger.debug(f'Classified as federal agency: {org_name} → DC')
-            self.cache[org_name] = 'DC'
-            return 'DC'
+        key = LLMClassificationCache.normalize(org_name)
+        if key in self.cache:
+            return self.cache[key]
 
         try:
-            response = requests.post(
-                self.API_URL,
-                headers={
-                    'x-api-key': self.api_key,
-                    'anthropic-version': '2023-06-01',
-                    'content-type': 'application/json'
-                },
-                json={
-                    'model': 'claude-opus-4-6',
-                    'max_tokens': 50,
-                    'system': '''You are a US state classifier. Given a police or law enforcement agency name,
-extract the US state abbreviation (2 letters like AL, TX, CA, etc).
-
-If the name clearly references a specific state/city, return that state abbreviation.
-If it's a federal agency or national organization, return "DC".
-If you cannot determine the state with reasonable confidence, return "UNKNOWN".
-
-Respond with ONLY the state abbreviation, nothing else.''',
-                    'messages': [
-                        {
-                            'role': 'user',
-                            'content': f'Organization name: {org_name}'
-                        }
-                    ]
-                },
-                timeout=10
-            )
+            with PROFILER.stage('llm.classify_state'):
+                response = self._request(
+                    'POST',
+                    self.api_url,
+                    {
+                        'model': self.MODEL,
+                        'max_tokens': 50,
+                        'system': self.SYSTEM_PROMPT,
+                        'messages': [
+                            {
+                                'role': 'user',
+                                'content': f'Organization name: {org_name}'
+                            }
+                        ]
+                    }
+                )
 
-            if response.status_code != 200:
-                logger.debug(f'API error classifying {org_name}: {response.status_code}')
-                self.cache[org_name] = None
+            # Errors are not cached so the name is retried next time
+            if response is None or response.status_code != 200:
+                logger.debug(f'API error classifying {org_name}: {response.status_code if response else "no response"}')
                 return None
 
             data = response.json()
-            response_text = data['content'][0]['text'].strip().upper()
-
-            # Validate the response is a valid state code
-            valid_states = {
-                'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
-                'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
-                'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
-                'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
-                'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY', 'DC', 'UNKNOWN'
+            state = self._validate(org_name, data['content'][0]['text'])
+            self._remember([(org_name, state, None)])
+            self._count('classified')
+            return state
+
+        except (KeyError, IndexError, json.JSONDecodeError) as e:
+            logger.error(f'Parse error classifying state for {org_name}: {e}')
+            return None
+
+    def classify_stream(
+        self,
+        org_names: Iterable[str],
+        max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Classify names one request each, concurrently.
+
+        classify_state calls run in a thread pool sharing one pooled session
+        and the request/token budgets; results are yielded as they complete
+        so the caller can act on each one while others are in flight.
+
+        Args:
+            org_names: Organization names to classify
+            max_workers: Pool size (default: the classifier's max_workers)
+
+        Yields:
+            (org_name, state abbreviation or None)
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            future_to_name = {
+                executor.submit(self.classify_state, org_name): org_name
+                for org_name in dict.fromkeys(org_names)
             }
+            for future in as_completed(future_to_name):
+                yield future_to_name[future], future.result()
+
+    def classify_many(self, org_names: Iterable[str], mode: str = 'batch') -> Dict[str, Optional[str]]:
+        """
+        Classify many organization names with a handful of API round trips.
+
+        Names are packed BATCH_PROMPT_SIZE to a prompt that answers with a
+        JSON object of states and confidences. In 'batch' mode all prompts go out as one Message
+        Batches job which is polled until it ends (half the price of
+        synchronous calls); in 'prompts' mode each prompt is one synchronous
+        Messages request. Names whose prompt errored, expired or was missing
+        from the answer are retried in up to BATCH_RETRIES more rounds and
+        are left uncached if they still fail, so a later run can retry them.
+        A batch that outlives batch_timeout is cancelled and not resubmitted
+        (the API is backed up; another round would only queue behind it).
+
+        Args:
+            org_names: Organization names that OrgNameParser rejected
+            mode: 'batch' (Message Batches endpoint) or 'prompts'
 
-            if response_text in valid_states:
-                if response_text == 'UNKNOWN':
-                    logger.debug(f'LLM could not determine state for {org_name}')
-                    self.cache[org_name] = None
-                    return None
-                else:
-                    logger.debug(f'LLM classified: {org_name} → {response_text}')
-                    self.cache[org_name] = response_text
-                    return response_text
+        Returns:
+            Dict of org_name -> state abbreviation or None
+        """
+        if mode not in ('batch', 'prompts'):
+            raise ValueError(f'Unknown LLM batch mode: {mode}')
+
+        results: Dict[str, Optional[str]] = {}
+        pending: List[str] = []
+        cached = 0
+        for org_name in dict.fromkeys(org_names):
+            key = LLMClassificationCache.normalize(org_name)
+            ruled = self._rule_state(org_name)
+            if ruled:
+                results[org_name] = ruled
+            elif key in self.cache:
+                results[org_name] = self.cache[key]
+                cached += 1
+            elif not self.api_key:
+                results[org_name] = None
             else:
-                logger.debug(f'LLM returned invalid state for {org_name}: {response_text}')
-                self.cache[org_name] = None
-                return None
+                pending.append(org_name)
+        if cached:
+            logger.info(f'LLM classification cache: {cached} hits, {len(pending)} misses')
+
+        for attempt in range(self.BATCH_RETRIES + 1):
+            if not pending:
+                break
+            chunks = [
+                pending[i:i + self.BATCH_PROMPT_SIZE]
+                for i in range(0, len(pending), self.BATCH_PROMPT_SIZE)
+            ]
+            logger.info(
+                f'LLM classification round {attempt + 1}: {len(pending)} names in '
+                f'{len(chunks)} prompt(s) via {mode}'
+            )
+            if mode == 'batch':
+                try:
+                    answers = self._run_batch(chunks)
+                except TimeoutError:
+                    break
+            else:
+                answers = self._run_prompts(chunks)
+
+            failed = []
+            answered = []
+            for chunk_id, chunk in enumerate(chunks):
+                answer = answers.get(chunk_id)
+                for number, org_name in enumerate(chunk, 1):
+                    if answer is None or str(number) not in answer:
+                        failed.append(org_name)
+                        continue
+                    item = answer[str(number)]
+                    confidence = None
+                    if isinstance(item, dict):
+                        item, confidence = item.get('state'), item.get('confidence')
+                    results[org_name] = self._validate(org_name, item)
+                    answered.append((org_name, results[org_name], confidence))
+            self._remember(answered)
+            self._count('classified', len(answered))
+            pending = failed
+
+        if pending:
+            logger.warning(f'LLM classification failed for {len(pending)} names; they will be retried next run')
+            for org_name in pending:
+                results[org_name] = None
+        return results
+
+    def _chunk_params(self, chunk: List[str]) -> Dict:
+        """Messages API parameters for one multi-name prompt."""
+        listing = '\n'.join(f'{number}. {org_name}' for number, org_name in enumerate(chunk, 1))
+        return {
+            'model': self.MODEL,
+            'max_tokens': 20 + 12 * len(chunk),
+            'system': self.BATCH_SYSTEM_PROMPT,
+            'messages': [{'role': 'user', 'content': f'Organization names:\n{listing}'}]
+        }
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f'Error classifying state for {org_name}: {e}')
-            self.cache[org_name] = None
+    @staticmethod
+    def _parse_answer(message: Dict) -> Optional[Dict[str, Any]]:
+        """Extract the JSON object from a multi-name prompt's reply."""
+        try:
+            text = message['content'][0]['text']
+            answer = json.loads(text[text.index('{'):text.rindex('}') + 1])
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f'Unparseable batch classification reply: {e}')
             return None
-        except (KeyError, IndexError, json.JSONDecodeError) as e:
-            logger.error(f'Parse error classifying state for {org_name}: {e}')
-            self.cache[org_name] = None
+        return answer if isinstance(answer, dict) else None
+
+    def _run_prompts(self, chunks: List[List[str]]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Send each multi-name prompt as one synchronous Messages request."""
+        answers = {}
+        for chunk_id, chunk in enumerate(chunks):
+            response = self._request('POST', self.api_url, self._chunk_params(chunk), timeout=60)
+            if response is None or response.status_code != 200:
+                logger.warning(f'API error for prompt {chunk_id}: {response.status_code if response else "no response"}')
+                continue
+            try:
+                answers[chunk_id] = self._parse_answer(response.json())
+            except ValueError as e:
+                logger.error(f'Unparseable reply for prompt {chunk_id}: {e}')
+        return answers
+
+    def _run_batch(self, chunks: List[List[str]]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Submit all prompts as one Message Batch, wait for it, and collect replies.
+
+        Raises:
+            TimeoutError: The batch did not end within batch_timeout (it is cancelled)
+        """
+        try:
+            response = self._request(
+                'POST',
+                self.batch_url,
+                {'requests': [
+                    {'custom_id': f'chunk-{chunk_id}', 'params': self._chunk_params(chunk)}
+                    for chunk_id, chunk in enumerate(chunks)
+                ]},
+                timeout=60
+            )
+            if response is None:
+                return {}
+            response.raise_for_status()
+            batch = response.json()
+            logger.info(f'Submitted message batch {batch["id"]} ({len(chunks)} prompts)')
+
+            deadline = time.monotonic() + self.batch_timeout
+            while batch['processing_status'] != 'ended':
+                if time.monotonic() > deadline:
+                    logger.error(
+                        f'Message batch {batch["id"]} did not finish within {self.batch_timeout:.0f}s; cancelling'
+                    )
+                    self._request('POST', f'{self.batch_url}/{batch["id"]}/cancel', timeout=30)
+                    raise TimeoutError(batch['id'])
+                time.sleep(self.BATCH_POLL_INTERVAL)
+                PROFILER.record('llm.batch_poll_wait', self.BATCH_POLL_INTERVAL)
+                response = self._request('GET', f'{self.batch_url}/{batch["id"]}', timeout=30)
+                if response is None:
+                    return {}
+                response.raise_for_status()
+                batch = response.json()
+
+            response = self._request('GET', batch['results_url'], timeout=60)
+            if response is None:
+                return {}
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Message batch request failed: {e}')
+            return {}
+        except (KeyError, ValueError) as e:
+            logger.error(f'Unexpected message batch response: {e}')
+            return {}
+
+        # A malformed line only loses its own prompt, which is retried like
+        # a prompt that did not succeed
+        answers = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                chunk_id = int(item['custom_id'].rsplit('-', 1)[1])
+                result = item.get('result') or {}
+                if result.get('type') != 'succeeded':
+                    logger.warning(f'Batch prompt {item["custom_id"]} {result.get("type")}')
+                    continue
+                answers[chunk_id] = self._parse_answer(result['message'])
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+                logger.warning(f'Skipping malformed batch result line ({e!r}): {line[:200]}')
+        return answers
+
+
+class GeocodeCache:
+    """
+    Persistent SQLite cache of Nominatim query results.
+
+    Keyed by the normalized query string ("houston, tx, usa"), so every
+    org_name that resolves to the same city shares one entry across runs.
+    Stores positive results, short-lived negative ("no result") entries and
+    a fetch timestamp per entry. Transient failures (HTTP errors, timeouts)
+    are never cached.
+    """
+
+    DEFAULT_PATH = 'geocode_cache.sqlite3'
+    POSITIVE_TTL = None  # Seconds; None = positive results never expire
+    NEGATIVE_TTL = 7 * 24 * 3600  # Re-check "no result" queries after a week
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        positive_ttl: Optional[float] = POSITIVE_TTL,
+        negative_ttl: Optional[float] = NEGATIVE_TTL
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path (':memory:' for a throwaway cache)
+            positive_ttl: Max age in seconds for positive entries (None = forever)
+            negative_ttl: Max age in seconds for negative entries (None = forever)
+        """
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                query_key TEXT PRIMARY KEY,
+                result_json TEXT,
+                is_negative INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'expired': 0, 'writes': 0}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query string for use as a cache key."""
+        return ' '.join(query.lower().split())
+
+    def get(self, query: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        Look up a query.
+
+        Returns:
+            (found, result): found is False on a miss or expired entry;
+            result is None for a cached negative entry
+        """
+        key = self.normalize(query)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result_json, is_negative, fetched_at FROM geocode_cache WHERE query_key = ?',
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self.stats['misses'] += 1
+                return False, None
+
+            result_json, is_negative, fetched_at = row
+            ttl = self.negative_ttl if is_negative else self.positive_ttl
+            if ttl is not None and time.time() - fetched_at > ttl:
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return False, None
+
+            if is_negative:
+                self.stats['negative_hits'] += 1
+                return True, None
+
+            self.stats['hits'] += 1
+            return True, json.loads(result_json)
+
+    def put(self, query: str, result: Optional[Dict]) -> None:
+        """Store a positive result, or a negative entry if result is None."""
+        key = self.normalize(query)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO geocode_cache (query_key, result_json, is_negative, fetched_at) '
+                'VALUES (?, ?, ?, ?)',
+                (key, json.dumps(result) if result else None, 0 if result else 1, time.time())
+            )
+            self._conn.commit()
+            self.stats['writes'] += 1
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CheckpointJournal:
+    """
+    Append-only JSON Lines journal of per-agency progress.
+
+    Each line records one stage for one agency:
+        parsed   - (city, state) and where it came from (parser, llm, failed)
+        geocoded - the agency_locations row that was (or will be) written
+        written  - the row is durably in BigQuery
+
+    Run markers ('run' with the discovered agency list, 'run_complete') let
+    an interrupted run resume without querying BigQuery again; agencies
+    already parsed or geocoded are not parsed, classified or geocoded again,
+    and geocoded rows that never reached BigQuery can be replayed. A
+    truncated final line (crash mid-write) is ignored on load.
+    """
+
+    DEFAULT_PATH = 'geocode_journal.jsonl'
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        Open (or create) the journal and load its current state.
+
+        Args:
+            path: Journal file path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.agencies: Dict[str, Dict] = {}
+        self.run_agencies: Optional[List[str]] = None  # Agency list of an unfinished run
+        self.skipped_lines = 0
+        self._load()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _load(self) -> None:
+        """Replay the journal file into per-agency state."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            good_end = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partial record from a crash mid-write; drop it so the
+                    # next append starts on a fresh line
+                    self.skipped_lines += 1
+                    f.truncate(good_end)
+                    break
+                good_end += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self.skipped_lines += 1
+                    continue
+                self._apply(record)
+        if self.skipped_lines:
+            logger.warning(f'Ignored {self.skipped_lines} unreadable journal line(s) in {self.path}')
+
+    def _apply(self, record: Dict) -> None:
+        """Fold one journal record into the in-memory state."""
+        stage = record.get('stage')
+        if stage == 'run':
+            self.run_agencies = record['agencies']
+            return
+        if stage == 'run_complete':
+            self.run_agencies = None
+            return
+
+        entry = self.agencies.setdefault(record['org_name'], {'stage': None})
+        entry['stage'] = stage
+        if stage == 'parsed':
+            entry.update(city=record['city'], state=record['state'], source=record['source'])
+        elif 'row' in record:
+            entry['row'] = record['row']
+
+    def _append(self, record: Dict) -> None:
+        """Apply a record and write it to disk."""
+        with self._lock:
+            self._apply(record)
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+
+    def start_run(self, agencies: List[str]) -> None:
+        """Record the agency list of a new run."""
+        self._append({'stage': 'run', 'agencies': list(agencies), 'started': datetime.utcnow().isoformat()})
+
+    def finish_run(self) -> None:
+        """Mark the current run as complete (nothing left to resume)."""
+        self._append({'stage': 'run_complete'})
+
+    def record_parsed(self, org_name: str, city: Optional[str], state: Optional[str], source: str) -> None:
+        """Record the (city, state) an agency resolved to; source is 'parser', 'llm' or 'failed'."""
+        self._append({'stage': 'parsed', 'org_name': org_name, 'city': city, 'state': state, 'source': source})
+
+    def record_geocoded(self, org_name: str, row: Dict) -> None:
+        """Record the insert_agency_location() arguments for an agency."""
+        self._append({'stage': 'geocoded', 'org_name': org_name, 'row': row})
+
+    def record_written(self, org_names: Iterable[str]) -> None:
+        """Mark agencies whose rows are durably in BigQuery."""
+        for org_name in org_names:
+            self._append({'stage': 'written', 'org_name': org_name})
+
+    def stage(self, org_name: str) -> Optional[str]:
+        """Latest recorded stage for an agency, or None."""
+        entry = self.agencies.get(org_name)
+        return entry['stage'] if entry else None
+
+    def parsed(self, org_name: str) -> Optional[Tuple[Optional[str], Optional[str], str]]:
+        """(city, state, source) recorded for an agency, or None."""
+        entry = self.agencies.get(org_name)
+        if not entry or 'source' not in entry:
             return None
+        return entry['city'], entry['state'], entry['source']
+
+    def pending_rows(self) -> Dict[str, Dict]:
+        """Geocoded rows not yet marked written, keyed by org_name."""
+        return {
+            org_name: entry['row']
+            for org_name, entry in self.agencies.items()
+            if entry['stage'] == 'geocoded'
+        }
+
+    def compact(self) -> None:
+        """
+        Rewrite the journal with one line per agency (its latest stage).
+
+        The new file is written next to the old one and swapped in with
+        os.replace, so a crash during compaction leaves the old journal.
+        """
+        with self._lock:
+            self._file.close()
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(prefix='.geocode_journal_', dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                if self.run_agencies is not None:
+                    f.write(json.dumps({'stage': 'run', 'agencies': self.run_agencies}) + '\n')
+                for org_name, entry in self.agencies.items():
+                    if entry['stage'] == 'parsed':
+                        record = {
+                            'stage': 'parsed', 'org_name': org_name, 'city': entry['city'],
+                            'state': entry['state'], 'source': entry['source']
+                        }
+                    else:
+                        record = {'stage': entry['stage'], 'org_name': org_name}
+                        if 'row' in entry:
+                            record['row'] = entry['row']
+                    f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        logger.info(f'Compacted checkpoint journal to {len(self.agencies)} agencies')
+
+    def close(self) -> None:
+        """Flush and close the journal file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    request takes one token. Over any window of T seconds at most
+    capacity + rate * T requests pass, so with capacity=1 the provider's
+    per-second budget is never exceeded no matter how many threads share it.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens (requests) per second
+            capacity: Maximum burst size
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.total_wait = 0.0  # Seconds spent waiting for tokens
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Block until `amount` tokens are available, then take them.
+
+        Args:
+            amount: Tokens to take (e.g. estimated LLM tokens for a request);
+                    capped at capacity so a large request cannot wait forever
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    self.total_wait += waited
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class GeocodingBackend:
+    """
+    Interface for local geocoding backends consulted before Nominatim.
+
+    Subclasses implement lookup(); resolve() tries the variants of a name
+    and reports how the match was made. A hit short-circuits the cache and
+    the network, a miss (None) falls through to the next backend and
+    finally to one Nominatim query.
+    """
+
+    name = 'backend'
+
+    def lookup(self, city: str, state: str) -> Optional[Dict]:
+        """
+        Resolve a (city, state) query locally.
+
+        Returns:
+            Dict with latitude, longitude, display_name, geocode_confidence
+            and geocode_source, or None on a miss
+        """
+        raise NotImplementedError
+
+    def resolve(self, variants: List[str], state: str) -> Optional[Dict]:
+        """
+        Resolve the first city variant that matches exactly.
+
+        Args:
+            variants: City name variants, original first (see _strip_city_suffixes)
+            state: State code
+
+        Returns:
+            lookup() result plus 'matched_city' and 'match_type', or None
+        """
+        for variant in variants:
+            result = self.lookup(variant, state)
+            if result:
+                result['matched_city'] = variant
+                result['match_type'] = 'exact'
+                return result
+        return None
+
+
+class GazetteerBackend(GeocodingBackend):
+    """Offline backend over a GazetteerIndex (Census Gazetteer places/counties)."""
+
+    name = 'gazetteer'
+
+    def __init__(self, index: GazetteerIndex, max_distance: Optional[int] = None):
+        """
+        Args:
+            index: Loaded GazetteerIndex
+            max_distance: Edit-distance budget for fuzzy matches
+                          (default scales with name length)
+        """
+        self.index = index
+        self.max_distance = max_distance
+
+    def _result(self, entry: Dict, confidence: str, match_type: str, matched_city: str) -> Dict:
+        """Build a geocode result from an index entry."""
+        return {
+            'latitude': entry['latitude'],
+            'longitude': entry['longitude'],
+            'display_name': f'{entry["name"]}, {entry["state"]}, USA (Census Gazetteer)',
+            'geocode_confidence': confidence,
+            'geocode_source': self.name,
+            'matched_city': matched_city,
+            'match_type': match_type
+        }
+
+    def lookup(self, city: str, state: str) -> Optional[Dict]:
+        """Exact match on the normalized (city, state) key."""
+        entry = self.index.lookup(city, state)
+        return self._result(entry, 'high', 'exact', city) if entry else None
+
+    def resolve(self, variants: List[str], state: str) -> Optional[Dict]:
+        """
+        Pick the best local candidate for a name.
+
+        Exact match on any variant, then the longest indexed word prefix of
+        the original name ("Cleveland Division" -> "Cleveland"), then the
+        closest fuzzy (trigram + edit distance) match of any variant.
+        """
+        for variant in variants:
+            entry = self.index.lookup(variant, state)
+            if entry:
+                return self._result(entry, 'high', 'exact', variant)
+
+        entry = self.index.lookup_prefix(variants[0], state)
+        if entry:
+            return self._result(entry, 'medium', 'prefix', entry['name'])
+
+        best = None
+        for variant in variants:
+            entry = self.index.lookup_fuzzy(variant, state, max_distance=self.max_distance)
+            if entry and (best is None or entry['distance'] < best['distance']):
+                best = entry
+        if best:
+            return self._result(best, 'medium', 'fuzzy', best['name'])
+
+        return None
 
 
 class NominatimGeocoder:
@@ -386,42 +1475,105 @@ class NominatimGeocoder:
     BASE_URL = 'https://nominatim.openstreetmap.org/search'
     USER_AGENT = 'FlockAgencyGeocoder/1.0'
     RATE_LIMIT_DELAY = 1.0  # 1 second between requests (Nominatim policy)
+    MAX_WORKERS = 4  # Concurrent lookups sharing the rate limiter
 
     # Common words that appear in city names but aren't part of the actual city
     CITY_SUFFIXES = [
         'Division', 'Department', 'Dept', 'Bureau', 'Office',
         'Police', 'Sheriff', 'Services', 'Administration'
     ]
+    _SUFFIX_PATTERN = re.compile(
+        r'\s+(?:' + '|'.join(CITY_SUFFIXES) + r')s?\s*$', re.IGNORECASE
+    )
+
+    def __init__(
+        self,
+        cache: Optional[GeocodeCache] = None,
+        base_url: Optional[str] = None,
+        rate_limit: Optional[float] = None,
+        limiter: Optional[TokenBucket] = None,
+        max_workers: Optional[int] = None,
+        backends: Optional[List[GeocodingBackend]] = None
+    ):
+        """
+        Initialize geocoder with rate limiting.
+
+        Args:
+            cache: Optional persistent GeocodeCache consulted before any request
+            base_url: Search endpoint (e.g. a self-hosted Nominatim); defaults to
+                      the public server
+            rate_limit: Requests per second; defaults to 1/RATE_LIMIT_DELAY.
+                        Only raise this for a self-hosted server.
+            limiter: Shared TokenBucket (overrides rate_limit), so several
+                     geocoders can draw on one provider budget
+            max_workers: Default pool size for geocode_many (default MAX_WORKERS)
+            backends: Local backends (e.g. GazetteerBackend) tried in order
+                      for every name variant before any remote query
+        """
+        self.base_url = base_url or self.BASE_URL
+        if limiter is None:
+            rate = rate_limit or (1.0 / self.RATE_LIMIT_DELAY if self.RATE_LIMIT_DELAY > 0 else None)
+            limiter = TokenBucket(rate) if rate else None
+        self.limiter = limiter
+
+        self.max_workers = max_workers or self.MAX_WORKERS
 
-    def __init__(self):
-        """Initialize geocoder with rate limiting."""
-        self.last_request_time = 0
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': self.USER_AGENT})
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.cache = cache
+        self.backends = backends or []
+        self.backend_hits = {backend.name: 0 for backend in self.backends}
+        self.network_calls = 0
+        self.query_attempts = 0  # Every _geocode_single call, deduped or not
+        self.memo_hits = 0  # Attempts answered by an earlier identical query this run
+        self._resolved: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
 
     def _strip_city_suffixes(self, city: str) -> List[str]:
         """
         Generate variants of city name with common suffixes removed.
 
+        Trailing suffixes are stripped repeatedly, one word at a time.
+
         Args:
-            city: Original city name (e.g., "Cleveland Division")
+            city: Original city name (e.g., "Houston Police Department")
 
         Returns:
             List of city name variants to try, in order of preference
-            Example: ["Cleveland Division", "Cleveland"]
+            Example: ["Houston Police Department", "Houston Police", "Houston"]
         """
         variants = [city]  # Always try original first
 
-        # Try removing each suffix
-        for suffix in self.CITY_SUFFIXES:
-            # Match suffix at end of string (with optional 's')
-            pattern = r'\s+' + suffix + r's?\s*$'
-            stripped = re.sub(pattern, '', city, flags=re.IGNORECASE)
-            if stripped != city and stripped not in variants:
-                variants.append(stripped.strip())
+        stripped = city
+        while True:
+            stripped = self._SUFFIX_PATTERN.sub('', stripped).strip()
+            if not stripped or stripped in variants:
+                break
+            variants.append(stripped)
 
         return variants
 
+    def plan_queries(self, city: str, state: str) -> List[Tuple[str, str]]:
+        """
+        List the (city, state) remote query geocode() issues on a local miss.
+
+        At most one remote query is made per location: the most-stripped
+        variant, since suffix words are never part of the actual city.
+
+        Args:
+            city: City name (e.g., "Cleveland Division")
+            state: State code (e.g., "OH")
+
+        Returns:
+            Single-element list, e.g. [("Cleveland", "OH")]
+        """
+        return [(self._strip_city_suffixes(city)[-1], state)]
+
     def _get_state_fallback(self, state: str) -> Optional[Dict]:
         """
         Get state-level coordinates as last-resort fallback.
@@ -450,8 +1602,10 @@ class NominatimGeocoder:
         Geocode a city, state location with multi-tier fallback strategy.
 
         Attempts (in order):
-        1. Original city name: "{city}, {state}, USA"
-        2. Stripped variants: Remove suffixes like "Division", "Department"
+        1. Local candidate resolution: every name variant (original and
+           suffix-stripped) against the local backends - exact, word-prefix
+           and fuzzy matches, no network
+        2. One remote query for the most-stripped variant (cache, then Nominatim)
         3. State-level fallback: Use approximate state center coordinates
 
         Args:
@@ -463,28 +1617,22 @@ class NominatimGeocoder:
                             source, geocode_method}
             or None if all fallbacks fail
         """
-        # TIER 1: Try original city name
-        result = self._geocode_single(city, state)
+        variants = self._strip_city_suffixes(city)
+
+        # TIER 1: Local candidate resolution
+        for backend in self.backends:
+            with PROFILER.stage(f'geocode.backend.{backend.name}'):
+                result = backend.resolve(variants, state)
+            if result:
+                with self._lock:
+                    self.backend_hits[backend.name] += 1
+                return self._tag_method(result, city, result.pop('matched_city'), result.pop('match_type'))
+
+        # TIER 2: Single remote query
+        variant = variants[-1]
+        result = self._geocode_single(variant, state)
         if result:
-            result['geocode_method'] = 'original'
-            logger.debug(f'  ✓ Geocoded via original query: {city}, {state}')
-            return result
-
-        # TIER 2: Try stripped city name variants
-        city_variants = self._strip_city_suffixes(city)
-        if len(city_variants) > 1:  # Only try if we have variants
-            logger.debug(f'  → Trying {len(city_variants)-1} stripped variants...')
-            for variant in city_variants[1:]:  # Skip first (original)
-                result = self._geocode_single(variant, state)
-                if result:
-                    result['geocode_method'] = 'suffix_stripped'
-                    result['original_city'] = city
-                    result['stripped_city'] = variant
-                    logger.info(
-                        f'  ✓ Geocoded via suffix stripping: '
-                        f'"{city}" → "{variant}", {state}'
-                    )
-                    return result
+            return self._tag_method(result, city, variant, 'exact')
 
         # TIER 3: State-level fallback
         logger.debug(f'  → Using state-level fallback for {state}')
@@ -500,21 +1648,156 @@ class NominatimGeocoder:
         logger.warning(f'  ✗ All geocoding tiers failed for {city}, {state}')
         return None
 
+    @staticmethod
+    def _tag_method(result: Dict, city: str, matched_city: str, match_type: str) -> Dict:
+        """
+        Record how a result was resolved in geocode_method.
+
+        'original' when the name matched as given, 'suffix_stripped' for a
+        stripped variant or word prefix, 'fuzzy' for an edit-distance match.
+        """
+        if match_type == 'fuzzy':
+            result['geocode_method'] = 'fuzzy'
+        elif matched_city != city:
+            result['geocode_method'] = 'suffix_stripped'
+        else:
+            result['geocode_method'] = 'original'
+            return result
+
+        result['original_city'] = city
+        if match_type == 'fuzzy':
+            result['matched_city'] = matched_city
+        else:
+            result['stripped_city'] = matched_city
+        logger.debug(f'  ✓ Geocoded via {result["geocode_method"]}: "{city}" → "{matched_city}"')
+        return result
+
     def _geocode_single(self, city: str, state: str) -> Optional[Dict]:
         """
-        Single geocoding attempt via Nominatim API.
+        Single geocoding attempt, served from the run memo or cache when possible.
 
         This is the original geocode() logic extracted into a helper
         to enable retry logic in the main geocode() method.
         """
-        # Rate limiting
-        time_since_last = time.time() - self.last_request_time
-        if time_since_last < self.RATE_LIMIT_DELAY:
-            time.sleep(self.RATE_LIMIT_DELAY - time_since_last)
+        with self._lock:
+            self.query_attempts += 1
+            self._local.attempts = getattr(self._local, 'attempts', 0) + 1
+
+            # Identical queries are resolved once per run and fanned out;
+            # concurrent callers wait on the in-flight lookup. Only
+            # definitive answers stay memoized (see below).
+            key = (city, state)
+            future = self._resolved.get(key)
+            owner = future is None
+            if owner:
+                future = self._resolved[key] = Future()
+            else:
+                self.memo_hits += 1
+
+        if owner:
+            try:
+                with PROFILER.stage('geocode.single'):
+                    result, definitive = self._resolve_query(city, state)
+            except Exception as e:
+                self._forget(key, future)
+                future.set_exception(e)
+                raise
+            if not definitive:
+                # Transient failure: callers already waiting share it, later
+                # ones query again instead of reusing the error
+                self._forget(key, future)
+            future.set_result(dict(result) if result else None)
+            return result
+
+        with PROFILER.stage('geocode.memo_wait'):
+            resolved = future.result()
+        return dict(resolved) if resolved else None
+
+    def _forget(self, key: Tuple[str, str], future: Future) -> None:
+        """Drop a memo entry, unless a later lookup has already replaced it."""
+        with self._lock:
+            if self._resolved.get(key) is future:
+                del self._resolved[key]
+
+    def geocode_counted(self, city: str, state: str) -> Tuple[Optional[Dict], int]:
+        """
+        geocode() plus the number of remote queries it attempted (memo hits included).
+
+        Returns:
+            (geocode() result, number of queries attempted)
+        """
+        self._local.attempts = 0
+        result = self.geocode(city, state)
+        return result, self._local.attempts
+
+    def geocode_many(
+        self,
+        locations: Iterable[Tuple[str, str]],
+        max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[Tuple[str, str], Optional[Dict], int]]:
+        """
+        Geocode many (city, state) locations concurrently.
+
+        Lookups run in a thread pool and share this geocoder's token-bucket
+        limiter, so request latency overlaps while the provider's rate budget
+        is still respected. Results are yielded as they complete, letting the
+        caller write them out while other lookups are in flight.
+
+        Args:
+            locations: Iterable of (city, state) tuples
+            max_workers: Pool size (default: the geocoder's max_workers)
+
+        Yields:
+            ((city, state), geocode() result, number of queries attempted)
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            future_to_location = {
+                executor.submit(self.geocode_counted, *location): location
+                for location in locations
+            }
+            for future in as_completed(future_to_location):
+                result, attempts = future.result()
+                yield future_to_location[future], result, attempts
+
+    def _resolve_query(self, city: str, state: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Resolve one remote query via the persistent cache, then Nominatim.
+
+        Returns:
+            (result, definitive): definitive is False for transient failures,
+            which are neither cached nor memoized
+        """
+        query = f'{city}, {state}, USA'
+
+        if self.cache:
+            with PROFILER.stage('geocode.cache_lookup'):
+                found, cached = self.cache.get(query)
+            if found:
+                logger.debug(f'Cache hit for {query}')
+                return (dict(cached) if cached else None), True
+
+        result, cacheable = self._query_nominatim(query)
+
+        if self.cache and cacheable:
+            self.cache.put(query, result)
+
+        return result, cacheable
+
+    def _query_nominatim(self, query: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Rate-limited request to the Nominatim API.
+
+        Returns:
+            (result, cacheable): cacheable is False for transient failures
+            (HTTP errors, timeouts) so they are retried on the next run
+        """
+        # Rate limiting (shared across threads); the wait is reported
+        # separately from request latency
+        if self.limiter:
+            PROFILER.record('geocode.rate_limit_wait', self.limiter.acquire())
 
         try:
             # Query Nominatim API
-            query = f'{city}, {state}, USA'
             params = {
                 'q': query,
                 'format': 'json',
@@ -522,16 +1805,18 @@ class NominatimGeocoder:
                 'addressdetails': 1
             }
 
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
-            self.last_request_time = time.time()
+            with self._lock:
+                self.network_calls += 1
+            with PROFILER.stage('geocode.request'):
+                response = self.session.get(self.base_url, params=params, timeout=10)
 
             if response.status_code != 200:
                 logger.debug(f'Nominatim API error for {query}: {response.status_code}')
-                return None
+                return None, False
 
             results = response.json()
             if not results:
-                return None
+                return None, True
 
             result = results[0]
 
@@ -550,14 +1835,208 @@ class NominatimGeocoder:
                 'display_name': result.get('display_name', ''),
                 'geocode_confidence': confidence,
                 'geocode_source': 'nominatim'
-            }
+            }, True
 
         except requests.exceptions.RequestException as e:
-            logger.debug(f'Request error geocoding {city}, {state}: {e}')
-            return None
+            logger.debug(f'Request error geocoding {query}: {e}')
+            return None, False
         except (ValueError, KeyError) as e:
-            logger.debug(f'Parse error in geocoding {city}, {state}: {e}')
-            return None
+            logger.debug(f'Parse error in geocoding {query}: {e}')
+            return None, False
+
+
+class BufferedRowWriter:
+    """
+    Buffered writer for BigQuery rows.
+
+    Two modes:
+    - 'stream': rows accumulate and are sent with one insert_rows_json call
+      per batch, flushed when the buffer reaches max_rows or max_bytes, or
+      max_interval seconds after the last flush
+    - 'load': rows are appended to a local NDJSON file and written with a
+      single load job on flush/close (for large backfills; no streaming
+      insert charges)
+
+    Per-row errors from every batch are collected in `failed_rows`.
+    """
+
+    MAX_ROWS = 500  # BigQuery recommends <= 500 rows per insertAll request
+    MAX_BYTES = 5 * 1024 * 1024  # Well under the 10 MB request limit
+    MAX_INTERVAL = 30.0  # Seconds
+
+    def __init__(
+        self,
+        client,
+        table_ref: str,
+        mode: str = 'stream',
+        max_rows: int = MAX_ROWS,
+        max_bytes: int = MAX_BYTES,
+        max_interval: float = MAX_INTERVAL,
+        staging_dir: Optional[str] = None,
+        schema: Optional[List] = None,
+        write_disposition: str = 'WRITE_APPEND'
+    ):
+        """
+        Args:
+            client: bigquery.Client (or any object with the same insert/load methods)
+            table_ref: Destination table (project.dataset.table)
+            mode: 'stream' or 'load'
+            max_rows: Flush after this many buffered rows (stream mode)
+            max_bytes: Flush after this many buffered JSON bytes (stream mode)
+            max_interval: Flush when this many seconds passed since the last flush
+            staging_dir: Directory for the NDJSON staging file (load mode)
+            schema: Table schema for the load job (needed if the table may not exist)
+            write_disposition: Load job write disposition (load mode)
+        """
+        if mode not in ('stream', 'load'):
+            raise ValueError(f'Unknown write mode: {mode}')
+
+        self.client = client
+        self.table_ref = table_ref
+        self.mode = mode
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_interval = max_interval
+        self.schema = schema
+        self.write_disposition = write_disposition
+
+        self._lock = threading.Lock()
+        self._rows: List[Dict] = []
+        self._bytes = 0
+        self._last_flush = time.monotonic()
+        self._staging = None
+        if mode == 'load':
+            self._staging = tempfile.NamedTemporaryFile(
+                mode='w+b', suffix='.ndjson', prefix='agency_locations_', dir=staging_dir, delete=False
+            )
+        self._staged_rows = 0
+
+        self.rows_written = 0
+        self.requests = 0
+        self.failed_rows: List[Tuple[str, Any]] = []  # (org_name, errors)
+        self.staged_org_names: List[str] = []  # Every row sent to the load job (load mode)
+
+    def add(self, row: Dict) -> None:
+        """Buffer a row, flushing if a size or time threshold is reached."""
+        encoded = json.dumps(row).encode('utf-8')
+        with self._lock:
+            if self.mode == 'load':
+                self._staging.write(encoded + b'\n')
+                self._staged_rows += 1
+                self.staged_org_names.append(row.get('org_name'))
+                return
+
+            self._rows.append(row)
+            self._bytes += len(encoded)
+            if (
+                len(self._rows) >= self.max_rows
+                or self._bytes >= self.max_bytes
+                or time.monotonic() - self._last_flush >= self.max_interval
+            ):
+                self._flush_stream()
+
+    def flush(self) -> None:
+        """Send buffered rows now (stream mode; load mode waits for close)."""
+        with self._lock:
+            if self.mode == 'stream':
+                self._flush_stream()
+
+    def close(self) -> None:
+        """Flush everything: remaining stream rows, or the single load job."""
+        with self._lock:
+            if self.mode == 'stream':
+                self._flush_stream()
+            elif self._staging is not None:
+                self._run_load_job()
+
+    def succeeded(self, org_names: Iterable[str]) -> List[str]:
+        """The given agencies minus those with a row in failed_rows."""
+        failed = {org_name for org_name, _ in self.failed_rows}
+        return [org_name for org_name in org_names if org_name not in failed]
+
+    def __enter__(self) -> 'BufferedRowWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _flush_stream(self) -> None:
+        """Insert buffered rows with one streaming request. Caller holds the lock."""
+        rows, self._rows, self._bytes = self._rows, [], 0
+        self._last_flush = time.monotonic()
+        if not rows:
+            return
+
+        self.requests += 1
+        try:
+            with PROFILER.stage('bigquery.stream_insert', items=len(rows)):
+                errors = self.client.insert_rows_json(self.table_ref, rows)
+        except Exception as e:
+            logger.error(f'Batch insert of {len(rows)} rows failed: {e}')
+            self.failed_rows.extend((row.get('org_name'), str(e)) for row in rows)
+            return
+
+        failed_indexes = set()
+        for error in errors or []:
+            index = error.get('index')
+            failed_indexes.add(index)
+            org_name = rows[index].get('org_name') if index is not None else None
+            self.failed_rows.append((org_name, error.get('errors')))
+
+        self.rows_written += len(rows) - len(failed_indexes)
+        if failed_indexes:
+            logger.error(f'{len(failed_indexes)} of {len(rows)} rows rejected in batch insert')
+
+    def _run_load_job(self) -> None:
+        """Load the staged NDJSON file with one load job. Caller holds the lock."""
+        staging, self._staging = self._staging, None
+        staged_rows, self._staged_rows = self._staged_rows, 0
+        try:
+            if not staged_rows:
+                return
+
+            staging.flush()
+            staging.seek(0)
+            job_config = bigquery.LoadJobConfig(
+                source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+                write_disposition=self.write_disposition,
+                schema=self.schema
+            )
+            self.requests += 1
+            try:
+                with PROFILER.stage('bigquery.load_job', items=staged_rows):
+                    job = self.client.load_table_from_file(staging, self.table_ref, job_config=job_config)
+                    job.result()
+                self.rows_written += staged_rows
+            except Exception as e:
+                errors = getattr(e, 'errors', None) or str(e)
+                logger.error(f'Load job of {staged_rows} rows failed: {errors}')
+                # The job is all or nothing: every staged row failed
+                self.failed_rows.extend((org_name, errors) for org_name in self.staged_org_names)
+        finally:
+            staging.close()
+            os.unlink(staging.name)
+
+
+@dataclass
+class DiscoverySource:
+    """One source table for agency discovery, with its high-water mark."""
+    table_id: str  # project.dataset.table
+    config_id: Optional[str] = None  # dataset_pipeline_config row (None = ad hoc table)
+    watermark_column: Optional[str] = None  # Only rows at or after high_water_mark are scanned
+    high_water_mark: Optional[datetime] = None
+    last_modified: Optional[datetime] = None  # Table modification time at the last discovery
+
+
+@dataclass
+class AgencyDiscovery:
+    """Result of one discovery query plus the watermarks to record once the run succeeds."""
+    agencies: List[str]
+    scanned: List[str]  # config_ids (or table IDs) whose rows were read
+    skipped: List[str]  # Unchanged since the last discovery
+    watermarks: Dict[str, Tuple[Optional[datetime], Optional[datetime]]]  # config_id -> (high water, modified)
+    bytes_processed: int = 0
+    bytes_billed: int = 0
 
 
 class BigQueryManager:
@@ -566,16 +2045,202 @@ class BigQueryManager:
     PROJECT_ID = 'durango-deflock'
     DATASET_ID = 'FlockML'
     TABLE_ID = 'agency_locations'
+    CONFIG_TABLE = 'dataset_pipeline_config'
 
-    def __init__(self):
-        """Initialize BigQuery client."""
-        self.client = bigquery.Client(project=self.PROJECT_ID)
+    # Scanned in full when dataset_pipeline_config cannot be read
+    DEFAULT_SOURCE_TABLES = [
+        'durango-deflock.DurangoPD.October2025',
+    ]
+
+    # Rows with real coordinates; anything else is rediscovered and retried
+    GEOCODED_PREDICATE = (
+        "latitude IS NOT NULL AND longitude IS NOT NULL "
+        "AND geocode_source IN ('nominatim', 'gazetteer', 'manual')"
+    )
+
+    SCHEMA = [
+        bigquery.SchemaField('org_name', 'STRING', mode='REQUIRED'),
+        bigquery.SchemaField('city', 'STRING'),
+        bigquery.SchemaField('state', 'STRING'),
+        bigquery.SchemaField('latitude', 'FLOAT64'),
+        bigquery.SchemaField('longitude', 'FLOAT64'),
+        bigquery.SchemaField('geocode_confidence', 'STRING'),
+        bigquery.SchemaField('geocode_source', 'STRING', mode='REQUIRED'),
+        bigquery.SchemaField('display_name', 'STRING'),
+        bigquery.SchemaField('geocode_timestamp', 'TIMESTAMP'),
+        bigquery.SchemaField('notes', 'STRING'),
+    ]
+
+    def __init__(self, client=None):
+        """
+        Initialize BigQuery client.
+
+        Args:
+            client: Optional pre-built client (e.g. a fake for tests)
+        """
+        self.client = client or make_client(self.PROJECT_ID)
         self.table_ref = f'{self.PROJECT_ID}.{self.DATASET_ID}.{self.TABLE_ID}'
+        self.writer: Optional[BufferedRowWriter] = None
+        self.staging_ref: Optional[str] = None
+        self.upserted_rows = 0
+
+    @staticmethod
+    def row_quality_sql(alias: str = '') -> str:
+        """
+        SQL expression ranking how good an agency_locations row is.
+
+        Manual corrections beat everything, then rows with coordinates, then
+        confidence, then anything more precise than a state-level fallback.
+        Newer rows win ties (handled by callers).
+
+        Args:
+            alias: Table alias to qualify columns with (e.g. 'S')
+        """
+        p = f'{alias}.' if alias else ''
+        return (
+            f"(IF({p}geocode_source = 'manual', 1000, 0)"
+            f" + IF({p}latitude IS NOT NULL AND {p}longitude IS NOT NULL, 100, 0)"
+            f" + CASE {p}geocode_confidence WHEN 'high' THEN 30 WHEN 'medium' THEN 20 WHEN 'low' THEN 10 ELSE 0 END"
+            f" + IF({p}geocode_source = 'state_fallback', 0, 1))"
+        )
+
+    def ensure_table(self) -> None:
+        """
+        Create agency_locations (as in sql/15_create_agency_locations_table.sql)
+        if it does not exist yet, e.g. in a fresh local storage backend.
+        """
+        table = bigquery.Table(self.table_ref, schema=self.SCHEMA)
+        table.time_partitioning = bigquery.TimePartitioning(field='geocode_timestamp')
+        self.client.create_table(table, exists_ok=True)
+
+    def start_batch(self, mode: str = 'stream', **options) -> BufferedRowWriter:
+        """
+        Buffer insert_agency_location rows instead of inserting one at a time.
+
+        Args:
+            mode: 'stream' (batched insert_rows_json), 'load' (one load job)
+                  or 'upsert' (load into a staging table, then one MERGE
+                  keeping the best row per org_name)
+            **options: Passed to BufferedRowWriter (max_rows, max_bytes, ...)
+
+        Returns:
+            The active BufferedRowWriter
+        """
+        self.close()
+        if mode == 'upsert':
+            run_id = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+            self.staging_ref = f'{self.table_ref}_staging_{run_id}'
+            self.writer = BufferedRowWriter(
+                self.client, self.staging_ref, mode='load',
+                schema=self.SCHEMA, write_disposition='WRITE_TRUNCATE', **options
+            )
+        else:
+            self.writer = BufferedRowWriter(self.client, self.table_ref, mode=mode, **options)
+        return self.writer
+
+    def close(self) -> None:
+        """
+        Flush and detach the active batch writer, merging staged rows in upsert mode.
+
+        If the MERGE fails, every staged row is added to the writer's
+        failed_rows (so the journal keeps it pending) and the staging table
+        is kept for inspection or a manual MERGE.
+        """
+        if self.writer:
+            writer, self.writer = self.writer, None
+            writer.close()
+            if self.staging_ref:
+                staging_ref, self.staging_ref = self.staging_ref, None
+                if writer.rows_written:
+                    try:
+                        self.merge_staged_rows(staging_ref)
+                    except Exception as e:
+                        logger.error(f'MERGE of staged rows failed; keeping staging table {staging_ref}: {e}')
+                        writer.failed_rows.extend((org_name, str(e)) for org_name in writer.staged_org_names)
+                        return
+                self.client.delete_table(staging_ref, not_found_ok=True)
+
+    def merge_staged_rows(self, staging_ref: str) -> int:
+        """
+        Upsert staged rows into agency_locations with a single MERGE.
+
+        The staging table is first reduced to its best row per org_name; an
+        existing row is replaced only if the staged row is at least as good,
+        so a successful geocode is never overwritten by a later failure.
+
+        Args:
+            staging_ref: Staging table ID with the agency_locations schema
+
+        Returns:
+            Number of rows inserted or updated
+
+        Raises:
+            Any error from the query job; the caller decides what is lost
+        """
+        columns = [field.name for field in self.SCHEMA]
+        query = f"""
+        MERGE `{self.table_ref}` T
+        USING (
+            SELECT *
+            FROM `{staging_ref}`
+            WHERE TRUE
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY org_name
+                ORDER BY {self.row_quality_sql()} DESC, geocode_timestamp DESC
+            ) = 1
+        ) S
+        ON T.org_name = S.org_name
+        WHEN MATCHED AND {self.row_quality_sql('S')} >= {self.row_quality_sql('T')} THEN
+            UPDATE SET {', '.join(f'{c} = S.{c}' for c in columns if c != 'org_name')}
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(columns)}) VALUES ({', '.join(f'S.{c}' for c in columns)})
+        """
+        with PROFILER.stage('bigquery.merge'):
+            job = self.client.query(query)
+            job.result()
+        affected = job.num_dml_affected_rows or 0
+        self.upserted_rows += affected
+        logger.info(f'Upserted {affected} agency rows via MERGE')
+        return affected
+
+    def compact_table(self) -> bool:
+        """
+        One-time cleanup: keep only the best row per org_name.
+
+        Needed once for tables populated by append-only runs; afterwards
+        upsert mode keeps one row per agency.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        query = f"""
+        CREATE OR REPLACE TABLE `{self.table_ref}`
+        PARTITION BY DATE(geocode_timestamp)
+        CLUSTER BY org_name
+        AS
+        SELECT *
+        FROM `{self.table_ref}`
+        WHERE TRUE
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY org_name
+            ORDER BY {self.row_quality_sql()} DESC, geocode_timestamp DESC
+        ) = 1
+        """
+        try:
+            self.client.query(query).result()
+            logger.info('Compacted agency_locations to one row per org_name')
+            return True
+        except Exception as e:
+            logger.error(f'Error compacting agency_locations: {e}')
+            return False
 
     def get_unique_agencies(self, source_tables: List[str]) -> List[str]:
         """
         Get unique agencies from source tables that haven't been successfully geocoded yet.
 
+        Every table is scanned in full; see discover_agencies for
+        incremental discovery.
+
         Includes:
         - Agencies not in the table at all
         - Agencies with NULL coordinates (failed attempts)
@@ -586,37 +2251,226 @@ class BigQueryManager:
         Returns:
             List of unique org_names not yet successfully geocoded
         """
-        # Get agencies from source tables
-        union_queries = [
-            f'SELECT DISTINCT org_name FROM `{table}`'
-            for table in source_tables
+        sources = [DiscoverySource(table_id=table) for table in source_tables]
+        return self.discover_agencies(sources).agencies
+
+    def get_discovery_sources(self, full_scan: bool = False) -> List[DiscoverySource]:
+        """
+        Enabled source tables and their high-water marks from dataset_pipeline_config.
+
+        Args:
+            full_scan: Ignore recorded watermarks (rescan every table in full)
+
+        Returns:
+            DiscoverySources in priority order; DEFAULT_SOURCE_TABLES if the
+            config table cannot be read
+        """
+        query = f"""
+        SELECT
+            config_id,
+            FORMAT('%s.%s.%s', dataset_project, dataset_name, source_table_name) AS table_id,
+            geocode_watermark_column,
+            geocode_high_water_mark,
+            geocode_last_modified
+        FROM `{self.PROJECT_ID}.{self.DATASET_ID}.{self.CONFIG_TABLE}`
+        WHERE enabled = TRUE
+        ORDER BY priority ASC
+        """
+        try:
+            rows = list(self.client.query(query).result())
+        except Exception as e:
+            logger.warning(f'Cannot read {self.CONFIG_TABLE} ({e}); scanning default source tables')
+            return [DiscoverySource(table_id=table) for table in self.DEFAULT_SOURCE_TABLES]
+
+        return [
+            DiscoverySource(
+                table_id=row['table_id'],
+                config_id=row['config_id'],
+                watermark_column=row['geocode_watermark_column'],
+                high_water_mark=None if full_scan else row['geocode_high_water_mark'],
+                last_modified=None if full_scan else row['geocode_last_modified'],
+            )
+            for row in rows
         ]
-        source_query = ' UNION ALL '.join(union_queries)
 
-        # Find agencies that either:
-        # 1. Don't exist in agency_locations yet, OR
-        # 2. Exist but have NULL coordinates (failed geocoding)
+    def _source_scan(self, index: int, source: DiscoverySource, table) -> Tuple[str, List]:
+        """
+        SELECT of one source's distinct org_names (and latest watermark value).
+
+        Returns:
+            (SQL, query parameters)
+        """
+        column = source.watermark_column
+        if column is None and table is not None and table.time_partitioning is not None:
+            column = table.time_partitioning.field or '_PARTITIONTIME'
+
+        if column is None:
+            return (
+                f'SELECT org_name, {index} AS source_index, CAST(NULL AS TIMESTAMP) AS high_water '
+                f'FROM `{source.table_id}` GROUP BY org_name'
+            ), []
+
+        where = ''
+        params = []
+        if source.high_water_mark is not None:
+            # >= rescans the boundary partition so late rows there are not missed
+            column_type = 'TIMESTAMP'
+            if table is not None:
+                column_type = next(
+                    (field.field_type for field in table.schema if field.name == column), 'TIMESTAMP'
+                )
+            value = source.high_water_mark
+            if column_type == 'DATE':
+                value = value.date()
+            elif column_type == 'DATETIME':
+                value = value.replace(tzinfo=None)
+            else:
+                column_type = 'TIMESTAMP'
+            where = f'WHERE {column} >= @high_water_{index} '
+            params.append(bigquery.ScalarQueryParameter(f'high_water_{index}', column_type, value))
+        return (
+            f'SELECT org_name, {index} AS source_index, MAX(TIMESTAMP({column})) AS high_water '
+            f'FROM `{source.table_id}` {where}GROUP BY org_name'
+        ), params
+
+    def discover_agencies(self, sources: List[DiscoverySource]) -> AgencyDiscovery:
+        """
+        Find agencies in new source data that haven't been successfully geocoded yet.
+
+        Tables whose modification time is unchanged since their recorded
+        discovery are skipped from metadata alone; tables with a high-water
+        mark are scanned from it on (pruning older partitions); new tables
+        are scanned in full. When anything is skipped or filtered, agencies
+        already in agency_locations without real coordinates are added so
+        failed geocodes are still retried. The result is anti-joined against
+        geocoded agencies in the same query.
+
+        Args:
+            sources: Tables to discover from (see get_discovery_sources)
+
+        Returns:
+            AgencyDiscovery with the agency list, bytes scanned and the new
+            watermarks (pass to commit_watermarks after a successful run)
+        """
+        selects, params, scanned, skipped = [], [], [], []
+        watermarks: Dict[str, Tuple[Optional[datetime], Optional[datetime]]] = {}
+        scanned_sources: Dict[int, DiscoverySource] = {}
+        for source in sources:
+            name = source.config_id or source.table_id
+            table = None
+            if source.config_id is not None:
+                try:
+                    table = self.client.get_table(source.table_id)
+                except Exception as e:
+                    logger.warning(f'Skipping discovery source {name}: {e}')
+                    continue
+                if source.last_modified is not None and table.modified is not None \
+                        and table.modified <= source.last_modified:
+                    skipped.append(name)
+                    continue
+                watermarks[source.config_id] = (source.high_water_mark, table.modified)
+
+            index = len(scanned_sources)
+            sql, source_params = self._source_scan(index, source, table)
+            selects.append(sql)
+            params.extend(source_params)
+            scanned_sources[index] = source
+            scanned.append(name)
+
+        discovery = AgencyDiscovery(agencies=[], scanned=scanned, skipped=skipped, watermarks=watermarks)
+        incremental = bool(skipped) or any(source.high_water_mark for source in scanned_sources.values())
+        if incremental:
+            selects.append(
+                f'SELECT org_name, -1 AS source_index, CAST(NULL AS TIMESTAMP) AS high_water '
+                f'FROM `{self.table_ref}` GROUP BY org_name'
+            )
+        if not selects:
+            logger.info(f'No source changed since the last discovery ({len(skipped)} skipped)')
+            return discovery
+
+        source_query = '\n            UNION ALL\n            '.join(selects)
         query = f"""
-        WITH source_agencies AS (
+        WITH scanned AS (
             {source_query}
-        )
-        SELECT DISTINCT org_name
-        FROM source_agencies
-        WHERE org_name NOT IN (
+        ),
+        geocoded AS (
             SELECT DISTINCT org_name
             FROM `{self.table_ref}`
-            WHERE (latitude IS NOT NULL AND longitude IS NOT NULL)
-            AND geocode_source IN ('nominatim', 'manual')
+            WHERE {self.GEOCODED_PREDICATE}
         )
-        ORDER BY org_name
+        SELECT 'agency' AS kind, s.org_name, CAST(NULL AS INT64) AS source_index, CAST(NULL AS TIMESTAMP) AS high_water
+        FROM (SELECT DISTINCT org_name FROM scanned WHERE org_name IS NOT NULL) s
+        LEFT JOIN geocoded g ON s.org_name = g.org_name
+        WHERE g.org_name IS NULL
+        UNION ALL
+        SELECT 'watermark' AS kind, NULL, source_index, MAX(high_water)
+        FROM scanned
+        WHERE source_index >= 0
+        GROUP BY source_index
         """
 
         try:
-            results = self.client.query(query).result()
-            return [row['org_name'] for row in results]
+            job = self.client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=params))
+            rows = list(job.result())
         except Exception as e:
             logger.error(f'Error fetching unique agencies: {e}')
-            return []
+            discovery.watermarks = {}
+            return discovery
+
+        for row in rows:
+            if row['kind'] == 'agency':
+                discovery.agencies.append(row['org_name'])
+                continue
+            source = scanned_sources[row['source_index']]
+            if source.config_id in watermarks and row['high_water'] is not None:
+                watermarks[source.config_id] = (row['high_water'], watermarks[source.config_id][1])
+        discovery.agencies.sort()
+        discovery.bytes_processed = job.total_bytes_processed or 0
+        discovery.bytes_billed = job.total_bytes_billed or 0
+        logger.info(
+            f'Discovery scanned {len(scanned)} source(s), skipped {len(skipped)} unchanged: '
+            f'{discovery.bytes_processed / 1e6:.1f} MB processed, {discovery.bytes_billed / 1e6:.1f} MB billed'
+        )
+        return discovery
+
+    def commit_watermarks(self, discovery: AgencyDiscovery) -> bool:
+        """
+        Record the discovered high-water marks in dataset_pipeline_config.
+
+        Call only after the discovered agencies have been processed, so an
+        interrupted run rescans the same rows next time.
+
+        Returns:
+            True if successful (or nothing to record), False otherwise
+        """
+        if not discovery.watermarks:
+            return True
+        # Scalar parameters and CASE (rather than UNNEST of a STRUCT array)
+        # keep the statement portable to the local storage backend
+        params, high_water_cases, modified_cases = [], [], []
+        for i, (config_id, (high_water, last_modified)) in enumerate(discovery.watermarks.items()):
+            params += [
+                bigquery.ScalarQueryParameter(f'config_id_{i}', 'STRING', config_id),
+                bigquery.ScalarQueryParameter(f'high_water_{i}', 'TIMESTAMP', high_water),
+                bigquery.ScalarQueryParameter(f'last_modified_{i}', 'TIMESTAMP', last_modified),
+            ]
+            high_water_cases.append(f'WHEN @config_id_{i} THEN COALESCE(@high_water_{i}, geocode_high_water_mark)')
+            modified_cases.append(f'WHEN @config_id_{i} THEN @last_modified_{i}')
+        config_ids = ', '.join(f'@config_id_{i}' for i in range(len(discovery.watermarks)))
+        query = f"""
+        UPDATE `{self.PROJECT_ID}.{self.DATASET_ID}.{self.CONFIG_TABLE}`
+        SET geocode_high_water_mark = CASE config_id {' '.join(high_water_cases)} END,
+            geocode_last_modified = CASE config_id {' '.join(modified_cases)} END
+        WHERE config_id IN ({config_ids})
+        """
+        try:
+            job_config = bigquery.QueryJobConfig(query_parameters=params)
+            self.client.query(query, job_config=job_config).result()
+            logger.info(f'Recorded discovery watermarks for {len(discovery.watermarks)} source(s)')
+            return True
+        except Exception as e:
+            logger.error(f'Error recording discovery watermarks: {e}')
+            return False
 
     def get_failed_geocode_count(self) -> int:
         """Get count of agencies with NULL coordinates."""
@@ -668,6 +2522,9 @@ class BigQueryManager:
         """
         Insert or update agency location in BigQuery.
 
+        With an active batch (start_batch) the row is buffered and errors are
+        reported in bulk by the writer; otherwise it is inserted immediately.
+
         Args:
             org_name: Organization name (primary key)
             city: City name
@@ -678,7 +2535,7 @@ class BigQueryManager:
             geocode_source: 'nominatim' or 'manual'
             display_name: Full address from geocoder
             notes: Optional notes for manual corrections
-            geocode_method: 'original', 'suffix_stripped', 'state_level', etc.
+            geocode_method: 'original', 'suffix_stripped', 'fuzzy', 'state_level', etc.
 
         Returns:
             True if successful, False otherwise
@@ -688,30 +2545,35 @@ class BigQueryManager:
             method_note = f'[Method: {geocode_method}]'
             notes = f'{method_note} {notes}' if notes else method_note
 
-        rows_to_insert = [
-            {
-                'org_name': org_name,
-                'city': city,
-                'state': state,
-                'latitude': latitude,
-                'longitude': longitude,
-                'geocode_confidence': geocode_confidence,
-                'geocode_source': geocode_source,
-                'display_name': display_name,
-                'geocode_timestamp': datetime.utcnow().isoformat(),
-                'notes': notes
-            }
-        ]
+        row = {
+            'org_name': org_name,
+            'city': city,
+            'state': state,
+            'latitude': latitude,
+            'longitude': longitude,
+            'geocode_confidence': geocode_confidence,
+            'geocode_source': geocode_source,
+            'display_name': display_name,
+            'geocode_timestamp': datetime.utcnow().isoformat(),
+            'notes': notes
+        }
 
-        try:
-            errors = self.client.insert_rows_json(self.table_ref, rows_to_insert)
-            if errors:
-                logger.error(f'Insert errors for {org_name}: {errors}')
+        # Buffered adds are near-free; a sample here that includes a flush
+        # shows up as a slow outlier in the histogram
+        with PROFILER.stage('bigquery.insert_agency_location'):
+            if self.writer:
+                self.writer.add(row)
+                return True
+
+            try:
+                errors = self.client.insert_rows_json(self.table_ref, [row])
+                if errors:
+                    logger.error(f'Insert errors for {org_name}: {errors}')
+                    return False
+                return True
+            except Exception as e:
+                logger.error(f'Error inserting {org_name}: {e}')
                 return False
-            return True
-        except Exception as e:
-            logger.error(f'Error inserting {org_name}: {e}')
-            return False
 
     def get_geocoding_stats(self) -> Dict:
         """Get geocoding coverage statistics including method breakdown."""
@@ -725,6 +2587,7 @@ class BigQueryManager:
           -- Method breakdown (extract from notes field)
           COUNT(CASE WHEN notes LIKE '%[Method: original]%' THEN 1 END) as method_original,
           COUNT(CASE WHEN notes LIKE '%[Method: suffix_stripped]%' THEN 1 END) as method_suffix_stripped,
+          COUNT(CASE WHEN notes LIKE '%[Method: fuzzy]%' THEN 1 END) as method_fuzzy,
           COUNT(CASE WHEN notes LIKE '%[Method: state_level]%' THEN 1 END) as method_state_level
         FROM `{self.table_ref}`
         """
@@ -740,6 +2603,7 @@ class BigQueryManager:
                 'low_confidence': row['low_confidence'],
                 'method_original': row['method_original'],
                 'method_suffix_stripped': row['method_suffix_stripped'],
+                'method_fuzzy': row['method_fuzzy'],
                 'method_state_level': row['method_state_level']
             }
         except Exception as e:
@@ -748,69 +2612,291 @@ class BigQueryManager:
 
 
 def main():
+    """
+    Main entry point: run the geocoding pipeline and write the run report.
+
+    Per-stage timings and counters go to GEOCODE_RUN_REPORT (JSON, default
+    geocode_run_report.json). GEOCODE_PROFILE=cprofile|pyinstrument also
+    records a function-level profile (GEOCODE_PROFILE_OUT sets the path).
+    """
+    PROFILER.reset()
+    code_profiler = start_code_profiler(os.environ.get('GEOCODE_PROFILE'), os.environ.get('GEOCODE_PROFILE_OUT'))
+    try:
+        run_geocoding()
+    finally:
+        if code_profiler:
+            code_profiler.stop()
+        PROFILER.log_summary()
+        PROFILER.write_report(os.environ.get('GEOCODE_RUN_REPORT', 'geocode_run_report.json'))
+
+
+def run_geocoding():
     """Main geocoding orchestrator."""
     logger.info('Starting agency geocoding process...')
 
     # Initialize components
     parser = OrgNameParser()
-    geocoder = NominatimGeocoder()
-    llm_classifier = LLMStateClassifier()
+    # NOMINATIM_URL / NOMINATIM_RATE_LIMIT point at a self-hosted server with
+    # a higher request budget; the defaults respect the public usage policy
+    geocode_cache = GeocodeCache()
+
+    # GAZETTEER_PATHS lists Census Gazetteer files (os.pathsep-separated) for
+    # offline lookups; Nominatim is then only queried for gazetteer misses.
+    # Counties unique to one state also become local classification rules.
+    backends = []
+    rules = AgencyRuleClassifier()
+    gazetteer_paths = os.environ.get('GAZETTEER_PATHS')
+    if gazetteer_paths:
+        gazetteer = GazetteerIndex.from_files(gazetteer_paths.split(os.pathsep))
+        logger.info(f'Loaded offline gazetteer with {len(gazetteer)} places')
+        backends.append(GazetteerBackend(gazetteer))
+        rules.add_unique_counties(gazetteer)
+
+    rate_limit = os.environ.get('NOMINATIM_RATE_LIMIT')
+    geocoder = NominatimGeocoder(
+        cache=geocode_cache,
+        base_url=os.environ.get('NOMINATIM_URL'),
+        rate_limit=float(rate_limit) if rate_limit else None,
+        max_workers=int(os.environ.get('GEOCODE_WORKERS', NominatimGeocoder.MAX_WORKERS)),
+        backends=backends
+    )
+    # LLM_CACHE_PATH keeps LLM classifications across runs (and machines)
+    llm_cache = LLMClassificationCache(os.environ.get('LLM_CACHE_PATH', LLMClassificationCache.DEFAULT_PATH))
+    # LLM_WORKERS / LLM_REQUESTS_PER_MINUTE / LLM_TOKENS_PER_MINUTE bound the
+    # per-name (sync) classifier to the account's rate limits
+    llm_rpm = os.environ.get('LLM_REQUESTS_PER_MINUTE')
+    llm_tpm = os.environ.get('LLM_TOKENS_PER_MINUTE')
+    llm_classifier = LLMStateClassifier(
+        cache=llm_cache,
+        max_workers=int(os.environ.get('LLM_WORKERS', LLMStateClassifier.MAX_WORKERS)),
+        requests_per_minute=float(llm_rpm) if llm_rpm else None,
+        tokens_per_minute=float(llm_tpm) if llm_tpm else None,
+        rules=rules,
+        # LLM_BATCH_TIMEOUT: seconds before an unfinished Message Batch is cancelled
+        batch_timeout=float(os.environ.get('LLM_BATCH_TIMEOUT', LLMStateClassifier.BATCH_TIMEOUT))
+    )
     bq = BigQueryManager()
+    bq.ensure_table()
+
+    # GEOCODE_JOURNAL records per-agency progress so an interrupted run can
+    # resume without repeating discovery, parsing, LLM calls or geocoding
+    journal = CheckpointJournal(os.environ.get('GEOCODE_JOURNAL', CheckpointJournal.DEFAULT_PATH))
+
+    # Buffer BigQuery writes: BQ_WRITE_MODE=upsert (stage, then one MERGE
+    # keeping the best row per org_name; default), stream (batched streaming
+    # inserts) or load (one append load job). Buffered rows are flushed on
+    # normal completion and at interpreter shutdown.
+    writer = bq.start_batch(mode=os.environ.get('BQ_WRITE_MODE', 'upsert'))
+    atexit.register(bq.close)
+    # BQ_COMPACT=1 rewrites agency_locations to one row per org_name once
+    # this run's rows are in (cleanup after older append-only runs)
+    compact = os.environ.get('BQ_COMPACT') == '1'
+
+    # Rows geocoded by an earlier run that never reached BigQuery are
+    # written first; GEOCODE_JOURNAL_REPLAY=1 does only this and exits
+    pending = journal.pending_rows()
+    for row in pending.values():
+        bq.insert_agency_location(**row)
+    if pending:
+        logger.info(f'Replaying {len(pending)} journaled rows not yet written to BigQuery')
+
+    def close_and_report(discovery: Optional[AgencyDiscovery] = None, **counters) -> None:
+        """Close the caches and record the run report counters (every exit)."""
+        PROFILER.set_counters({
+            'resumed_replayed': len(pending),
+            'network_calls': geocoder.network_calls,
+            'rows_written': writer.rows_written,
+            'write_requests': writer.requests,
+            'rows_rejected': len(writer.failed_rows),
+            'rows_upserted': bq.upserted_rows,
+            'discovery_sources_scanned': len(discovery.scanned) if discovery else 0,
+            'discovery_sources_skipped': len(discovery.skipped) if discovery else 0,
+            'discovery_bytes_processed': discovery.bytes_processed if discovery else 0,
+            'discovery_bytes_billed': discovery.bytes_billed if discovery else 0,
+            **counters
+        })
+        PROFILER.set_counters(geocode_cache.stats, prefix='geocode_cache.')
+        PROFILER.set_counters(geocoder.backend_hits, prefix='backend_hits.')
+        PROFILER.set_counters(llm_classifier.run_stats(), prefix='llm.')
+        PROFILER.set_counters(llm_cache.stats, prefix='llm_cache.')
+        llm_cache.close()
+        geocode_cache.close()
+
+    if os.environ.get('GEOCODE_JOURNAL_REPLAY') == '1':
+        bq.close()
+        written = writer.succeeded(pending)
+        journal.record_written(written)
+        journal.compact()
+        journal.close()
+        close_and_report()
+        logger.info(f'✓ Replayed {len(written)} rows ({len(pending) - len(written)} rejected)')
+        return
 
-    # Configure source tables
-    source_tables = [
-        'durango-deflock.DurangoPD.October2025',
-        # Add more tables as needed
-    ]
-
-    # Get unique agencies not yet geocoded
-    agencies = bq.get_unique_agencies(source_tables)
-    logger.info(f'Found {len(agencies)} unique agencies to geocode')
+    # Resume the agency list of an unfinished run; otherwise discover the
+    # agencies not yet geocoded from the enabled sources in
+    # dataset_pipeline_config: unchanged tables are skipped and the rest
+    # scanned from their high-water mark on (GEOCODE_FULL_SCAN=1 rescans
+    # everything)
+    discovery = None
+    agencies = journal.run_agencies
+    if agencies is not None:
+        logger.info(f'Resuming interrupted run of {len(agencies)} agencies from {journal.path}')
+        done_stages = ('geocoded', 'written')
+    else:
+        with PROFILER.stage('bigquery.discover_agencies'):
+            sources = bq.get_discovery_sources(full_scan=os.environ.get('GEOCODE_FULL_SCAN') == '1')
+            discovery = bq.discover_agencies(sources)
+        agencies = discovery.agencies
+        logger.info(f'Found {len(agencies)} unique agencies to geocode')
+        if agencies:
+            journal.start_run(agencies)
+        # BigQuery is authoritative on a fresh run: agencies it reports as
+        # missing (e.g. after delete_failed_geocodes) are geocoded again
+        done_stages = ('geocoded',)
+
+    completed = [org_name for org_name in agencies if journal.stage(org_name) in done_stages]
+    if completed:
+        logger.info(f'Skipping {len(completed)} agencies already geocoded in the journal')
+        done = set(completed)
+        agencies = [org_name for org_name in agencies if org_name not in done]
 
     if not agencies:
+        bq.close()
+        journal.record_written(writer.succeeded(pending))
+        if journal.run_agencies is not None:
+            journal.finish_run()
+        journal.compact()
+        journal.close()
+        if writer.failed_rows:
+            logger.warning('Some rows were not written; keeping watermarks and skipping compaction')
+        else:
+            if discovery:
+                bq.commit_watermarks(discovery)
+            if compact:
+                bq.compact_table()
+        close_and_report(discovery, agencies=0, resumed_skipped=len(completed))
         logger.info('All agencies already geocoded!')
         return
 
-    # Process each agency
-    success_count = 0
-    fail_count = 0
-    skip_count = 0
+    # Parse all agency names up front (each distinct name parsed once);
+    # names parsed or classified by an interrupted run reuse the journal
+    to_parse = [org_name for org_name in agencies if journal.parsed(org_name) is None]
+    parsed_columns = parser.parse_many(to_parse)
+    logger.info(f'Parsed {parsed_columns.unique_count} distinct agency names')
+    parsed_lookup = dict(zip(to_parse, zip(parsed_columns.city, parsed_columns.state)))
+
+    def needs_llm(org_name: str) -> bool:
+        journaled = journal.parsed(org_name)
+        if journaled:
+            return journaled[2] == 'failed'
+        return not parsed_lookup[org_name][1]
+
+    unparsed = [org_name for org_name in agencies if needs_llm(org_name)]
+
+    # Local rules (federal agencies, acronyms, universities, transit, tribal
+    # agencies, unique counties) resolve what they can without an API call
+    rule_matches = {
+        org_name: match
+        for org_name, match in rules.classify_many(unparsed).items()
+        if match
+    }
+    llm_names = [org_name for org_name in unparsed if org_name not in rule_matches]
+    if unparsed:
+        logger.info(f'Local rules resolved {len(rule_matches)} of {len(unparsed)} unparseable names')
 
+    # Group agencies resolved without the LLM by the (city, state) they
+    # geocode, so each location is queued once
+    plan: Dict[Tuple[str, str], List[str]] = {}
     for i, org_name in enumerate(agencies, 1):
-        logger.info(f'[{i}/{len(agencies)}] Processing: {org_name}')
-
-        # Parse agency name
-        parsed = parser.parse(org_name)
-        if not parsed:
-            # Try LLM classifier as fallback
-            logger.debug(f'  → Attempting LLM state classification...')
-            llm_state = llm_classifier.classify_state(org_name)
+        if needs_llm(org_name):
+            match = rule_matches.get(org_name)
+            if not match:
+                continue
+            # Rules that pin a place (campus, transit hub, tribal seat) geocode
+            # that place; the rest use the generic state placeholder
+            parsed_city, parsed_state = match.city or f'{match.state} Agency', match.state
+            journal.record_parsed(org_name, parsed_city, parsed_state, 'rules')
+            logger.info(
+                f'[{i}/{len(agencies)}] ✓ Rule classified state ({match.kind}: "{match.phrase}"): '
+                f'{org_name} → {parsed_state}'
+            )
+        elif journal.parsed(org_name):
+            parsed_city, parsed_state, _ = journal.parsed(org_name)
+        else:
+            parsed_city, parsed_state = parsed_lookup[org_name]
+            journal.record_parsed(org_name, parsed_city, parsed_state, 'parser')
+        plan.setdefault((parsed_city, parsed_state), []).append(org_name)
+
+    planned_queries = {
+        query
+        for city, state in plan
+        for query in geocoder.plan_queries(city, state)
+    }
+    logger.info(
+        f'Geocode plan: {len(plan)} unique locations, '
+        f'{len(planned_queries)} unique queries for {sum(len(v) for v in plan.values())} agencies '
+        f'(+{len(llm_names)} awaiting LLM classification)'
+    )
+
+    # Staged run: LLM classification, geocoding and BigQuery writes each get
+    # their own worker pool, connected by bounded queues (PIPELINE_QUEUE_SIZE)
+    # so a full downstream stage holds back its producers instead of letting
+    # work pile up in memory. Parser- and rule-resolved locations start
+    # geocoding immediately while the LLM works through the rest.
+    # LLM_BATCH_MODE=batch (one Message Batches job; default), prompts
+    # (multi-name prompts across LLM_WORKERS) or sync (one request per name).
+    llm_mode = os.environ.get('LLM_BATCH_MODE', 'batch')
+    if llm_mode not in ('batch', 'prompts', 'sync'):
+        raise ValueError(f'Unknown LLM_BATCH_MODE: {llm_mode}')
+    if llm_names:
+        logger.info(f'Classifying {len(llm_names)} unparseable names with the LLM ({llm_mode})')
+
+    tally = {'success': 0, 'failed': 0, 'skipped': 0, 'naive_queries': 0, 'locations': 0}
+    tally_lock = threading.Lock()
+    pipeline = StagePipeline(queue_size=int(os.environ.get('PIPELINE_QUEUE_SIZE', 1000)))
+
+    def classify_stage(names) -> None:
+        if llm_mode == 'sync':
+            names = [names]
+            llm_states = {names[0]: llm_classifier.classify_state(names[0])}
+        else:
+            with PROFILER.stage(f'llm.classify_many.{llm_mode}', items=len(names)):
+                llm_states = llm_classifier.classify_many(names, mode=llm_mode)
+
+        located: Dict[Tuple[str, str], List[str]] = {}
+        for org_name in names:
+            llm_state = llm_states.get(org_name)
             if llm_state:
                 # Use LLM-classified state with generic city placeholder
-                parsed_city = f'{llm_state} Agency'
-                parsed_state = llm_state
-                logger.info(f'  ✓ LLM classified state: {parsed_state}')
-            else:
-                logger.warning(f'  ✗ Failed to parse org_name (LLM also failed)')
-                skip_count += 1
-                bq.insert_agency_location(
-                    org_name=org_name,
-                    city=None,
-                    state=None,
-                    latitude=None,
-                    longitude=None,
-                    geocode_confidence=None,
-                    geocode_source='nominatim',
-                    display_name=None,
-                    notes='Parse and LLM classification failed'
-                )
+                journal.record_parsed(org_name, f'{llm_state} Agency', llm_state, 'llm')
+                logger.info(f'✓ LLM classified state: {org_name} → {llm_state}')
+                located.setdefault((f'{llm_state} Agency', llm_state), []).append(org_name)
                 continue
-        else:
-            parsed_city = parsed.city
-            parsed_state = parsed.state
 
-        # Geocode location
-        geocoded = geocoder.geocode(parsed_city, parsed_state)
+            logger.warning(f'✗ Failed to parse org_name (LLM also failed): {org_name}')
+            journal.record_parsed(org_name, None, None, 'failed')
+            pipeline.send('write', ('skipped', dict(
+                org_name=org_name,
+                city=None,
+                state=None,
+                latitude=None,
+                longitude=None,
+                geocode_confidence=None,
+                geocode_source='nominatim',
+                display_name=None,
+                notes='Parse and LLM classification failed'
+            )))
+        for location, org_names in located.items():
+            pipeline.send('geocode', (location, org_names))
+
+    def geocode_stage(item) -> None:
+        (parsed_city, parsed_state), org_names = item
+        geocoded, attempts = geocoder.geocode_counted(parsed_city, parsed_state)
+        with tally_lock:
+            tally['locations'] += 1
+            tally['naive_queries'] += attempts * len(org_names)
+            j = tally['locations']
+        logger.info(f'[{j}] Geocoded: {parsed_city}, {parsed_state} ({len(org_names)} agencies)')
 
         if geocoded:
             # Extract geocode_method (with backwards compatibility)
@@ -820,6 +2906,7 @@ def main():
             method_indicator = {
                 'original': '✓',
                 'suffix_stripped': '↻',
+                'fuzzy': '≈',
                 'state_level': '⚠'
             }.get(geocode_method, '✓')
 
@@ -828,42 +2915,99 @@ def main():
                 f'{geocoded["longitude"]:.4f} '
                 f'({geocoded["geocode_confidence"]}, {geocode_method})'
             )
-            success_count += 1
 
             # Build notes with additional context
             notes = None
             if geocode_method == 'suffix_stripped':
                 notes = f'Stripped "{geocoded.get("original_city")}" → "{geocoded.get("stripped_city")}"'
+            elif geocode_method == 'fuzzy':
+                notes = f'Fuzzy matched "{geocoded.get("original_city")}" → "{geocoded.get("matched_city")}"'
             elif geocode_method == 'state_level':
                 notes = 'Using state-level coordinates (imprecise)'
 
-            bq.insert_agency_location(
-                org_name=org_name,
-                city=parsed_city,
-                state=parsed_state,
-                latitude=geocoded['latitude'],
-                longitude=geocoded['longitude'],
-                geocode_confidence=geocoded['geocode_confidence'],
-                geocode_source=geocoded['geocode_source'],
-                display_name=geocoded['display_name'],
-                geocode_method=geocode_method,
-                notes=notes
-            )
+            for org_name in org_names:
+                pipeline.send('write', ('success', dict(
+                    org_name=org_name,
+                    city=parsed_city,
+                    state=parsed_state,
+                    latitude=geocoded['latitude'],
+                    longitude=geocoded['longitude'],
+                    geocode_confidence=geocoded['geocode_confidence'],
+                    geocode_source=geocoded['geocode_source'],
+                    display_name=geocoded['display_name'],
+                    geocode_method=geocode_method,
+                    notes=notes
+                )))
         else:
             # This branch should now be very rare (only if state code is invalid)
             logger.warning(f'  ✗ All geocoding tiers failed for {parsed_city}, {parsed_state}')
-            fail_count += 1
-            bq.insert_agency_location(
-                org_name=org_name,
-                city=parsed_city,
-                state=parsed_state,
-                latitude=None,
-                longitude=None,
-                geocode_confidence=None,
-                geocode_source='nominatim',
-                display_name=None,
-                notes='All geocoding tiers failed'
-            )
+            for org_name in org_names:
+                pipeline.send('write', ('failed', dict(
+                    org_name=org_name,
+                    city=parsed_city,
+                    state=parsed_state,
+                    latitude=None,
+                    longitude=None,
+                    geocode_confidence=None,
+                    geocode_source='nominatim',
+                    display_name=None,
+                    notes='All geocoding tiers failed'
+                )))
+
+    def write_stage(batch) -> None:
+        # Single worker: the journal entry precedes the buffered insert, and
+        # the BufferedRowWriter flushes full batches to BigQuery
+        for outcome, row in batch:
+            tally[outcome] += 1
+            journal.record_geocoded(row['org_name'], row)
+            bq.insert_agency_location(**row)
+
+    if llm_mode == 'batch':
+        # Every name goes into one Message Batches job
+        pipeline.add_stage('llm', classify_stage, batch_size=max(len(llm_names), 1))
+    elif llm_mode == 'prompts':
+        pipeline.add_stage(
+            'llm', classify_stage, workers=llm_classifier.max_workers,
+            batch_size=llm_classifier.BATCH_PROMPT_SIZE
+        )
+    else:
+        pipeline.add_stage('llm', classify_stage, workers=llm_classifier.max_workers)
+    pipeline.add_stage('geocode', geocode_stage, workers=geocoder.max_workers)
+    pipeline.add_stage('write', write_stage, batch_size=writer.max_rows, batch_wait=1.0)
+
+    pipeline.run({'llm': llm_names, 'geocode': plan.items()})
+    pipeline.log_summary()
+
+    success_count = tally['success']
+    fail_count = tally['failed']
+    skip_count = tally['skipped']
+    naive_queries = tally['naive_queries']
+    unique_queries = geocoder.query_attempts - geocoder.memo_hits
+
+    with PROFILER.stage('bigquery.close'):
+        bq.close()
+    # A failed write (rejected rows, load job or MERGE) leaves the
+    # watermarks where they were, so those agencies are discovered again
+    write_ok = not writer.failed_rows
+    if not write_ok:
+        logger.warning(
+            f'{len(writer.failed_rows)} rows were not written; keeping watermarks and skipping compaction'
+        )
+    elif compact:
+        with PROFILER.stage('bigquery.compact'):
+            bq.compact_table()
+
+    # Rows are durable once the batch is closed; rejected rows stay pending
+    # in the journal for the next run (or GEOCODE_JOURNAL_REPLAY=1)
+    journal.record_written(
+        org_name for org_name in writer.succeeded(list(pending) + agencies)
+        if journal.stage(org_name) == 'geocoded'
+    )
+    journal.finish_run()
+    journal.compact()
+    journal.close()
+    if discovery and write_ok:
+        bq.commit_watermarks(discovery)
 
     # Print summary
     logger.info('\n' + '='*60)
@@ -873,6 +3017,63 @@ def main():
     logger.info(f'Successfully geocoded:   {success_count}')
     logger.info(f'Geocoding failed:        {fail_count}')
     logger.info(f'Parsing skipped:         {skip_count}')
+    logger.info(f'Resumed from journal:    {len(completed)} skipped, {len(pending)} rows replayed')
+    if discovery:
+        logger.info(
+            f'Discovery:               {len(discovery.scanned)} source(s) scanned, '
+            f'{len(discovery.skipped)} unchanged; {discovery.bytes_processed:,} bytes processed, '
+            f'{discovery.bytes_billed:,} bytes billed'
+        )
+    if unparsed:
+        logger.info(
+            f'Local rule classifier:   {len(rule_matches)} of {len(unparsed)} unparseable names '
+            f'({len(rule_matches) / len(unparsed):.1%} of LLM calls avoided)'
+        )
+    llm_stats = llm_classifier.run_stats()
+    logger.info(
+        f'LLM classification:      {len(llm_names)} names in {llm_stats["api_requests"]} API request(s) '
+        f'({llm_stats["retries"]} retries, {llm_stats["rate_limited"]} rate-limited, '
+        f'{llm_stats["errors"]} failed; {llm_stats["error_rate"]:.1%} error rate)'
+    )
+    logger.info(
+        f'LLM cache:               {llm_cache.stats["loaded"]} warm-loaded, '
+        f'{llm_cache.stats["writes"]} new answers stored'
+    )
+    logger.info(f'Geocode queries (naive): {naive_queries}')
+    logger.info(f'Geocode queries (dedup): {unique_queries} ({naive_queries - unique_queries} saved by deduplication)')
+    logger.info(
+        f'BigQuery writes:         {writer.rows_written} rows in {writer.requests} '
+        f'{"load job" if writer.mode == "load" else "insert request"}(s)'
+    )
+    if bq.upserted_rows:
+        logger.info(f'Agency rows upserted:    {bq.upserted_rows}')
+    if writer.failed_rows:
+        logger.error(f'Rows rejected by BigQuery: {len(writer.failed_rows)}')
+        for org_name, errors in writer.failed_rows[:20]:
+            logger.error(f'  - {org_name}: {errors}')
+    for name, hits in geocoder.backend_hits.items():
+        logger.info(f'Resolved offline ({name}): {hits}')
+    logger.info(f'Nominatim network calls: {geocoder.network_calls}')
+    logger.info(
+        f'Geocode cache:           {geocode_cache.stats["hits"]} hits, '
+        f'{geocode_cache.stats["negative_hits"]} negative hits, '
+        f'{geocode_cache.stats["misses"]} misses '
+        f'({geocode_cache.stats["expired"]} expired)'
+    )
+
+    close_and_report(
+        discovery,
+        agencies=len(agencies),
+        geocoded=success_count,
+        geocode_failed=fail_count,
+        parse_skipped=skip_count,
+        resumed_skipped=len(completed),
+        rule_resolved=len(rule_matches),
+        naive_queries=naive_queries,
+        unique_queries=unique_queries,
+    )
+    for stage_name, stage_stats in pipeline.report().items():
+        PROFILER.set_counters(stage_stats, prefix=f'pipeline.{stage_name}.')
 
     # Fetch and display coverage statistics
     stats = bq.get_geocoding_stats()
@@ -886,6 +3087,7 @@ def main():
         logger.info(f'\nGeocoding method breakdown:')
         logger.info(f'  - Original query:        {stats.get("method_original", 0)}')
         logger.info(f'  - Suffix stripped:       {stats.get("method_suffix_stripped", 0)}')
+        logger.info(f'  - Fuzzy matched:         {stats.get("method_fuzzy", 0)}')
         logger.info(f'  - State-level fallback:  {stats.get("method_state_level", 0)}')
 
     logger.info('='*60)
@@ -27,9 +27,10 @@ from dataclasses import dataclass
 from typing import List, Dict, Optional
 from datetime import datetime
 
-from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
 
+from utils import make_client
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -79,7 +80,7 @@ class PipelineOrchestrator:
             max_workers: Maximum number of parallel workers
             dry_run: If True, show what would be processed without executing
         """
-        self.client = bigquery.Client(project=self.PROJECT_ID)
+        self.client = make_client(self.PROJECT_ID)
         self.parallel = parallel
         self.max_workers = max_workers
         self.dry_run = dry_run
@@ -20,9 +20,10 @@ import sys
 from datetime import datetime
 from typing import Optional, List
 
-from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
 
+from utils import make_client
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -38,7 +39,7 @@ class DatasetRegistry:
     CONFIG_TABLE = 'dataset_pipeline_config'
 
     def __init__(self):
-        self.client = bigquery.Client(project=self.PROJECT_ID)
+        self.client = make_client(self.PROJECT_ID)
 
     def register_dataset(
         self,
@@ -5,12 +5,19 @@ Provides common functionality for BigQuery operations, logging, and configuratio
 """
 
 import logging
+import os
+import sys
 from typing import Optional, Dict, Any
 from datetime import datetime
 
 from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
 
+# storage_backend lives one level up, in python/; the other orchestrator
+# scripts import make_client from here
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from storage_backend import make_client
+
 
 # Configure logging
 def setup_logging(log_level: str = 'INFO', log_file: Optional[str] = None) -> logging.Logger:
@@ -62,7 +69,7 @@ class BigQueryClient:
         """
         self.project_id = project_id
         self.location = location
-        self.client = bigquery.Client(project=project_id, location=location)
+        self.client = make_client(project_id, location=location)
 
     def execute_query(self, query: str, timeout: int = 3600) -> bigquery.QueryJob:
         """
@@ -0,0 +1,371 @@
+"""
+Suspicion Scoring Spec
+
+One declarative definition of the suspicion risk factors - weights, the
+column conditions that trigger them and the score levels - shared by the
+Python report (suspicion_ranking_report.py) and the SQL view
+(sql/27_suspicion_ranking_analysis.sql). Changing a weight or adding a
+factor is an edit to suspicion_scoring.json; both engines are generated
+from it.
+
+Conditions are small JSON trees:
+
+    {"column": "case_num", "transform": ["strip", "lower"], "in": ["", "n/a"]}
+    {"column": "reason", "transform": ["lower"], "contains": "aoa"}
+    {"column": "reason_category", "equals": "OTHER"}
+    {"column": "is_participating_agency", "is_true": true}
+    {"any": [<condition>, ...]}    {"all": [<condition>, ...]}
+
+Text conditions treat NULL (and a missing column) as ''. Factor i is bit i
+of a row's risk mask; scores and risk_factors strings are precomputed per
+mask, so every row's score is computed once.
+"""
+
+import os
+import re
+import json
+import textwrap
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suspicion_scoring.json')
+
+TRANSFORMS = {
+    'strip': (lambda s: s.str.strip(), str.strip, 'TRIM({})'),
+    'lower': (lambda s: s.str.lower(), str.lower, 'LOWER({})'),
+}
+TEXT_OPERATORS = ('equals', 'in', 'contains')
+_IDENTIFIER = re.compile(r'^[A-Za-z_]\w*$')
+
+
+def _sql_literal(value: str) -> str:
+    """BigQuery string literal."""
+    return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def _validate_condition(condition: Dict, where: str) -> None:
+    if not isinstance(condition, dict):
+        raise ValueError(f'{where}: condition must be an object')
+    for combinator in ('any', 'all'):
+        if combinator in condition:
+            if len(condition) != 1 or not condition[combinator]:
+                raise ValueError(f'{where}: "{combinator}" takes a non-empty list and nothing else')
+            for i, child in enumerate(condition[combinator]):
+                _validate_condition(child, f'{where}.{combinator}[{i}]')
+            return
+    column = condition.get('column')
+    if not isinstance(column, str) or not _IDENTIFIER.match(column):
+        raise ValueError(f'{where}: invalid column {column!r}')
+    operators = [op for op in TEXT_OPERATORS + ('is_true',) if op in condition]
+    if len(operators) != 1:
+        raise ValueError(f'{where}: exactly one of equals/in/contains/is_true is required')
+    unknown = set(condition) - {'column', 'transform', operators[0]}
+    if unknown:
+        raise ValueError(f'{where}: unknown keys {sorted(unknown)}')
+    for transform in condition.get('transform', []):
+        if transform not in TRANSFORMS:
+            raise ValueError(f'{where}: unknown transform {transform!r}')
+    if operators[0] == 'is_true' and ('transform' in condition or condition['is_true'] is not True):
+        raise ValueError(f'{where}: is_true must be true and takes no transform')
+
+
+@dataclass
+class RiskFactor:
+    """One weighted risk factor."""
+    name: str
+    label: str
+    points: int
+    when: Dict
+    title: Optional[str] = None
+    description: Tuple[str, ...] = ()
+
+
+@dataclass
+class ScoringSpec:
+    """Compiled scoring spec (see module docstring)."""
+    factors: List[RiskFactor]
+    levels: List[Tuple[Optional[int], str]]
+    max_score: int = 100
+    no_factors_label: str = 'None'
+
+    def __post_init__(self):
+        self.scores, self.labels = self._mask_tables()
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'ScoringSpec':
+        """
+        Load a spec from JSON, or YAML when the file ends in .yaml/.yml.
+
+        Args:
+            path: Spec file (default: suspicion_scoring.json next to this module)
+        """
+        path = path or DEFAULT_SPEC_PATH
+        with open(path) as f:
+            if path.endswith(('.yaml', '.yml')):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError('YAML scoring specs require PyYAML (pip install pyyaml)')
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        return cls.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ScoringSpec':
+        """Validate and build a spec from its parsed JSON/YAML form."""
+        factors = []
+        for i, factor in enumerate(data.get('factors', [])):
+            where = f'factors[{i}]'
+            name = factor.get('name')
+            if not isinstance(name, str) or not _IDENTIFIER.match(name):
+                raise ValueError(f'{where}: invalid name {name!r}')
+            if not isinstance(factor.get('points'), int):
+                raise ValueError(f'{where}: points must be an integer')
+            _validate_condition(factor.get('when'), f'{where}.when')
+            factors.append(RiskFactor(
+                name=name,
+                label=factor.get('label', name),
+                points=factor['points'],
+                when=factor['when'],
+                title=factor.get('title'),
+                description=tuple(factor.get('description', ())),
+            ))
+        if not factors:
+            raise ValueError('Scoring spec has no factors')
+        if len({factor.name for factor in factors}) != len(factors):
+            raise ValueError('Factor names must be unique')
+        if len(factors) > 16:
+            raise ValueError('At most 16 factors are supported')
+
+        levels = [(level.get('max_score'), level['label']) for level in data.get('levels', [])]
+        if not levels or levels[-1][0] is not None:
+            raise ValueError('The last level must have no max_score (it catches every higher score)')
+        bounds = [bound for bound, _ in levels[:-1]]
+        if None in bounds or bounds != sorted(bounds):
+            raise ValueError('Level max_scores must be set and ascending')
+
+        return cls(
+            factors=factors,
+            levels=levels,
+            max_score=data.get('max_score', 100),
+            no_factors_label=data.get('no_factors_label', 'None'),
+        )
+
+    def _mask_tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Score (capped at max_score) and '|'-joined label for every factor bitmask."""
+        scores, labels = [], []
+        for mask in range(1 << len(self.factors)):
+            present = [factor for bit, factor in enumerate(self.factors) if mask >> bit & 1]
+            scores.append(min(sum(factor.points for factor in present), self.max_score))
+            labels.append('|'.join(factor.label for factor in present) or self.no_factors_label)
+        return np.array(scores, dtype=np.int64), np.array(labels, dtype=object)
+
+    def level(self, score: int) -> str:
+        """Level label for a score."""
+        for bound, label in self.levels:
+            if bound is None or score <= bound:
+                return label
+
+    # -- Vectorized (pandas) ------------------------------------------------
+
+    @staticmethod
+    def _text_flag(df: pd.DataFrame, column: str, test: Callable[[pd.Series], pd.Series]) -> np.ndarray:
+        """
+        Evaluate a string test once per distinct value of a column.
+
+        Search logs repeat a small set of reasons and categories, so the
+        string work is done on the factorized uniques and broadcast back to
+        every row by code.
+        """
+        null_flag = bool(test(pd.Series([''], dtype=object)).iloc[0])
+        if column not in df.columns:
+            return np.full(len(df), null_flag)
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values)
+        flags = test(pd.Series(uniques, dtype=object).astype(str)).to_numpy(dtype=bool)
+        # Null rows have code -1, which picks the appended null entry
+        return np.append(flags, null_flag)[codes]
+
+    def _column_flags(self, df: pd.DataFrame, condition: Dict) -> np.ndarray:
+        for combinator, reduce in (('any', np.logical_or), ('all', np.logical_and)):
+            if combinator in condition:
+                return reduce.reduce([self._column_flags(df, child) for child in condition[combinator]])
+
+        column = condition['column']
+        if 'is_true' in condition:
+            if column not in df.columns:
+                return np.zeros(len(df), dtype=bool)
+            return df[column].eq(True).fillna(False).to_numpy(dtype=bool)
+
+        transforms = [TRANSFORMS[name][0] for name in condition.get('transform', [])]
+
+        def test(values: pd.Series) -> pd.Series:
+            for transform in transforms:
+                values = transform(values)
+            if 'equals' in condition:
+                return values == condition['equals']
+            if 'in' in condition:
+                return values.isin(condition['in'])
+            return values.str.contains(condition['contains'], regex=False)
+
+        return self._text_flag(df, column, test)
+
+    def factor_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Risk factors of every row as a bitmask (bit i = factors[i])."""
+        mask = np.zeros(len(df), dtype=np.uint16)
+        for bit, factor in enumerate(self.factors):
+            mask |= self._column_flags(df, factor.when).astype(np.uint16) << bit
+        return mask
+
+    # -- Row at a time ------------------------------------------------------
+
+    def _row_flag(self, row: Any, condition: Dict) -> bool:
+        if 'any' in condition:
+            return any(self._row_flag(row, child) for child in condition['any'])
+        if 'all' in condition:
+            return all(self._row_flag(row, child) for child in condition['all'])
+
+        value = row.get(condition['column'])
+        if 'is_true' in condition:
+            try:
+                return bool(value == True)
+            except TypeError:  # pd.NA
+                return False
+
+        text = '' if value is None or pd.isna(value) else str(value)
+        for name in condition.get('transform', []):
+            text = TRANSFORMS[name][1](text)
+        if 'equals' in condition:
+            return text == condition['equals']
+        if 'in' in condition:
+            return text in condition['in']
+        return condition['contains'] in text
+
+    def row_mask(self, row: Any) -> int:
+        """Risk factor bitmask of one row (dict or pandas Series)."""
+        return sum(1 << bit for bit, factor in enumerate(self.factors) if self._row_flag(row, factor.when))
+
+    def mask_factors(self, mask: int) -> List[str]:
+        """Labels of the factors set in a mask."""
+        return [factor.label for bit, factor in enumerate(self.factors) if mask >> bit & 1]
+
+    # -- SQL ----------------------------------------------------------------
+
+    def _sql_condition(self, condition: Dict) -> str:
+        for combinator, joiner in (('any', ' OR '), ('all', ' AND ')):
+            if combinator in condition:
+                return '(' + joiner.join(self._sql_condition(child) for child in condition[combinator]) + ')'
+
+        column = condition['column']
+        if 'is_true' in condition:
+            return f'COALESCE({column}, FALSE)'
+        expression = f"COALESCE(CAST({column} AS STRING), '')"
+        for name in condition.get('transform', []):
+            expression = TRANSFORMS[name][2].format(expression)
+        if 'equals' in condition:
+            return f"{expression} = {_sql_literal(condition['equals'])}"
+        if 'in' in condition:
+            return f"{expression} IN ({', '.join(_sql_literal(value) for value in condition['in'])})"
+        return f"STRPOS({expression}, {_sql_literal(condition['contains'])}) > 0"
+
+    def columns(self) -> List[str]:
+        """Columns read by the factor conditions, in first-use order."""
+        found: List[str] = []
+
+        def walk(condition: Dict) -> None:
+            for child in condition.get('any', []) + condition.get('all', []):
+                walk(child)
+            if 'column' in condition and condition['column'] not in found:
+                found.append(condition['column'])
+
+        for factor in self.factors:
+            walk(factor.when)
+        return found
+
+    def scoring_query(self, source_sql: str, keep_flags: bool = False) -> str:
+        """
+        Query adding suspicion_score, risk_factors and suspicion_category
+        to every row of source_sql.
+
+        Each factor is evaluated once into a flag column, the score and
+        risk_factors are derived from the flags, and the level from the
+        score - no expression is repeated.
+
+        Args:
+            source_sql: SELECT producing the columns the factors read
+            keep_flags: Also return the factor_<name> flag columns
+
+        Returns:
+            BigQuery SQL (also runs on the local DuckDB backend); usable
+            as a subquery
+        """
+        flags = [f'factor_{factor.name}' for factor in self.factors]
+        flag_columns = ',\n'.join(
+            f'    {self._sql_condition(factor.when)} AS {flag}' for factor, flag in zip(self.factors, flags)
+        )
+        score_terms = ' +\n'.join(
+            f'      IF({flag}, {factor.points}, 0)' for factor, flag in zip(self.factors, flags)
+        )
+        label_terms = ',\n'.join(
+            f'        IF({flag}, {_sql_literal(factor.label)}, NULL)' for factor, flag in zip(self.factors, flags)
+        )
+        level_cases = '\n'.join(
+            f'    WHEN suspicion_score <= {bound} THEN {_sql_literal(label)}'
+            for bound, label in self.levels[:-1]
+        )
+        query = f"""WITH searches AS (
+{textwrap.indent(textwrap.dedent(source_sql).strip(), '  ')}
+),
+factors AS (
+  SELECT
+    *,
+{flag_columns}
+  FROM searches
+),
+scored AS (
+  SELECT
+    {'*' if keep_flags else f"* EXCEPT ({', '.join(flags)})"},
+    LEAST(
+{score_terms},
+      {self.max_score}
+    ) AS suspicion_score,
+    COALESCE(NULLIF(ARRAY_TO_STRING([
+{label_terms}
+      ], '|'), ''), {_sql_literal(self.no_factors_label)}) AS risk_factors
+  FROM factors
+)
+SELECT
+  *,
+  CASE
+{level_cases}
+    ELSE {_sql_literal(self.levels[-1][1])}
+  END AS suspicion_category
+FROM scored"""
+        return query
+
+    def render_sql(self, source_sql: str, view_id: Optional[str] = None) -> str:
+        """
+        Scoring statement with a comment header listing the factors.
+
+        The factor_<name> flags are kept, so queries on the view can break
+        results down by factor without restating the spec's conditions.
+
+        Args:
+            source_sql: SELECT producing the columns the factors read
+            view_id: If given, wrap the query in CREATE OR REPLACE VIEW
+        """
+        header = '\n'.join(
+            f'-- {i}. {factor.title or factor.label}: +{factor.points} points'
+            for i, factor in enumerate(self.factors, 1)
+        )
+        query = self.scoring_query(source_sql, keep_flags=True)
+        if view_id:
+            query = f'CREATE OR REPLACE VIEW `{view_id}` AS\n{query}'
+        return f'-- Risk factors (cumulative, capped at {self.max_score}):\n{header}\n{query};\n'
@@ -0,0 +1,315 @@
+"""
+Staged Producer/Consumer Pipeline
+
+Runs work through named stages connected by bounded queues. Each stage has
+its own pool of worker threads, so a slow stage (rate-limited geocoding,
+LLM round trips) overlaps with the others instead of adding its latency to
+every item. A worker whose downstream queue is full blocks until there is
+room (backpressure), which caps the number of in-flight items no matter how
+large the input is.
+
+Stages consume items one at a time, or in batches when batch_size is set
+(multi-name LLM prompts, buffered BigQuery writes). Items only flow forward:
+a handler may send to any later stage, never to an earlier one, so the
+pipeline shuts down by closing each stage's queue once its feeders and all
+earlier stages have finished.
+
+Usage:
+    pipeline = StagePipeline(queue_size=1000)
+    pipeline.add_stage('geocode', geocode_location, workers=4)
+    pipeline.add_stage('write', write_rows, batch_size=500, batch_wait=2.0)
+    pipeline.run({'geocode': locations})
+
+    # inside geocode_location:
+    pipeline.send('write', row)
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+_CLOSED = object()  # Queue sentinel: no more input for this worker
+
+
+class PipelineStage:
+    """One stage: a bounded input queue, a handler and its worker threads."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        workers: int = 1,
+        queue_size: int = 1000,
+        batch_size: Optional[int] = None,
+        batch_wait: Optional[float] = None
+    ):
+        """
+        Args:
+            name: Stage name (used by send() and in the report)
+            handler: Called with one item, or a list of items if batch_size is set
+            workers: Worker threads running the handler concurrently
+            queue_size: Maximum items waiting in the input queue
+            batch_size: Hand the handler lists of up to this many items
+            batch_wait: Seconds to wait for a batch to fill before handing
+                        over a partial one (None = wait until full or closed)
+        """
+        if workers < 1:
+            raise ValueError(f'Stage {name} needs at least one worker')
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.threads: List[threading.Thread] = []
+
+        self._lock = threading.Lock()
+        self.items = 0
+        self.calls = 0
+        self.busy = 0.0  # Seconds in the handler, excluding time blocked on send()
+        self.blocked = 0.0  # Seconds blocked on a full downstream queue
+        self.waiting = 0.0  # Seconds idle waiting for input
+        self.max_depth = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def _take(self) -> Any:
+        """Next queue entry, counting the idle wait."""
+        start = time.perf_counter()
+        entry = self.queue.get()
+        with self._lock:
+            self.waiting += time.perf_counter() - start
+        return entry
+
+    def _next_work(self) -> Optional[List[Any]]:
+        """
+        Block for the next item or batch.
+
+        Returns:
+            A list of items (one item when not batching), or None once the
+            stage is closed and drained; a partial batch is returned first
+        """
+        entry = self._take()
+        if entry is _CLOSED:
+            return None
+        batch = [entry]
+        if not self.batch_size:
+            return batch
+
+        deadline = time.monotonic() + self.batch_wait if self.batch_wait is not None else None
+        while len(batch) < self.batch_size:
+            try:
+                if deadline is None:
+                    entry = self.queue.get()
+                else:
+                    entry = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if entry is _CLOSED:
+                # Let this worker exit on its next call
+                self.queue.put(_CLOSED)
+                break
+            batch.append(entry)
+        return batch
+
+    def utilization(self) -> float:
+        """Fraction of the stage's worker-time spent in the handler."""
+        if self.started is None:
+            return 0.0
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return self.busy / (elapsed * self.workers) if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'items': self.items,
+            'calls': self.calls,
+            'busy_seconds': round(self.busy, 6),
+            'blocked_seconds': round(self.blocked, 6),
+            'idle_seconds': round(self.waiting, 6),
+            'utilization': round(self.utilization(), 4),
+            'max_queue_depth': self.max_depth,
+            'queue_size': self.queue.maxsize,
+        }
+
+
+class StagePipeline:
+    """
+    Ordered set of PipelineStages fed by one or more sources.
+
+    The first exception raised by a handler stops the run: the sources stop,
+    that stage and every earlier one drain their queues without handling
+    them, later stages finish what was already passed to them (so completed
+    work still reaches the sink), and run() re-raises the exception.
+    """
+
+    def __init__(self, queue_size: int = 1000):
+        """
+        Args:
+            queue_size: Default bound for each stage's input queue
+        """
+        self.queue_size = queue_size
+        self.stages: Dict[str, PipelineStage] = {}
+        self._order: List[str] = []
+        self._current = threading.local()
+        self._error: Optional[BaseException] = None
+        self._failed_at = -1  # Index of the first stage that raised
+        self.wall = 0.0
+
+    def add_stage(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        workers: int = 1,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_wait: Optional[float] = None
+    ) -> PipelineStage:
+        """
+        Append a stage; stages run in the order they are added.
+
+        Args:
+            name: Stage name
+            handler: Called with one item (or a list when batch_size is set)
+            workers: Concurrent worker threads
+            queue_size: Input queue bound (default: the pipeline's queue_size)
+            batch_size: Batch items up to this size before calling the handler
+            batch_wait: Max seconds to wait for a batch to fill
+
+        Returns:
+            The new PipelineStage
+        """
+        if name in self.stages:
+            raise ValueError(f'Duplicate stage: {name}')
+        stage = PipelineStage(
+            name, handler, workers=workers, queue_size=queue_size or self.queue_size,
+            batch_size=batch_size, batch_wait=batch_wait
+        )
+        self.stages[name] = stage
+        self._order.append(name)
+        return stage
+
+    def send(self, name: str, item: Any) -> None:
+        """
+        Queue an item for a stage, blocking while its queue is full.
+
+        Called from handlers (to pass results downstream) and by the
+        feeders; time blocked inside a handler is charged to that stage.
+        """
+        stage = self.stages[name]
+        sender = getattr(self._current, 'stage', None)
+        if sender is not None and self._order.index(name) <= self._order.index(sender.name):
+            raise ValueError(f'Stage {sender.name} cannot send to earlier stage {name}')
+
+        start = time.perf_counter()
+        stage.queue.put(item)
+        waited = time.perf_counter() - start
+        depth = stage.queue.qsize()
+        with stage._lock:
+            stage.max_depth = max(stage.max_depth, depth)
+        if sender is not None:
+            self._current.blocked += waited
+            with sender._lock:
+                sender.blocked += waited
+
+    def _work(self, stage: PipelineStage) -> None:
+        """Worker loop: handle items until the stage is closed."""
+        self._current.stage = stage
+        index = self._order.index(stage.name)
+        while True:
+            batch = stage._next_work()
+            if batch is None:
+                return
+            if self._error is not None and index <= self._failed_at:
+                continue  # Drain so upstream senders never block forever
+
+            self._current.blocked = 0.0
+            start = time.perf_counter()
+            try:
+                stage.handler(batch if stage.batch_size else batch[0])
+            except BaseException as e:
+                logger.error(f'Pipeline stage {stage.name} failed: {type(e).__name__}: {e}')
+                with stage._lock:
+                    if self._error is None:
+                        self._error = e
+                    self._failed_at = max(self._failed_at, index)
+            elapsed = time.perf_counter() - start
+            with stage._lock:
+                stage.busy += elapsed - self._current.blocked
+                stage.items += len(batch)
+                stage.calls += 1
+
+    def _feed(self, name: str, items: Iterable[Any]) -> None:
+        """Feeder thread: push a source's items into a stage."""
+        try:
+            for item in items:
+                if self._error is not None:
+                    return
+                self.send(name, item)
+        except BaseException as e:
+            logger.error(f'Pipeline source for {name} failed: {type(e).__name__}: {e}')
+            if self._error is None:
+                self._error = e
+
+    def run(self, sources: Dict[str, Iterable[Any]]) -> None:
+        """
+        Run every stage until all sources are exhausted and all queues drained.
+
+        Args:
+            sources: Stage name -> iterable of items fed into that stage; each
+                     source has its own feeder thread, so a full queue for one
+                     stage does not hold back the others
+        """
+        start = time.perf_counter()
+        for name in self._order:
+            stage = self.stages[name]
+            stage.started = time.perf_counter()
+            for k in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(stage,), name=f'{name}-{k}', daemon=True
+                )
+                thread.start()
+                stage.threads.append(thread)
+
+        feeders = {}
+        for name, items in sources.items():
+            if name not in self.stages:
+                raise ValueError(f'Unknown stage: {name}')
+            feeder = threading.Thread(target=self._feed, args=(name, items), name=f'feed-{name}', daemon=True)
+            feeder.start()
+            feeders[name] = feeder
+
+        # A stage's input is complete once its feeder and every earlier
+        # stage are done
+        for name in self._order:
+            stage = self.stages[name]
+            if name in feeders:
+                feeders[name].join()
+            for _ in stage.threads:
+                stage.queue.put(_CLOSED)
+            for thread in stage.threads:
+                thread.join()
+            stage.finished = time.perf_counter()
+
+        self.wall = time.perf_counter() - start
+        if self._error is not None:
+            raise self._error
+
+    def report(self) -> Dict[str, Dict]:
+        """Per-stage counts, busy/blocked/idle time and utilization."""
+        return {name: self.stages[name].to_dict() for name in self._order}
+
+    def log_summary(self) -> None:
+        """Log per-stage utilization; the busiest stage is the bottleneck."""
+        logger.info(f'Pipeline stages (wall time {self.wall:.1f}s):')
+        for name, stats in self.report().items():
+            logger.info(
+                f'  {name:<10} workers={stats["workers"]:<3} items={stats["items"]:<7} '
+                f'busy={stats["busy_seconds"]:.1f}s utilization={stats["utilization"]:.0%} '
+                f'blocked={stats["blocked_seconds"]:.1f}s max_queue={stats["max_queue_depth"]}/{stats["queue_size"]}'
+            )
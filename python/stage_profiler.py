@@ -0,0 +1,239 @@
+"""
+Per-Stage Run Profiling
+
+Lightweight, thread-safe timing for the stages of a geocoding run (parsing,
+LLM calls, rate-limit sleeps, HTTP requests, BigQuery writes). Each stage
+keeps a count, total/min/max and a log-scale latency histogram; free-form
+counters sit alongside. The whole run is emitted as one JSON report.
+
+Usage:
+    from stage_profiler import PROFILER
+
+    with PROFILER.stage('geocode.request'):
+        response = session.get(...)
+    PROFILER.record('geocode.rate_limit_wait', waited)
+
+An optional cProfile or pyinstrument session can wrap the whole run for
+function-level detail (see start_code_profiler).
+"""
+
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKET_BOUNDS_MS = (0.01, 0.1, 0.5, 1, 5, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class StageStats:
+    """Count, total, extremes and latency histogram for one stage."""
+
+    def __init__(self):
+        self.count = 0
+        self.items = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, seconds: float, items: int = 1) -> None:
+        self.count += 1
+        self.items += items
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, seconds * 1000)] += 1
+
+    def percentile_ms(self, fraction: float) -> float:
+        """Upper bound of the histogram bucket holding the given fraction of samples."""
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max * 1000
+        return self.max * 1000
+
+    def to_dict(self) -> Dict:
+        histogram = {
+            (f'le_{bound}ms' if bound is not None else f'gt_{BUCKET_BOUNDS_MS[-1]}ms'): n
+            for bound, n in zip(BUCKET_BOUNDS_MS + (None,), self.buckets)
+            if n
+        }
+        return {
+            'count': self.count,
+            'items': self.items,
+            'total_seconds': round(self.total, 6),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'per_item_ms': round(self.total / self.items * 1000, 4) if self.items else 0.0,
+            'min_ms': round(self.min * 1000, 3) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 3),
+            'p50_ms': self.percentile_ms(0.5),
+            'p95_ms': self.percentile_ms(0.95),
+            'histogram': histogram,
+        }
+
+
+class StageProfiler:
+    """
+    Thread-safe registry of stage timings and counters for one run.
+
+    Stage names are dotted ("geocode.request", "llm.rate_limit_wait") so the
+    report groups naturally. Stages measured inside worker threads add up
+    to more than the wall time; compare them with each other, not with it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all stages and counters and restart the run clock."""
+        with self._lock:
+            self.stages: Dict[str, StageStats] = {}
+            self.counters: Dict[str, float] = {}
+            self.started_at = datetime.utcnow()
+            self._started = time.perf_counter()
+
+    def record(self, stage: str, seconds: float, items: int = 1) -> None:
+        """
+        Record one timed sample.
+
+        Args:
+            stage: Stage name
+            seconds: Duration of the sample
+            items: Work items the sample covered (e.g. names in a batch parse)
+        """
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.add(seconds, items)
+
+    @contextmanager
+    def stage(self, stage: str, items: int = 1) -> Iterator[None]:
+        """Time the enclosed block as one sample of `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, items)
+
+    def count(self, counter: str, amount: float = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set_counters(self, counters: Dict[str, float], prefix: str = '') -> None:
+        """Copy existing stats (cache hits, rows written, ...) into the report."""
+        with self._lock:
+            for name, value in counters.items():
+                self.counters[f'{prefix}{name}'] = value
+
+    def report(self) -> Dict:
+        """Machine-readable summary of the run so far."""
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(),
+                'wall_seconds': round(time.perf_counter() - self._started, 6),
+                'stages': {name: stats.to_dict() for name, stats in sorted(self.stages.items())},
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def write_report(self, path: str) -> Dict:
+        """Write report() as JSON to path and return it."""
+        report = self.report()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f'Wrote run report to {path}')
+        return report
+
+    def log_summary(self, top: int = 12) -> None:
+        """Log the stages with the most total time."""
+        report = self.report()
+        ranked = sorted(report['stages'].items(), key=lambda item: -item[1]['total_seconds'])
+        logger.info(f'Stage timings (wall time {report["wall_seconds"]:.1f}s):')
+        for name, stats in ranked[:top]:
+            logger.info(
+                f'  {name:<32} {stats["total_seconds"]:>9.2f}s  n={stats["count"]:<7} '
+                f'mean={stats["mean_ms"]:.1f}ms p95≤{stats["p95_ms"]:g}ms'
+            )
+
+
+class CodeProfiler:
+    """Optional cProfile / pyinstrument session around a whole run."""
+
+    def __init__(self, kind: str, output_path: str):
+        """
+        Args:
+            kind: 'cprofile' or 'pyinstrument' (falls back to cProfile if
+                  pyinstrument is not installed)
+            output_path: Dump path (.prof for cProfile, .html for pyinstrument)
+        """
+        self.kind = kind
+        self.output_path = output_path
+        self._profiler = None
+
+        if kind == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+                self._profiler = Profiler()
+            except ImportError:
+                logger.warning('pyinstrument not installed - falling back to cProfile')
+                self.kind = 'cprofile'
+                if self.output_path.endswith('.html'):
+                    self.output_path = self.output_path[:-len('.html')] + '.prof'
+        if self.kind == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+        elif self._profiler is None:
+            raise ValueError(f'Unknown profiler: {kind}')
+
+    def start(self) -> None:
+        if self.kind == 'cprofile':
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def stop(self) -> None:
+        """Stop profiling and write the dump."""
+        if self.kind == 'cprofile':
+            self._profiler.disable()
+            self._profiler.dump_stats(self.output_path)
+        else:
+            self._profiler.stop()
+            with open(self.output_path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+        logger.info(f'Wrote {self.kind} profile to {self.output_path}')
+
+
+def start_code_profiler(kind: Optional[str], output_path: Optional[str] = None) -> Optional[CodeProfiler]:
+    """
+    Start a function-level profiler if requested.
+
+    Args:
+        kind: None/'' (off), 'cprofile' or 'pyinstrument'
+        output_path: Dump path (default: geocode_profile.prof / .html)
+
+    Returns:
+        The running CodeProfiler (call stop() at the end), or None
+    """
+    if not kind:
+        return None
+    kind = kind.lower()
+    default = 'geocode_profile.html' if kind == 'pyinstrument' else 'geocode_profile.prof'
+    profiler = CodeProfiler(kind, output_path or default)
+    profiler.start()
+    return profiler
+
+
+# Process-wide profiler used by the geocoding pipeline
+PROFILER = StageProfiler()
@@ -0,0 +1,516 @@
+"""
+Storage Backends
+
+The geocoder, the suspicion report and the orchestrator all talk to storage
+through a bigquery.Client-shaped object (query / insert_rows_json /
+load_table_from_file / get_table / delete_table). make_client() returns the
+real BigQuery client, or - with STORAGE_BACKEND=duckdb - a DuckDBClient that
+runs the same SQL against a local DuckDB database, so the geocoder and the
+report run, and can be benchmarked, without GCP.
+
+Local tables come from Parquet/CSV/NDJSON exports laid out as
+
+    <LOCAL_DATA_DIR>/<dataset>/<table>.parquet   (or .csv / .ndjson / .jsonl)
+
+e.g. local_data/DurangoPD/October2025_classified.parquet for
+`durango-deflock.DurangoPD.October2025_classified` (the project is ignored).
+Exports are attached as views; a table is copied into the database file the
+first time something writes to it, and written tables persist in
+LOCAL_DB_PATH (default <LOCAL_DATA_DIR>/local.duckdb).
+
+BigQuery SQL is translated with a handful of rewrites (translate_sql); the
+statements used by this repo run unchanged. BigQuery stored procedures
+(CALL) only run if a Python implementation is registered with
+DuckDBClient.register_procedure; none is registered for
+sp_process_single_dataset, so the orchestrator can register datasets and
+dry-run locally but needs BigQuery to process them.
+
+Requires: pip install duckdb  (only for STORAGE_BACKEND=duckdb)
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from google.api_core.exceptions import BadRequest, Conflict, NotFound
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_DATA_DIR = 'local_data'
+EXPORT_EXTENSIONS = ('.parquet', '.csv', '.ndjson', '.jsonl')
+
+# BigQuery column type -> DuckDB type (BigQuery TIMESTAMPs are stored as
+# naive UTC so no timezone database is needed)
+DUCKDB_TYPES = {
+    'STRING': 'VARCHAR', 'BYTES': 'BLOB', 'INTEGER': 'BIGINT', 'INT64': 'BIGINT',
+    'FLOAT': 'DOUBLE', 'FLOAT64': 'DOUBLE', 'NUMERIC': 'DECIMAL(38, 9)', 'BOOLEAN': 'BOOLEAN',
+    'BOOL': 'BOOLEAN', 'TIMESTAMP': 'TIMESTAMP', 'DATETIME': 'TIMESTAMP', 'DATE': 'DATE', 'TIME': 'TIME',
+}
+BIGQUERY_TYPES = {
+    'VARCHAR': 'STRING', 'BLOB': 'BYTES', 'BIGINT': 'INTEGER', 'INTEGER': 'INTEGER', 'SMALLINT': 'INTEGER',
+    'TINYINT': 'INTEGER', 'HUGEINT': 'INTEGER', 'DOUBLE': 'FLOAT', 'FLOAT': 'FLOAT', 'BOOLEAN': 'BOOLEAN',
+    'TIMESTAMP': 'TIMESTAMP', 'TIMESTAMP WITH TIME ZONE': 'TIMESTAMP', 'DATE': 'DATE', 'TIME': 'TIME',
+}
+
+# (pattern, replacement) applied in order by translate_sql
+_REWRITES: List[Tuple[re.Pattern, str]] = [
+    # `project.dataset.table` / `dataset.table` -> "dataset"."table"
+    (re.compile(r'`[\w-]+\.(\w+)\.(\w+)`'), r'"\1"."\2"'),
+    (re.compile(r'`(\w+)\.(\w+)`'), r'"\1"."\2"'),
+    # Table options that only mean something to BigQuery
+    (re.compile(
+        r'(CREATE\s+(?:OR\s+REPLACE\s+)?TABLE\s+\S+)\s*(?:\n\s*(?:PARTITION|CLUSTER)\s+BY[^\n]*)+',
+        re.IGNORECASE
+    ), r'\1'),
+    (re.compile(r'\*\s+EXCEPT\s*\(', re.IGNORECASE), '* EXCLUDE ('),
+    (re.compile(r'^(\s*)MERGE\s+(?!INTO\b)', re.IGNORECASE | re.MULTILINE), r'\1MERGE INTO '),
+    (re.compile(r'\bCOUNTIF\s*\(', re.IGNORECASE), 'count_if('),
+    (re.compile(r'\bFORMAT\s*\(', re.IGNORECASE), 'printf('),
+    (re.compile(r'\bTIMESTAMP\s*\(', re.IGNORECASE), 'bq_timestamp('),
+    (re.compile(r'\bFLOAT64\b', re.IGNORECASE), 'DOUBLE'),
+    (re.compile(r'\bCURRENT_(TIMESTAMP|DATE)\s*\(\s*\)', re.IGNORECASE), r'CURRENT_\1'),
+    (re.compile(
+        r'\bDATE_SUB\s*\(\s*(CURRENT_DATE)\s*,\s*INTERVAL\s+(\w+)\s+(\w+)\s*\)', re.IGNORECASE
+    ), r'(\1 - INTERVAL \2 \3)'),
+    (re.compile(
+        r'\bTIMESTAMP_DIFF\s*\(\s*([^,()]+),\s*([^,()]+),\s*(\w+)\s*\)', re.IGNORECASE
+    ), r"date_diff('\3', \2, \1)"),
+]
+
+# @named parameters -> $named; string literals and comments match first and
+# are kept as-is, and @@system variables are left alone
+_PARAM = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|--[^\n]*)|(?<![@\w])@(\w+)")
+
+# Statements that write to their target table
+_WRITE_TARGET = re.compile(
+    r'^\s*(?:MERGE\s+INTO|UPDATE|DELETE\s+FROM|INSERT\s+INTO|CREATE\s+OR\s+REPLACE\s+TABLE)\s+"(\w+)"\."(\w+)"',
+    re.IGNORECASE
+)
+_CALL = re.compile(r'^\s*CALL\s+"?(?:\w+"?\.)?"?(\w+)"?\s*\((.*)\)\s*;?\s*$', re.IGNORECASE | re.DOTALL)
+
+
+def translate_sql(sql: str) -> str:
+    """
+    Rewrite BigQuery SQL for DuckDB.
+
+    Covers what this repo's queries use: backtick table IDs, SELECT * EXCEPT,
+    MERGE without INTO, COUNTIF, FORMAT, TIMESTAMP(), FLOAT64,
+    CURRENT_TIMESTAMP(), DATE_SUB / TIMESTAMP_DIFF, PARTITION BY / CLUSTER BY
+    table options and @named parameters. QUALIFY, IF() and CASE run as-is.
+    """
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return _PARAM.sub(lambda m: m.group(1) or f'${m.group(2)}', sql)
+
+
+def _to_utc(value: Any) -> Any:
+    """BigQuery returns TIMESTAMPs as aware UTC datetimes; DuckDB gives naive ones."""
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _param_value(value: Any) -> Any:
+    """Aware datetimes become naive UTC to match local TIMESTAMP columns."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class LocalRow(dict):
+    """Query result row: row['col'], row.col and dict(row) all work, as with bigquery.Row."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class LocalQueryJob:
+    """
+    Finished (DML/DDL) or pending (SELECT) local query.
+
+    SELECTs run when result() rows are first iterated or on to_dataframe(),
+    so a report that only wants a DataFrame (or Arrow batches) never
+    materializes Python rows.
+    """
+
+    def __init__(self, client: 'DuckDBClient', sql: str, params: Dict[str, Any], affected: Optional[int] = None):
+        self._client = client
+        self._sql = sql
+        self._params = params
+        self._rows: Optional[List[LocalRow]] = None
+        self.num_dml_affected_rows = affected
+        # Nothing is billed locally; kept for code that reports scan cost
+        self.total_bytes_processed = 0
+        self.total_bytes_billed = 0
+
+    def result(self, *args, page_size: Optional[int] = None, **kwargs) -> 'LocalRowIterator':
+        return LocalRowIterator(self, page_size)
+
+    def _materialize(self) -> List[LocalRow]:
+        if self.num_dml_affected_rows is not None:
+            return []
+        if self._rows is None:
+            names, values = self._client._fetch(self._sql, self._params)
+            self._rows = [LocalRow(zip(names, map(_to_utc, row))) for row in values]
+        return self._rows
+
+    def to_dataframe(self, *args, **kwargs):
+        """Result as a pandas DataFrame (fetched directly by DuckDB)."""
+        return self._client._fetch_df(self._sql, self._params)
+
+    def to_arrow(self, *args, **kwargs):
+        """Result as a pyarrow Table (create_bqstorage_client etc. are ignored)."""
+        return self._client._fetch_arrow(self._sql, self._params)
+
+
+class LocalRowIterator:
+    """
+    Subset of bigquery.table.RowIterator.
+
+    Iterating (or next()) yields LocalRows (fetched once per job); to_arrow_iterable()
+    streams record batches of at most page_size rows on a separate cursor,
+    so the full result is never held in memory.
+    """
+
+    DEFAULT_PAGE_SIZE = 100_000
+
+    def __init__(self, job: LocalQueryJob, page_size: Optional[int] = None):
+        self._job = job
+        self._page_size = page_size or self.DEFAULT_PAGE_SIZE
+        self._rows: Optional[Iterator[LocalRow]] = None
+
+    def __iter__(self) -> Iterator[LocalRow]:
+        return self
+
+    def __next__(self) -> LocalRow:
+        if self._rows is None:
+            self._rows = iter(self._job._materialize())
+        return next(self._rows)
+
+    def to_arrow_iterable(self, *args, **kwargs) -> Iterator[Any]:
+        """pyarrow RecordBatches (bqstorage_client etc. are ignored)."""
+        if self._job.num_dml_affected_rows is not None:
+            return iter([])
+        return self._job._client._stream_arrow(self._job._sql, self._job._params, self._page_size)
+
+
+class LocalLoadJob:
+    """Completed local load job."""
+
+    def __init__(self, output_rows: int):
+        self.output_rows = output_rows
+
+    def result(self, *args, **kwargs) -> 'LocalLoadJob':
+        return self
+
+
+class LocalTable:
+    """Subset of bigquery.Table used by the pipeline."""
+
+    def __init__(self, table_id: str, schema: List, modified: Optional[datetime], num_rows: int):
+        self.table_id = table_id
+        self.schema = schema
+        self.modified = modified
+        self.num_rows = num_rows
+        self.time_partitioning = None
+
+
+class DuckDBClient:
+    """
+    bigquery.Client stand-in backed by DuckDB and local table exports.
+
+    Thread-safe: statements are serialized on one connection, which is
+    plenty for the pipeline's single writer and short lookups.
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, database: Optional[str] = None, project: Optional[str] = None):
+        """
+        Open the local database and attach the exports under data_dir.
+
+        Args:
+            data_dir: Directory of <dataset>/<table>.<ext> exports
+            database: DuckDB file for written tables (default:
+                      <data_dir>/local.duckdb; ':memory:' for a throwaway run)
+            project: Accepted for signature compatibility; ignored
+        """
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError('STORAGE_BACKEND=duckdb requires duckdb (pip install duckdb)')
+
+        self.project = project
+        self.data_dir = data_dir
+        if database is None:
+            os.makedirs(data_dir, exist_ok=True)
+            database = os.path.join(data_dir, 'local.duckdb')
+        self.database = database
+        self._duckdb = duckdb
+        self._conn = duckdb.connect(database)
+        self._lock = threading.RLock()
+        self._exports: Dict[Tuple[str, str], str] = {}
+        self._modified: Dict[Tuple[str, str], datetime] = {}
+        self.procedures: Dict[str, Callable[..., Any]] = {}
+
+        self._conn.execute('CREATE OR REPLACE MACRO bq_timestamp(x) AS CAST(x AS TIMESTAMP)')
+        self._attach_exports()
+
+    def _attach_exports(self) -> None:
+        """Create a view for every export that has no table of the same name yet."""
+        if not os.path.isdir(self.data_dir):
+            return
+        for dataset in sorted(os.listdir(self.data_dir)):
+            dataset_dir = os.path.join(self.data_dir, dataset)
+            if not os.path.isdir(dataset_dir):
+                continue
+            for filename in sorted(os.listdir(dataset_dir)):
+                table, ext = os.path.splitext(filename)
+                if ext.lower() not in EXPORT_EXTENSIONS:
+                    continue
+                path = os.path.join(dataset_dir, filename)
+                if self._kind(dataset, table) == 'BASE TABLE':
+                    continue  # Already materialized by an earlier write
+                reader = {
+                    '.parquet': 'read_parquet', '.csv': 'read_csv_auto'
+                }.get(ext.lower(), 'read_json_auto')
+                self._conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset}"')
+                quoted_path = path.replace("'", "''")
+                self._conn.execute(
+                    f'CREATE OR REPLACE VIEW "{dataset}"."{table}" AS SELECT * FROM {reader}(\'{quoted_path}\')'
+                )
+                self._exports[(dataset, table)] = path
+        logger.info(f'Attached {len(self._exports)} local table exports from {self.data_dir}')
+
+    @staticmethod
+    def _split(table_ref: str) -> Tuple[str, str]:
+        """'project.dataset.table' or 'dataset.table' -> (dataset, table)."""
+        parts = table_ref.strip('`').split('.')
+        if len(parts) < 2:
+            raise ValueError(f'Table reference needs a dataset: {table_ref}')
+        return parts[-2], parts[-1]
+
+    def _kind(self, dataset: str, table: str) -> Optional[str]:
+        """'BASE TABLE', 'VIEW' or None."""
+        row = self._conn.execute(
+            'SELECT table_type FROM information_schema.tables WHERE table_schema = ? AND table_name = ?',
+            [dataset, table]
+        ).fetchone()
+        return row[0] if row else None
+
+    def _prepare_write(self, dataset: str, table: str) -> None:
+        """Copy an export-backed view into a real table before the first write."""
+        if self._kind(dataset, table) == 'VIEW':
+            self._conn.execute(f'CREATE TABLE "{dataset}"."__{table}" AS SELECT * FROM "{dataset}"."{table}"')
+            self._conn.execute(f'DROP VIEW "{dataset}"."{table}"')
+            self._conn.execute(f'ALTER TABLE "{dataset}"."__{table}" RENAME TO "{table}"')
+        self._conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset}"')
+        self._modified[(dataset, table)] = datetime.now(timezone.utc)
+
+    def _execute(self, sql: str, params: Dict[str, Any]):
+        try:
+            return self._conn.execute(sql, params or None)
+        except self._duckdb.Error as e:
+            raise BadRequest(f'{e}\n{sql}')
+
+    def _fetch(self, sql: str, params: Dict[str, Any]) -> Tuple[List[str], List[tuple]]:
+        with self._lock:
+            cursor = self._execute(sql, params)
+            return [column[0] for column in cursor.description], cursor.fetchall()
+
+    def _fetch_df(self, sql: str, params: Dict[str, Any]):
+        with self._lock:
+            return self._execute(sql, params).df()
+
+    def _fetch_arrow(self, sql: str, params: Dict[str, Any]):
+        with self._lock:
+            cursor = self._execute(sql, params)
+            fetch = getattr(cursor, 'to_arrow_table', None) or cursor.fetch_arrow_table
+            return fetch()
+
+    def _stream_arrow(self, sql: str, params: Dict[str, Any], batch_size: int) -> Iterator[Any]:
+        # Own cursor: other statements can run on the shared connection
+        # while the batches are consumed
+        with self._lock:
+            cursor = self._conn.cursor()
+        try:
+            try:
+                result = cursor.execute(sql, params or None)
+                # fetch_record_batch is deprecated in newer duckdb
+                to_reader = getattr(result, 'to_arrow_reader', None) or result.fetch_record_batch
+                reader = to_reader(batch_size)
+            except self._duckdb.Error as e:
+                raise BadRequest(f'{e}\n{sql}')
+            yield from reader
+        finally:
+            cursor.close()
+
+    def register_procedure(self, name: str, procedure: Callable[..., Any]) -> None:
+        """Run `procedure(client, *args)` for CALL statements naming `name`."""
+        self.procedures[name] = procedure
+
+    def query(self, query: str, job_config=None, **kwargs) -> LocalQueryJob:
+        """
+        Run a BigQuery SQL statement locally.
+
+        Args:
+            query: BigQuery SQL (translated with translate_sql)
+            job_config: Optional QueryJobConfig; only query_parameters
+                        (scalar parameters) are used
+
+        Returns:
+            LocalQueryJob (DML/DDL already executed; SELECTs run on result())
+        """
+        params = {
+            param.name: _param_value(param.value)
+            for param in (getattr(job_config, 'query_parameters', None) or [])
+        }
+        sql = translate_sql(query)
+
+        call = _CALL.match(sql)
+        if call:
+            name = call.group(1)
+            if name not in self.procedures:
+                raise BadRequest(
+                    f'Stored procedure {name} is BigQuery-only; register a local implementation '
+                    f'with DuckDBClient.register_procedure'
+                )
+            args = [arg.strip().strip("'") for arg in call.group(2).split(',') if arg.strip()]
+            self.procedures[name](self, *args)
+            return LocalQueryJob(self, sql, params, affected=0)
+
+        target = _WRITE_TARGET.match(sql)
+        if target is None:
+            return LocalQueryJob(self, sql, params)
+        with self._lock:
+            self._prepare_write(*target.groups())
+            rows = self._execute(sql, params).fetchall()
+        affected = rows[0][0] if rows and rows[0] and isinstance(rows[0][0], int) else 0
+        return LocalQueryJob(self, sql, params, affected=affected)
+
+    def _create(self, dataset: str, table: str, schema: List) -> None:
+        columns = ', '.join(
+            f'"{field.name}" {DUCKDB_TYPES.get(field.field_type.upper(), "VARCHAR")}' for field in schema
+        )
+        self._conn.execute(f'CREATE OR REPLACE TABLE "{dataset}"."{table}" ({columns})')
+
+    def _append(self, dataset: str, table: str, rows: List[Dict]) -> None:
+        """Insert dict rows by column name, creating the table from them if needed."""
+        import pandas as pd
+
+        frame = pd.DataFrame.from_records(rows)
+        self._conn.register('__incoming', frame)
+        try:
+            if self._kind(dataset, table) is None:
+                self._conn.execute(f'CREATE TABLE "{dataset}"."{table}" AS SELECT * FROM __incoming')
+            else:
+                self._conn.execute(f'INSERT INTO "{dataset}"."{table}" BY NAME SELECT * FROM __incoming')
+        finally:
+            self._conn.unregister('__incoming')
+
+    def insert_rows_json(self, table, json_rows: List[Dict], **kwargs) -> List[Dict]:
+        """Append rows; returns per-row errors like the BigQuery client (always empty here)."""
+        dataset, name = self._split(str(table))
+        rows = list(json_rows)
+        if rows:
+            with self._lock:
+                self._prepare_write(dataset, name)
+                try:
+                    self._append(dataset, name, rows)
+                except self._duckdb.Error as e:
+                    raise BadRequest(f'Insert into {dataset}.{name} failed: {e}')
+        return []
+
+    def load_table_from_file(self, file_obj, destination, job_config=None, **kwargs) -> LocalLoadJob:
+        """Load newline-delimited JSON, honoring the job's schema and write disposition."""
+        dataset, name = self._split(str(destination))
+        rows = [json.loads(line) for line in file_obj.read().decode('utf-8').splitlines() if line.strip()]
+        schema = getattr(job_config, 'schema', None)
+        truncate = getattr(job_config, 'write_disposition', None) == 'WRITE_TRUNCATE'
+        with self._lock:
+            self._prepare_write(dataset, name)
+            if schema and (truncate or self._kind(dataset, name) is None):
+                self._create(dataset, name, schema)
+            elif truncate:
+                self._conn.execute(f'DROP TABLE IF EXISTS "{dataset}"."{name}"')
+            if rows:
+                self._append(dataset, name, rows)
+        return LocalLoadJob(len(rows))
+
+    def create_table(self, table, exists_ok: bool = False, **kwargs) -> LocalTable:
+        """Create an empty table from a bigquery.Table (partitioning/clustering are ignored)."""
+        dataset, name = table.dataset_id, table.table_id
+        with self._lock:
+            if self._kind(dataset, name) is not None:
+                if not exists_ok:
+                    raise Conflict(f'Table {dataset}.{name} already exists')
+            else:
+                self._conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset}"')
+                self._create(dataset, name, table.schema)
+                self._modified[(dataset, name)] = datetime.now(timezone.utc)
+        return self.get_table(f'{dataset}.{name}')
+
+    def delete_table(self, table, not_found_ok: bool = False, **kwargs) -> None:
+        dataset, name = self._split(str(table))
+        with self._lock:
+            kind = self._kind(dataset, name)
+            if kind is None:
+                if not not_found_ok:
+                    raise NotFound(f'Table {dataset}.{name} not found')
+                return
+            self._conn.execute(f'DROP {"VIEW" if kind == "VIEW" else "TABLE"} "{dataset}"."{name}"')
+            self._modified.pop((dataset, name), None)
+
+    def get_table(self, table, **kwargs) -> LocalTable:
+        """Schema, row count and last-modified time (export file mtime until written locally)."""
+        from google.cloud import bigquery
+
+        dataset, name = self._split(str(table))
+        with self._lock:
+            if self._kind(dataset, name) is None:
+                raise NotFound(f'Table {dataset}.{name} not found')
+            described = self._conn.execute(f'DESCRIBE "{dataset}"."{name}"').fetchall()
+            num_rows = self._conn.execute(f'SELECT COUNT(*) FROM "{dataset}"."{name}"').fetchone()[0]
+        schema = [
+            bigquery.SchemaField(column, BIGQUERY_TYPES.get(str(column_type).upper(), 'STRING'))
+            for column, column_type, *_ in described
+        ]
+        modified = self._modified.get((dataset, name))
+        if modified is None and (dataset, name) in self._exports:
+            mtime = os.path.getmtime(self._exports[(dataset, name)])
+            modified = datetime.fromtimestamp(mtime, tz=timezone.utc)
+        return LocalTable(f'{dataset}.{name}', schema, modified, num_rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def make_client(project: str, **kwargs):
+    """
+    Storage client for the configured backend.
+
+    STORAGE_BACKEND=bigquery (default) returns bigquery.Client(project);
+    STORAGE_BACKEND=duckdb returns a DuckDBClient over LOCAL_DATA_DIR
+    (default ./local_data) persisting to LOCAL_DB_PATH.
+
+    Args:
+        project: GCP project ID
+        **kwargs: Passed to bigquery.Client (e.g. location)
+    """
+    backend = os.environ.get('STORAGE_BACKEND', 'bigquery').lower()
+    if backend == 'duckdb':
+        data_dir = os.environ.get('LOCAL_DATA_DIR', DEFAULT_DATA_DIR)
+        logger.info(f'Using local DuckDB storage backend ({data_dir})')
+        return DuckDBClient(data_dir, database=os.environ.get('LOCAL_DB_PATH'), project=project)
+    if backend != 'bigquery':
+        raise ValueError(f'Unknown STORAGE_BACKEND: {backend}')
+
+    from google.cloud import bigquery
+    return bigquery.Client(project=project, **kwargs)
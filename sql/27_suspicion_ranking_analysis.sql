@@ -3,75 +3,71 @@
 -- Analysis of potential violations of Colorado law prohibiting police
 -- assistance in federal immigration cases
 -- ============================================================================
--- Risk Factors (cumulative scoring):
--- 1. Participating agency (is_participating_agency = TRUE): +40 points
--- 2. No case number (case_num empty/null): +30 points
--- 3. AOA/Interagency reason (reason_category = 'Interagency'): +20 points
--- 4. Invalid/ambiguous reason (reason_bucket in Invalid_Reason/Case_Number/OTHER): +10 points
--- Max Score: 100
+-- Risk factors, weights and levels are defined once in
+-- python/suspicion_scoring.json (shared with suspicion_ranking_report.py).
+-- The view below is generated from it: edit the spec, then run
+--   python suspicion_ranking_report.py --render-sql
+-- The view keeps one factor_<name> flag per factor; the queries after it
+-- break results down by those flags instead of restating the conditions.
 -- ============================================================================
 
 -- Phase 1: Create suspicion score calculation view
+-- BEGIN GENERATED from python/suspicion_scoring.json (do not edit by hand)
+-- Risk factors (cumulative, capped at 100):
+-- 1. Participating Agency: +40 points
+-- 2. No Case Number: +30 points
+-- 3. AOA/Interagency Reason: +20 points
+-- 4. Invalid/Ambiguous Reason: +10 points
 CREATE OR REPLACE VIEW `durango-deflock.FlockML.suspicion_ranking_analysis` AS
+WITH searches AS (
+  SELECT
+      c.* EXCEPT (classification_timestamp),
+      COALESCE(m.is_participating_agency, FALSE) AS is_participating_agency,
+      m.matched_agency,
+      m.matched_state,
+      m.matched_type
+  FROM `durango-deflock.DurangoPD.October2025_classified` c
+  LEFT JOIN `durango-deflock.FlockML.org_name_rule_based_matches` m
+      ON c.org_name = m.org_name
+),
+factors AS (
+  SELECT
+    *,
+    COALESCE(is_participating_agency, FALSE) AS factor_is_participating_agency,
+    LOWER(TRIM(COALESCE(CAST(case_num AS STRING), ''))) IN ('', 'null', 'none', 'n/a', 'na') AS factor_no_case_number,
+    (LOWER(TRIM(COALESCE(CAST(reason_category AS STRING), ''))) = 'interagency' OR STRPOS(LOWER(COALESCE(CAST(reason AS STRING), '')), 'aoa') > 0) AS factor_aoa_reason,
+    (TRIM(COALESCE(CAST(reason_bucket AS STRING), '')) IN ('Invalid_Reason', 'Case_Number', 'OTHER') OR TRIM(COALESCE(CAST(reason_category AS STRING), '')) = 'OTHER') AS factor_invalid_reason
+  FROM searches
+),
+scored AS (
+  SELECT
+    *,
+    LEAST(
+      IF(factor_is_participating_agency, 40, 0) +
+      IF(factor_no_case_number, 30, 0) +
+      IF(factor_aoa_reason, 20, 0) +
+      IF(factor_invalid_reason, 10, 0),
+      100
+    ) AS suspicion_score,
+    COALESCE(NULLIF(ARRAY_TO_STRING([
+        IF(factor_is_participating_agency, 'Participating in ICE collaboration', NULL),
+        IF(factor_no_case_number, 'No case number provided', NULL),
+        IF(factor_aoa_reason, 'AOA/Interagency reason', NULL),
+        IF(factor_invalid_reason, 'Invalid/ambiguous reason', NULL)
+      ], '|'), ''), 'None') AS risk_factors
+  FROM factors
+)
 SELECT
-  c.* EXCEPT (classification_timestamp),
-  COALESCE(m.is_participating_agency, FALSE) AS is_participating_agency,
-  m.matched_agency,
-  m.matched_state,
-  m.matched_type,
-  -- Calculate suspicion score
-  LEAST(
-    CAST(COALESCE(m.is_participating_agency, FALSE) AS INT64) * 40 +
-    CASE WHEN TRIM(COALESCE(c.case_num, '')) = '' THEN 30 ELSE 0 END +
-    CASE WHEN LOWER(c.reason_category) = 'interagency' THEN 20 ELSE 0 END +
-    CASE WHEN c.reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER') THEN 10 ELSE 0 END,
-    100
-  ) AS suspicion_score,
-  -- Identify which factors triggered suspicion
-  ARRAY_TO_STRING(
-    ARRAY_CONCAT(
-      IF(COALESCE(m.is_participating_agency, FALSE), ['Participating Agency'], []),
-      IF(TRIM(COALESCE(c.case_num, '')) = '', ['No Case Number'], []),
-      IF(LOWER(c.reason_category) = 'interagency', ['AOA/Interagency'], []),
-      IF(c.reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER'), ['Invalid Reason'], [])
-    ),
-    '|'
-  ) AS risk_factors,
-  -- Categorize suspicion level
+  *,
   CASE
-    WHEN LEAST(
-      CAST(COALESCE(m.is_participating_agency, FALSE) AS INT64) * 40 +
-      CASE WHEN TRIM(COALESCE(c.case_num, '')) = '' THEN 30 ELSE 0 END +
-      CASE WHEN LOWER(c.reason_category) = 'interagency' THEN 20 ELSE 0 END +
-      CASE WHEN c.reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER') THEN 10 ELSE 0 END,
-      100
-    ) = 0 THEN 'No Suspicion'
-    WHEN LEAST(
-      CAST(COALESCE(m.is_participating_agency, FALSE) AS INT64) * 40 +
-      CASE WHEN TRIM(COALESCE(c.case_num, '')) = '' THEN 30 ELSE 0 END +
-      CASE WHEN LOWER(c.reason_category) = 'interagency' THEN 20 ELSE 0 END +
-      CASE WHEN c.reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER') THEN 10 ELSE 0 END,
-      100
-    ) <= 30 THEN 'Low Suspicion'
-    WHEN LEAST(
-      CAST(COALESCE(m.is_participating_agency, FALSE) AS INT64) * 40 +
-      CASE WHEN TRIM(COALESCE(c.case_num, '')) = '' THEN 30 ELSE 0 END +
-      CASE WHEN LOWER(c.reason_category) = 'interagency' THEN 20 ELSE 0 END +
-      CASE WHEN c.reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER') THEN 10 ELSE 0 END,
-      100
-    ) <= 60 THEN 'Moderate Suspicion'
-    WHEN LEAST(
-      CAST(COALESCE(m.is_participating_agency, FALSE) AS INT64) * 40 +
-      CASE WHEN TRIM(COALESCE(c.case_num, '')) = '' THEN 30 ELSE 0 END +
-      CASE WHEN LOWER(c.reason_category) = 'interagency' THEN 20 ELSE 0 END +
-      CASE WHEN c.reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER') THEN 10 ELSE 0 END,
-      100
-    ) < 100 THEN 'High Suspicion'
+    WHEN suspicion_score <= 0 THEN 'No Suspicion'
+    WHEN suspicion_score <= 30 THEN 'Low Suspicion'
+    WHEN suspicion_score <= 60 THEN 'Moderate Suspicion'
+    WHEN suspicion_score <= 99 THEN 'High Suspicion'
     ELSE 'Very High Suspicion'
   END AS suspicion_category
-FROM `durango-deflock.DurangoPD.October2025_classified` c
-LEFT JOIN `durango-deflock.FlockML.org_name_rule_based_matches` m
-  ON c.org_name = m.org_name;
+FROM scored;
+-- END GENERATED
 
 -- ============================================================================
 -- QUERY 1: Executive Summary Statistics
@@ -119,27 +115,27 @@ END;
 -- ============================================================================
 SELECT
   'Case Number Presence' as factor_category,
-  CASE WHEN TRIM(COALESCE(case_num, '')) = '' THEN 'Missing' ELSE 'Present' END as factor,
+  CASE WHEN factor_no_case_number THEN 'Missing' ELSE 'Present' END as factor,
   COUNT(*) as searches,
   ROUND(COUNT(*) * 100 / SUM(COUNT(*)) OVER (), 2) as pct,
   ROUND(AVG(suspicion_score), 1) as avg_suspicion
 FROM `durango-deflock.FlockML.suspicion_ranking_analysis`
-GROUP BY CASE WHEN TRIM(COALESCE(case_num, '')) = '' THEN 'Missing' ELSE 'Present' END
+GROUP BY factor_no_case_number
 UNION ALL
 SELECT
   'Participating Agency',
-  CASE WHEN is_participating_agency THEN 'Yes' ELSE 'No' END,
+  CASE WHEN factor_is_participating_agency THEN 'Yes' ELSE 'No' END,
   COUNT(*),
   ROUND(COUNT(*) * 100 / SUM(COUNT(*)) OVER (), 2),
   ROUND(AVG(suspicion_score), 1)
 FROM `durango-deflock.FlockML.suspicion_ranking_analysis`
-GROUP BY is_participating_agency
+GROUP BY factor_is_participating_agency
 UNION ALL
 SELECT
   'Reason Type',
   CASE
-    WHEN reason_category = 'Interagency' THEN 'AOA/Interagency'
-    WHEN reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER') THEN 'Invalid/Ambiguous'
+    WHEN factor_aoa_reason THEN 'AOA/Interagency'
+    WHEN factor_invalid_reason THEN 'Invalid/Ambiguous'
     ELSE 'Valid Reason'
   END,
   COUNT(*),
@@ -147,8 +143,8 @@ SELECT
   ROUND(AVG(suspicion_score), 1)
 FROM `durango-deflock.FlockML.suspicion_ranking_analysis`
 GROUP BY CASE
-    WHEN reason_category = 'Interagency' THEN 'AOA/Interagency'
-    WHEN reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER') THEN 'Invalid/Ambiguous'
+    WHEN factor_aoa_reason THEN 'AOA/Interagency'
+    WHEN factor_invalid_reason THEN 'Invalid/Ambiguous'
     ELSE 'Valid Reason'
   END
 ORDER BY factor_category, factor;
@@ -182,8 +178,8 @@ SELECT
   COUNTIF(suspicion_score >= 60) as high_risk_searches,
   ROUND(COUNTIF(suspicion_score >= 60) * 100 / COUNT(*), 1) as high_risk_pct,
   ROUND(AVG(suspicion_score), 1) as avg_suspicion_score,
-  COUNT(DISTINCT case_num) as distinct_case_numbers,
-  COUNTIF(TRIM(COALESCE(case_num, '')) = '') as searches_missing_case_number
+  COUNT(DISTINCT IF(factor_no_case_number, NULL, case_num)) as distinct_case_numbers,
+  COUNTIF(factor_no_case_number) as searches_missing_case_number
 FROM `durango-deflock.FlockML.suspicion_ranking_analysis`
 WHERE is_participating_agency = TRUE
 GROUP BY matched_agency, matched_state
@@ -235,9 +231,9 @@ WITH summary AS (
     COUNTIF(is_participating_agency) as participating_searches,
     COUNTIF(suspicion_score >= 60) as high_risk_searches,
     COUNTIF(suspicion_score = 100) as very_high_risk_searches,
-    COUNTIF(TRIM(COALESCE(case_num, '')) = '') as no_case_number,
-    COUNTIF(reason_category = 'Interagency') as aoa_searches,
-    COUNTIF(reason_bucket IN ('Invalid_Reason', 'Case_Number', 'OTHER')) as invalid_reason_searches
+    COUNTIF(factor_no_case_number) as no_case_number,
+    COUNTIF(factor_aoa_reason) as aoa_searches,
+    COUNTIF(factor_invalid_reason) as invalid_reason_searches
   FROM `durango-deflock.FlockML.suspicion_ranking_analysis`
 )
 SELECT
@@ -0,0 +1,44 @@
+-- ============================================================================
+-- Phase 1.4: Agency Discovery High-Water Marks
+-- ============================================================================
+-- Purpose: Let geocode_agencies.py discover new agencies incrementally
+--
+-- Agency discovery reads every enabled row of dataset_pipeline_config and,
+-- per source table:
+-- 1. Skips the table if its last-modified time is unchanged since the last
+--    discovery (table metadata only - no bytes scanned)
+-- 2. Otherwise scans only rows at or after geocode_high_water_mark on
+--    geocode_watermark_column (a TIMESTAMP/DATE/DATETIME column, ideally the
+--    partitioning column so old partitions are pruned)
+-- 3. Scans the whole table when it has no watermark column or was never
+--    discovered before (new tables)
+--
+-- geocode_watermark_column defaults to the table's partitioning column
+-- (_PARTITIONTIME for ingestion-time partitioned tables) when NULL.
+-- Reset a source for a full rescan with:
+--   UPDATE FlockML.dataset_pipeline_config
+--   SET geocode_high_water_mark = NULL, geocode_last_modified = NULL
+--   WHERE config_id = 'durango-oct-2025';
+-- ============================================================================
+
+ALTER TABLE `durango-deflock.FlockML.dataset_pipeline_config`
+ADD COLUMN IF NOT EXISTS geocode_watermark_column STRING,
+ADD COLUMN IF NOT EXISTS geocode_high_water_mark TIMESTAMP,
+ADD COLUMN IF NOT EXISTS geocode_last_modified TIMESTAMP;
+
+-- The monthly DurangoPD exports are unpartitioned and written once, so the
+-- last-modified check alone keeps them from being rescanned. Tables that
+-- keep receiving rows should name a watermark column, e.g.:
+--   UPDATE FlockML.dataset_pipeline_config
+--   SET geocode_watermark_column = 'ingestion_time'
+--   WHERE config_id = '...';
+
+-- Verify
+SELECT
+  config_id,
+  source_table_name,
+  geocode_watermark_column,
+  geocode_high_water_mark,
+  geocode_last_modified
+FROM `durango-deflock.FlockML.dataset_pipeline_config`
+ORDER BY priority ASC;
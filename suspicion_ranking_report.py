@@ -4,7 +4,8 @@ Colorado Attorney General Suspicion Ranking Report
 Analyzes likelihood of violation of Colorado law prohibiting police assistance in federal immigration cases
 
 Data sources:
-- durango-deflock.DurangoPD.October2025_classified
+- durango-deflock.DurangoPD.October2025_classified (or, with --all-datasets,
+  every enabled month in durango-deflock.FlockML.dataset_pipeline_config)
 - durango-deflock.FlockML.org_name_rule_based_matches
 
 Risk Factors (increasing suspicion):
@@ -14,95 +15,263 @@ Risk Factors (increasing suspicion):
 4. Combination of above factors
 """
 
+import os
+import re
+import sys
+import argparse
+import textwrap
 import pandas as pd
-from google.cloud import bigquery
 import logging
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+from detailed_export import DetailedExport
+from scoring_spec import ScoringSpec
+from storage_backend import make_client
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_CONFIG_ID = re.compile(r'^[\w.-]+$')
+_TABLE_ID = re.compile(r'^[\w-]+\.\w+\.\w+$')
+
+
+@dataclass
+class ReportDataset:
+    """One enabled dataset_pipeline_config row: a classified table to report on."""
+    config_id: str
+    table_id: str  # project.dataset.table of the classified searches
+    description: Optional[str] = None
+    period: Optional[datetime] = None  # Month parsed from the source table name (e.g. October2025)
+
+    def __post_init__(self):
+        # Both are spliced into SQL
+        if not _CONFIG_ID.match(self.config_id):
+            raise ValueError(f'Invalid config_id {self.config_id!r}')
+        if not _TABLE_ID.match(self.table_id):
+            raise ValueError(f'Invalid table ID {self.table_id!r}')
+
+    @property
+    def label(self) -> str:
+        """Data period shown in reports"""
+        return self.period.strftime('%B %Y') if self.period else (self.description or self.config_id)
+
 
 class SuspicionRankingAnalyzer:
-    def __init__(self, project_id: str = 'durango-deflock'):
-        """Initialize BigQuery client and analysis parameters"""
-        self.client = bigquery.Client(project=project_id)
+    VIEW_ID = 'durango-deflock.FlockML.suspicion_ranking_analysis'
+    VIEW_SQL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql', '27_suspicion_ranking_analysis.sql')
+    GENERATED_BEGIN = '-- BEGIN GENERATED'
+    GENERATED_END = '-- END GENERATED'
+    SOURCE_TABLE = 'durango-deflock.DurangoPD.October2025_classified'
+    MATCHES_TABLE = 'durango-deflock.FlockML.org_name_rule_based_matches'
+    CONFIG_TABLE = 'durango-deflock.FlockML.dataset_pipeline_config'
+
+    # Columns that come from org_name_rule_based_matches
+    MATCH_COLUMNS = ['is_participating_agency', 'matched_agency', 'matched_state', 'matched_type']
+    # Columns read by the statistics, high-risk table and CSV export
+    REPORT_COLUMNS = ['org_name', 'matched_agency', 'matched_state', 'is_participating_agency',
+                      'case_num', 'reason', 'reason_category', 'reason_bucket']
+    DETAILED_COLUMNS = REPORT_COLUMNS + ['suspicion_score', 'risk_factors']
+    # Low-cardinality columns loaded as pandas categoricals (other strings,
+    # including the tens of thousands of distinct org_names, stay Arrow-backed)
+    CATEGORICAL_COLUMNS = ['dataset_id', 'matched_agency', 'matched_state', 'matched_type',
+                           'reason_category', 'reason_bucket']
+    INVALID_REASON_BUCKETS = ['Invalid_Reason', 'Case_Number', 'OTHER']
+    # (statistic, lowest score, highest score); scores are integers
+    SCORE_BUCKETS = [
+        ('zero_suspicion', 0, 0),
+        ('low_suspicion', 1, 30),
+        ('moderate_suspicion', 31, 60),
+        ('high_suspicion', 61, 99),
+        ('very_high_suspicion', 100, 100),
+    ]
+    HIGH_RISK_MIN_SCORE = 60
+    HIGH_RISK_TOP_N = 30
+    HIGH_RISK_COLUMNS = ['org_name', 'matched_agency', 'matched_state', 'case_num',
+                         'reason', 'reason_category', 'suspicion_score', 'risk_factors']
+    # Ties on score are broken on every displayed column, so in-memory and
+    # pushdown runs list the same top-N rows
+    HIGH_RISK_ORDER = ['org_name', 'case_num', 'reason', 'matched_agency', 'matched_state',
+                       'reason_category', 'risk_factors']
+    # Rows per record batch in streaming mode
+    STREAM_BATCH_SIZE = 100_000
+
+    def __init__(self, project_id: str = 'durango-deflock', client=None, spec: Optional[ScoringSpec] = None):
+        """
+        Initialize BigQuery client (or the STORAGE_BACKEND client) and analysis parameters
+
+        Args:
+            project_id: GCP project ID
+            client: Optional pre-built client
+            spec: Scoring spec (default: SUSPICION_SCORING_SPEC or python/suspicion_scoring.json)
+        """
+        self.client = client or make_client(project_id)
         self.project_id = project_id
+        self.spec = spec or ScoringSpec.load(os.environ.get('SUSPICION_SCORING_SPEC'))
 
-    def fetch_data(self) -> pd.DataFrame:
+    def source_query(self, columns: Optional[List[str]] = None,
+                     datasets: Optional[List[ReportDataset]] = None) -> str:
         """
-        Fetch combined data from October2025_classified and org_name_rule_based_matches
+        Searches joined with their rule-based agency matches (the rows that get scored)
+
+        Args:
+            columns: Search columns to select (default: all of them, or
+                     needed_columns() with datasets); the match columns are
+                     always included
+            datasets: Read these tables (UNION ALL) instead of SOURCE_TABLE,
+                      adding a dataset_id column with each row's config_id
         """
-        query = """
+        source = f'`{self.SOURCE_TABLE}`'
+        if datasets:
+            search = [column for column in columns or self.needed_columns() if column not in self.MATCH_COLUMNS]
+            source = '(\n' + '\n            UNION ALL\n'.join(
+                f"            SELECT '{dataset.config_id}' AS dataset_id, {', '.join(search)} FROM `{dataset.table_id}`"
+                for dataset in datasets
+            ) + '\n        )'
+            search_columns = ', '.join(f'c.{column}' for column in ['dataset_id'] + search)
+        elif columns is None:
+            search_columns = 'c.* EXCEPT (classification_timestamp)'
+        else:
+            search_columns = ', '.join(f'c.{column}' for column in columns if column not in self.MATCH_COLUMNS)
+        return f"""
         SELECT
-            c.* EXCEPT (classification_timestamp),
+            {search_columns},
             COALESCE(m.is_participating_agency, FALSE) AS is_participating_agency,
             m.matched_agency,
             m.matched_state,
             m.matched_type
-        FROM `durango-deflock.DurangoPD.October2025_classified` c
-        LEFT JOIN `durango-deflock.FlockML.org_name_rule_based_matches` m
+        FROM {source} c
+        LEFT JOIN `{self.MATCHES_TABLE}` m
             ON c.org_name = m.org_name
         """
 
+    def get_report_datasets(self) -> List[ReportDataset]:
+        """
+        Enabled datasets from dataset_pipeline_config, in priority order
+
+        Each config's classified table is <project>.<output dataset, or the
+        source dataset>.<source table><output suffix>.
+        """
+        query = f"""
+        SELECT
+            config_id,
+            FORMAT('%s.%s.%s%s', dataset_project, COALESCE(output_dataset_name, dataset_name),
+                   source_table_name, COALESCE(output_suffix, '')) AS table_id,
+            source_table_name,
+            description
+        FROM `{self.CONFIG_TABLE}`
+        WHERE enabled = TRUE
+        ORDER BY priority ASC
+        """
+        datasets = []
+        for row in self.client.query(query).result():
+            try:
+                period = datetime.strptime(row['source_table_name'], '%B%Y')
+            except ValueError:
+                period = None
+            datasets.append(ReportDataset(
+                config_id=row['config_id'],
+                table_id=row['table_id'],
+                description=row['description'],
+                period=period,
+            ))
+        logger.info(f"Loaded {len(datasets)} enabled datasets from {self.CONFIG_TABLE}")
+        return datasets
+
+    def needed_columns(self) -> List[str]:
+        """Columns read by scoring, the statistics, the high-risk table and the CSV export"""
+        return list(dict.fromkeys(self.REPORT_COLUMNS + self.spec.columns()))
+
+    def fetch_data(self) -> pd.DataFrame:
+        """
+        Fetch combined data from October2025_classified and org_name_rule_based_matches
+
+        Only needed_columns() are selected. Rows are read as Arrow - through
+        the BigQuery Storage Read API when google-cloud-bigquery-storage is
+        installed - and converted with categoricals for low-cardinality
+        columns and Arrow-backed strings for the rest.
+        """
         logger.info("Fetching data from BigQuery...")
-        df = self.client.query(query).to_dataframe()
+        job = self.client.query(self.source_query(self.needed_columns()))
+        df = self._arrow_to_frame(job.to_arrow(create_bqstorage_client=True))
         logger.info(f"Loaded {len(df)} records")
         return df
 
-    def calculate_suspicion_score(self, row: pd.Series) -> Tuple[float, List[str]]:
+    def fetch_batches(self, batch_size: int = STREAM_BATCH_SIZE,
+                      datasets: Optional[List[ReportDataset]] = None) -> Iterator[pd.DataFrame]:
         """
-        Calculate suspicion score (0-100) based on risk factors
+        Stream the fetch_data() rows as DataFrames of at most batch_size rows
 
-        Risk factors:
-        1. Participating agency (+40 points)
-        2. No case number (+30 points)
-        3. AOA/Interagency reason (+20 points)
-        4. Invalid/OTHER reason (+10 points)
+        Pages through the result set as Arrow record batches, so memory is
+        bounded by one batch whatever the size of the month.
 
-        Returns:
-            Tuple of (score, list of factors)
+        Args:
+            datasets: Read every one of these tables in one query, with a
+                      dataset_id column (default: SOURCE_TABLE)
         """
-        score = 0
-        factors = []
+        import pyarrow as pa
+
+        logger.info(f"Streaming data from BigQuery in batches of {batch_size}...")
+        job = self.client.query(self.source_query(self.needed_columns(), datasets))
+        for batch in job.result(page_size=batch_size).to_arrow_iterable():
+            yield self._arrow_to_frame(pa.Table.from_batches([batch]))
+
+    def _arrow_to_frame(self, table) -> pd.DataFrame:
+        """Arrow table -> DataFrame with categorical / Arrow string dtypes"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        categorical = [
+            name for name in self.CATEGORICAL_COLUMNS
+            if name in table.column_names
+            and (pa.types.is_string(table.schema.field(name).type) or pa.types.is_large_string(table.schema.field(name).type))
+        ]
+        for name in categorical:
+            index = table.schema.get_field_index(name)
+            table = table.set_column(index, name, pc.dictionary_encode(table.column(name)))
+
+        string_dtype = pd.StringDtype('pyarrow')
+        df = table.to_pandas(types_mapper={pa.string(): string_dtype, pa.large_string(): string_dtype}.get)
+        for name in categorical:
+            # Lexical category order, so sorting matches SQL ORDER BY
+            df[name] = df[name].cat.reorder_categories(sorted(df[name].cat.categories))
+        return df
 
-        # Factor 1: Participating agency in ICE collaboration
-        if row.get('is_participating_agency') == True:
-            score += 40
-            factors.append('Participating in ICE collaboration')
+    def calculate_suspicion_score(self, row: pd.Series) -> Tuple[int, List[str]]:
+        """
+        Calculate suspicion score (0-100) based on the spec's risk factors
 
-        # Factor 2: No case number (redacted case numbers are OK)
-        case_num = row.get('case_num', '').strip() if pd.notna(row.get('case_num')) else ''
-        if not case_num or case_num.lower() in ['', 'null', 'none', 'n/a', 'na']:
-            score += 30
-            factors.append('No case number provided')
-        elif case_num.lower() in ['redacted', 'xxxx', '####', '[redacted]']:
-            # Redacted is OK - don't add to score
-            pass
+        Returns:
+            Tuple of (score, list of factors)
+        """
+        mask = self.spec.row_mask(row)
+        return int(self.spec.scores[mask]), self.spec.mask_factors(mask)
 
-        # Factor 3: AOA (Interagency/All Other Agencies)
-        reason_category = row.get('reason_category', '').strip() if pd.notna(row.get('reason_category')) else ''
-        if reason_category.lower() == 'interagency' or 'aoa' in str(row.get('reason', '')).lower():
-            score += 20
-            factors.append('AOA/Interagency reason')
+    def analyze_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add suspicion scores and factors to dataframe
 
-        # Factor 4: Invalid reason or OTHER
-        reason_bucket = row.get('reason_bucket', '').strip() if pd.notna(row.get('reason_bucket')) else ''
-        if reason_bucket in ['Invalid_Reason', 'Case_Number', 'OTHER'] or reason_category == 'OTHER':
-            score += 10
-            factors.append('Invalid/ambiguous reason')
+        Vectorized: each factor is a boolean column, combined into a bitmask
+        that indexes precomputed scores and risk_factors strings. Produces
+        the same output as analyze_data_rowwise.
+        """
+        logger.info("Calculating suspicion scores...")
 
-        # Cap at 100
-        score = min(score, 100)
+        mask = self.spec.factor_mask(df)
+        df['suspicion_score'] = self.spec.scores[mask]
+        df['risk_factors'] = self.spec.labels[mask]
 
-        return score, factors
+        return df
 
-    def analyze_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def analyze_data_rowwise(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Add suspicion scores and factors to dataframe
+        Reference implementation of analyze_data: calculate_suspicion_score
+        per row (slow; kept for verification and benchmarks)
         """
-        logger.info("Calculating suspicion scores...")
+        logger.info("Calculating suspicion scores row by row...")
 
         scores = []
         factor_lists = []
@@ -117,52 +286,152 @@ class SuspicionRankingAnalyzer:
 
         return df
 
-    def generate_summary_statistics(self, df: pd.DataFrame) -> Dict:
-        """
-        Generate summary statistics for the report
-        """
-        stats = {
+    @staticmethod
+    def _summary_statistics(counts: Dict) -> Dict:
+        """Add percentages to the counts (shared by in-memory and pushdown modes)"""
+        stats = {key: int(value) for key, value in counts.items()}
+        stats['participating_pct'] = round(stats['participating_searches'] / stats['total_searches'] * 100, 2)
+        return stats
+
+    @staticmethod
+    def _participating(df: pd.DataFrame) -> pd.Series:
+        """Boolean mask of searches by participating agencies (nulls are False)"""
+        return (df['is_participating_agency'] == True).fillna(False).astype(bool)
+
+    def _search_counts(self, df: pd.DataFrame, participating: pd.Series) -> Dict:
+        """Per-search counts; these add up across batches"""
+        case_num = df['case_num']
+        return {
             'total_searches': len(df),
-            'unique_agencies': df['org_name'].nunique(),
-            'participating_agencies': df[df['is_participating_agency'] == True]['org_name'].nunique(),
-            'participating_searches': (df['is_participating_agency'] == True).sum(),
-            'participating_pct': round((df['is_participating_agency'] == True).sum() / len(df) * 100, 2),
+            'participating_searches': participating.sum(),
 
             # Suspicion score distribution
-            'zero_suspicion': (df['suspicion_score'] == 0).sum(),
-            'low_suspicion': ((df['suspicion_score'] > 0) & (df['suspicion_score'] <= 30)).sum(),
-            'moderate_suspicion': ((df['suspicion_score'] > 30) & (df['suspicion_score'] <= 60)).sum(),
-            'high_suspicion': ((df['suspicion_score'] > 60) & (df['suspicion_score'] < 100)).sum(),
-            'very_high_suspicion': (df['suspicion_score'] == 100).sum(),
+            **{key: df['suspicion_score'].between(low, high).sum() for key, low, high in self.SCORE_BUCKETS},
 
             # Case number statistics
-            'searches_with_case_number': df[df['case_num'].notna() & (df['case_num'] != '')].shape[0],
-            'searches_without_case_number': df[df['case_num'].isna() | (df['case_num'] == '')].shape[0],
+            'searches_with_case_number': (case_num.notna() & (case_num != '')).sum(),
+            'searches_without_case_number': (case_num.isna() | (case_num == '')).sum(),
 
             # Reason distribution
-            'aoa_searches': df[df['reason_category'] == 'Interagency'].shape[0],
-            'invalid_reason_searches': df[df['reason_bucket'].isin(['Invalid_Reason', 'Case_Number', 'OTHER'])].shape[0],
-            'valid_reason_searches': df[df['reason_bucket'] == 'Valid_Reason'].shape[0],
+            'aoa_searches': (df['reason_category'] == 'Interagency').sum(),
+            'invalid_reason_searches': df['reason_bucket'].isin(self.INVALID_REASON_BUCKETS).sum(),
+            'valid_reason_searches': (df['reason_bucket'] == 'Valid_Reason').sum(),
         }
 
-        return stats
+    def generate_summary_statistics(self, df: pd.DataFrame) -> Dict:
+        """
+        Generate summary statistics for the report
+        """
+        participating = self._participating(df)
+        counts = self._search_counts(df, participating)
+        counts['unique_agencies'] = df['org_name'].nunique()
+        counts['participating_agencies'] = df.loc[participating, 'org_name'].nunique()
+
+        return self._summary_statistics(counts)
+
+    def get_high_risk_searches(self, df: pd.DataFrame, min_score: int = HIGH_RISK_MIN_SCORE) -> pd.DataFrame:
+        """Get searches with high suspicion scores, highest first"""
+        high_risk = df[df['suspicion_score'] >= min_score].sort_values(
+            ['suspicion_score'] + self.HIGH_RISK_ORDER,
+            ascending=[False] + [True] * len(self.HIGH_RISK_ORDER),
+            na_position='last',
+            kind='stable'
+        )
+        return high_risk[self.HIGH_RISK_COLUMNS]
+
+    def summarize_in_warehouse(
+        self,
+        min_score: int = HIGH_RISK_MIN_SCORE,
+        top_n: int = HIGH_RISK_TOP_N
+    ) -> Tuple[Dict, pd.DataFrame, int]:
+        """
+        Pushdown mode: score, aggregate and rank server-side
 
-    def get_high_risk_searches(self, df: pd.DataFrame, min_score: int = 60) -> pd.DataFrame:
-        """Get searches with high suspicion scores"""
-        high_risk = df[df['suspicion_score'] >= min_score].sort_values('suspicion_score', ascending=False)
-        return high_risk[['org_name', 'matched_agency', 'matched_state', 'case_num',
-                          'reason', 'reason_category', 'suspicion_score', 'risk_factors']]
+        Only the columns the report reads are scanned, and only one row of
+        counts plus the top-N high-risk rows are transferred. Matches
+        generate_summary_statistics / get_high_risk_searches exactly.
 
-    def generate_markdown_report(self, stats: Dict, high_risk_df: pd.DataFrame) -> str:
+        Returns:
+            Tuple of (summary statistics, top-N high-risk searches, total high-risk searches)
+        """
+        scored = textwrap.indent(self.spec.scoring_query(self.source_query(self.needed_columns())), ' ' * 12)
+        buckets = ''.join(
+            f'\n            COUNTIF(suspicion_score BETWEEN {low} AND {high}) AS {key},'
+            for key, low, high in self.SCORE_BUCKETS
+        )
+        invalid = ', '.join(f"'{bucket}'" for bucket in self.INVALID_REASON_BUCKETS)
+        stats_query = f"""
+        SELECT
+            COUNT(*) AS total_searches,
+            COUNT(DISTINCT org_name) AS unique_agencies,
+            COUNT(DISTINCT IF(is_participating_agency IS TRUE, org_name, NULL)) AS participating_agencies,
+            COUNTIF(is_participating_agency IS TRUE) AS participating_searches,{buckets}
+            COUNTIF(case_num IS NOT NULL AND case_num != '') AS searches_with_case_number,
+            COUNTIF(case_num IS NULL OR case_num = '') AS searches_without_case_number,
+            COUNTIF(reason_category = 'Interagency') AS aoa_searches,
+            COUNTIF(reason_bucket IN ({invalid})) AS invalid_reason_searches,
+            COUNTIF(reason_bucket = 'Valid_Reason') AS valid_reason_searches,
+            COUNTIF(suspicion_score >= {int(min_score)}) AS high_risk_searches
+        FROM (
+{scored}
+        )
+        """
+        order = ', '.join(f'{column} ASC NULLS LAST' for column in self.HIGH_RISK_ORDER)
+        top_query = f"""
+        SELECT {', '.join(self.HIGH_RISK_COLUMNS)}
+        FROM (
+{scored}
+        )
+        WHERE suspicion_score >= {int(min_score)}
+        ORDER BY suspicion_score DESC, {order}
+        LIMIT {int(top_n)}
+        """
+
+        logger.info("Scoring and aggregating in the warehouse...")
+        stats_job = self.client.query(stats_query)
+        counts = dict(next(iter(stats_job.result())).items())
+        top_job = self.client.query(top_query)
+        high_risk = top_job.to_dataframe()
+        high_risk_total = int(counts.pop('high_risk_searches'))
+        scanned = (stats_job.total_bytes_processed or 0) + (top_job.total_bytes_processed or 0)
+        logger.info(
+            f"Summarized {counts['total_searches']} searches in the warehouse "
+            f"({scanned / 1024 ** 2:.1f} MB scanned, {len(high_risk)} rows transferred)"
+        )
+        return self._summary_statistics(counts), high_risk, high_risk_total
+
+    def generate_markdown_report(self, stats: Dict, high_risk_df: pd.DataFrame,
+                                 high_risk_total: Optional[int] = None,
+                                 data_period: str = 'October 2025',
+                                 source_table: Optional[str] = None) -> str:
         """
         Generate markdown formatted report for Attorney General
+
+        Args:
+            stats: Summary statistics
+            high_risk_df: High-risk searches, highest first (at least the top 30)
+            high_risk_total: Number of high-risk searches (default: len(high_risk_df))
+            data_period: Month (or description) the searches cover
+            source_table: Table the searches came from (default: SOURCE_TABLE)
         """
+        if high_risk_total is None:
+            high_risk_total = len(high_risk_df)
+        source_table = source_table or self.SOURCE_TABLE
+
+        # Methodology and formula come from the scoring spec
+        methodology = '\n\n'.join(
+            f'{i}. **{factor.title or factor.label}** (+{factor.points} points)'
+            + ''.join(f'\n   - {line}' for line in factor.description)
+            for i, factor in enumerate(self.spec.factors, 1)
+        )
+        formula = ' +\n'.join(f'    ({factor.name} * {factor.points})' for factor in self.spec.factors)
+
         report = f"""# Colorado Attorney General
 ## Suspicion Ranking Report: Potential Violations of State Law
 ### Police Assistance in Federal Immigration Cases
 
 **Report Generated**: {datetime.now().strftime('%B %d, %Y')}
-**Data Period**: October 2025
+**Data Period**: {data_period}
 **Data Source**: Durango Police Department Flock Search Logs
 
 ---
@@ -179,22 +448,7 @@ This analysis examines the likelihood of Colorado law violations regarding polic
 
 Each search is scored based on the following risk factors:
 
-1. **Participating Agency** (+40 points)
-   - Agency is known to participate in ICE collaboration via Flock Safety
-   - Indicates direct connection to federal immigration enforcement network
-
-2. **No Case Number** (+30 points)
-   - Case number absent or not provided
-   - Redacted case numbers are acceptable (do not trigger this factor)
-   - Absence suggests potential undocumented activity
-
-3. **AOA/Interagency Reason** (+20 points)
-   - Search reason classified as "All Other Agencies" or Interagency
-   - Suggests coordination with external agencies (potentially federal)
-
-4. **Invalid/Ambiguous Reason** (+10 points)
-   - Reason field is invalid, blank, or unclassified
-   - Lack of documented legitimate purpose
+{methodology}
 
 **Scoring Scale**:
 - 0% (0 points): No risk factors present
@@ -258,12 +512,12 @@ The following searches represent the highest potential risk of law violations:
 
 """
 
-        if len(high_risk_df) > 0:
-            report += f"\n**Total High-Risk Searches**: {len(high_risk_df)}\n\n"
+        if high_risk_total > 0:
+            report += f"\n**Total High-Risk Searches**: {high_risk_total}\n\n"
 
             # Top 30 highest risk
-            top_risk = high_risk_df.head(30)
-            report += "### Top 30 Highest Risk Searches\n\n"
+            top_risk = high_risk_df.head(self.HIGH_RISK_TOP_N)
+            report += f"### Top {self.HIGH_RISK_TOP_N} Highest Risk Searches\n\n"
             report += "| Agency | Matched Agency | State | Case # | Reason | Score | Risk Factors |\n"
             report += "|--------|---|---|---|---|---|---|\n"
 
@@ -281,7 +535,7 @@ The following searches represent the highest potential risk of law violations:
             report += "\nNo high-risk searches found.\n"
 
         # Recommendations
-        report += """
+        report += f"""
 
 ---
 
@@ -337,17 +591,14 @@ The following searches represent the highest potential risk of law violations:
 **Risk Scoring Formula**:
 ```
 Suspicion Score =
-    (is_participating_agency * 40) +
-    (no_case_number * 30) +
-    (aoa_reason * 20) +
-    (invalid_reason * 10)
+{formula}
 
-Score is capped at 100 and represents likelihood of violation.
+Score is capped at {self.spec.max_score} and represents likelihood of violation.
 ```
 
 **Data Sources**:
-- Table: `durango-deflock.DurangoPD.October2025_classified`
-- Table: `durango-deflock.FlockML.org_name_rule_based_matches`
+- Table: `{source_table}`
+- Table: `{self.MATCHES_TABLE}`
 - Classification fields: is_participating_agency, case_num, reason_category, reason_bucket
 
 **Report Generated**: {datetime.now().isoformat()}
@@ -360,25 +611,129 @@ Score is capped at 100 and represents likelihood of violation.
 
         return report
 
-    def run(self, output_file: str = 'Colorado_AG_Suspicion_Report.md') -> str:
+    def view_sql(self) -> str:
+        """CREATE VIEW statement scoring source_query() with the spec"""
+        return self.spec.render_sql(self.source_query(), self.VIEW_ID)
+
+    def write_view_sql(self, path: Optional[str] = None, check: bool = False) -> bool:
         """
-        Run the complete analysis and generate report
+        Regenerate the view between the GENERATED markers of the SQL file
+
+        Args:
+            path: SQL file (default: sql/27_suspicion_ranking_analysis.sql)
+            check: Only report whether the file is out of date
+
+        Returns:
+            True if the file was (or, with check, would be) changed
         """
-        try:
-            # Fetch data
-            df = self.fetch_data()
+        path = path or self.VIEW_SQL_FILE
+        with open(path) as f:
+            text = f.read()
+        begin = text.index(self.GENERATED_BEGIN)
+        begin = text.index('\n', begin) + 1
+        end = text.index(self.GENERATED_END, begin)
+        updated = text[:begin] + self.view_sql() + text[end:]
+        if updated == text:
+            return False
+        if not check:
+            with open(path, 'w') as f:
+                f.write(updated)
+            logger.info(f"Regenerated suspicion view in {path}")
+        return True
+
+    def summarize_stream(
+        self,
+        export: Optional[DetailedExport] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+        min_score: int = HIGH_RISK_MIN_SCORE,
+        top_n: int = HIGH_RISK_TOP_N
+    ) -> Tuple[Dict, pd.DataFrame, int]:
+        """
+        Streaming mode: score fetch_batches() one batch at a time
 
-            # Calculate suspicion scores
-            df = self.analyze_data(df)
+        Running aggregates replace the full DataFrame and each scored batch
+        is appended to the detailed export, so memory stays constant.
+        Matches generate_summary_statistics / get_high_risk_searches exactly.
 
-            # Generate statistics
-            stats = self.generate_summary_statistics(df)
+        Args:
+            export: Per-search export to append each batch to (optional;
+                    the caller closes it)
 
-            # Get high-risk searches
-            high_risk = self.get_high_risk_searches(df, min_score=60)
+        Returns:
+            Tuple of (summary statistics, top-N high-risk searches, total high-risk searches)
+        """
+        summary = StreamingSummary(self, min_score=min_score, top_n=top_n)
+        for batch in self.fetch_batches(batch_size):
+            batch = self.analyze_data(batch)
+            summary.update(batch)
+            if export is not None:
+                export.write(batch)
+            logger.info(f"Scored {summary.counts.get('total_searches', 0)} searches")
+        return summary.result()
+
+    def detailed_export(self, output_file: str, export_format: str = 'csv',
+                        partition_by: Optional[str] = None) -> DetailedExport:
+        """
+        Per-search export next to the report: <report>_detailed_data.csv,
+        or the <report>_detailed_data/ Parquet dataset
+
+        Args:
+            output_file: Markdown report path
+            export_format: 'csv' or 'parquet'
+            partition_by: Parquet partition column ('matched_state' or 'suspicion_level')
+        """
+        path = output_file.replace('.md', '_detailed_data')
+        if export_format == 'csv':
+            path += '.csv'
+        return DetailedExport(path, self.DETAILED_COLUMNS, fmt=export_format,
+                              partition_by=partition_by, spec=self.spec)
+
+    def run(self, output_file: str = 'Colorado_AG_Suspicion_Report.md', pushdown: bool = False,
+            stream: bool = False, batch_size: int = STREAM_BATCH_SIZE,
+            export_format: str = 'csv', partition_by: Optional[str] = None) -> str:
+        """
+        Run the complete analysis and generate report
+
+        Args:
+            output_file: Markdown report path
+            pushdown: Compute scores, statistics and the high-risk table in
+                      the warehouse instead of fetching every row (no
+                      per-search CSV export)
+            stream: Fetch and score batch_size rows at a time, appending
+                    to the per-search export as it goes (constant memory)
+            batch_size: Rows per batch in streaming mode
+            export_format: Per-search export as 'csv' or 'parquet'
+            partition_by: Split the Parquet export by 'matched_state' or
+                          'suspicion_level'
+        """
+        if pushdown and stream:
+            raise ValueError('pushdown and stream modes are mutually exclusive')
+        export = None if pushdown else self.detailed_export(output_file, export_format, partition_by)
+        try:
+            if pushdown:
+                # Statistics and top-N high-risk rows computed server-side
+                df = None
+                stats, high_risk, high_risk_total = self.summarize_in_warehouse()
+            elif stream:
+                # Running aggregates; the detailed export is written batch by batch
+                df = None
+                stats, high_risk, high_risk_total = self.summarize_stream(export, batch_size)
+            else:
+                # Fetch data
+                df = self.fetch_data()
+
+                # Calculate suspicion scores
+                df = self.analyze_data(df)
+
+                # Generate statistics
+                stats = self.generate_summary_statistics(df)
+
+                # Get high-risk searches
+                high_risk = self.get_high_risk_searches(df, min_score=self.HIGH_RISK_MIN_SCORE)
+                high_risk_total = None
 
             # Generate report
-            report = self.generate_markdown_report(stats, high_risk)
+            report = self.generate_markdown_report(stats, high_risk, high_risk_total)
 
             # Save report
             with open(output_file, 'w') as f:
@@ -387,12 +742,12 @@ Score is capped at 100 and represents likelihood of violation.
             logger.info(f"Report saved to {output_file}")
 
             # Save detailed data for further analysis
-            detailed_file = output_file.replace('.md', '_detailed_data.csv')
-            df_export = df[['org_name', 'matched_agency', 'matched_state', 'is_participating_agency',
-                            'case_num', 'reason', 'reason_category', 'reason_bucket',
-                            'suspicion_score', 'risk_factors']].copy()
-            df_export.to_csv(detailed_file, index=False)
-            logger.info(f"Detailed data saved to {detailed_file}")
+            if export is None:
+                logger.info("Pushdown mode: per-search data not exported")
+            else:
+                if df is not None:
+                    export.write(df)
+                export.close()
 
             # Summary statistics
             logger.info(f"\n=== SUMMARY ===")
@@ -404,11 +759,267 @@ Score is capped at 100 and represents likelihood of violation.
             return report
 
         except Exception as e:
+            if export is not None:
+                export.abort()
             logger.error(f"Error running analysis: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def _add_agency_totals(df: pd.DataFrame, totals: Optional[pd.DataFrame],
+                           min_score: int = HIGH_RISK_MIN_SCORE) -> pd.DataFrame:
+        """Add a scored batch's per-(dataset, agency) counts to the running totals"""
+        scores = df['suspicion_score']
+        batch = pd.DataFrame({
+            'dataset_id': df['dataset_id'].astype(object),
+            'org_name': df['org_name'].astype(object),
+            'searches': 1,
+            'score_sum': scores,
+            'high_risk_searches': (scores >= min_score).astype(int),
+        }).groupby(['dataset_id', 'org_name']).sum()
+        return batch if totals is None else totals.add(batch, fill_value=0)
+
+    @staticmethod
+    def chronological(datasets: List[ReportDataset]) -> List[ReportDataset]:
+        """Datasets by month; ones without a parsed month keep priority order at the end"""
+        return sorted(datasets, key=lambda dataset: (dataset.period is None, dataset.period or datetime.min))
+
+    def agency_ranks(self, totals: pd.DataFrame, datasets: List[ReportDataset]) -> pd.DataFrame:
+        """
+        Rank agencies within each dataset by high-risk searches, then mean score
+
+        Returns:
+            One row per (dataset, agency), datasets in chronological order
+        """
+        order = {dataset.config_id: i for i, dataset in enumerate(self.chronological(datasets))}
+        labels = {dataset.config_id: dataset.label for dataset in datasets}
+        ranks = totals.reset_index().astype({'searches': int, 'score_sum': int, 'high_risk_searches': int})
+        ranks['mean_score'] = (ranks['score_sum'] / ranks['searches']).round(1)
+        ranks['order'] = ranks['dataset_id'].map(order)
+        ranks = ranks.sort_values(
+            ['order', 'high_risk_searches', 'mean_score', 'org_name'],
+            ascending=[True, False, False, True],
+            kind='stable'
+        )
+        ranks['rank'] = ranks.groupby('dataset_id').cumcount() + 1
+        ranks['period'] = ranks['dataset_id'].map(labels)
+        return ranks[['dataset_id', 'period', 'rank', 'org_name', 'searches', 'high_risk_searches', 'mean_score']]
+
+    def generate_rank_comparison(self, ranks: pd.DataFrame, datasets: List[ReportDataset],
+                                 top_n: int = HIGH_RISK_TOP_N) -> str:
+        """
+        Markdown table of each agency's rank per dataset, for the top_n
+        agencies by high-risk searches across all datasets
+        """
+        present = set(ranks['dataset_id'])
+        ordered = [dataset for dataset in self.chronological(datasets) if dataset.config_id in present]
+        by_agency = ranks.groupby('org_name').agg(
+            high_risk_searches=('high_risk_searches', 'sum'), searches=('searches', 'sum')
+        ).reset_index()
+        top = by_agency.sort_values(['high_risk_searches', 'searches', 'org_name'],
+                                    ascending=[False, False, True], kind='stable').head(top_n)
+        rank = ranks.set_index(['org_name', 'dataset_id'])['rank']
+
+        report = f"""# Agency Suspicion Rank Over Time
+
+**Report Generated**: {datetime.now().strftime('%B %d, %Y')}
+**Datasets**: {', '.join(dataset.label for dataset in ordered)}
+
+Agencies are ranked within each dataset by high-risk searches ({self.HIGH_RISK_MIN_SCORE}%+ suspicion), then by mean suspicion score (1 = most suspicious). The top {top_n} agencies by high-risk searches across all datasets are shown; — means the agency has no searches in that dataset.
+
+| Agency | {' | '.join(dataset.label for dataset in ordered)} | High-Risk Searches |
+|--------|{'---|' * len(ordered)}---|
+"""
+        for _, row in top.iterrows():
+            cells = [
+                str(rank.get((row['org_name'], dataset.config_id), '—')) for dataset in ordered
+            ]
+            org = str(row['org_name']).replace('|', ' ')[:30]
+            report += f"| {org} | {' | '.join(cells)} | {row['high_risk_searches']} |\n"
+        return report
+
+    def run_all(self, output_dir: str = 'suspicion_reports', batch_size: int = STREAM_BATCH_SIZE,
+                workers: int = 4, export_format: str = 'csv',
+                partition_by: Optional[str] = None) -> Dict[str, str]:
+        """
+        Report on every enabled dataset in dataset_pipeline_config in one pass
+
+        All datasets are read by one query with a dataset_id column and
+        streamed in batches; each batch is scored once and split into
+        per-dataset running summaries and detailed exports, while
+        per-(dataset, agency) totals feed the cross-dataset rank
+        comparison. The per-dataset Markdown reports are rendered in a
+        process pool.
+
+        Args:
+            output_dir: Directory for <config_id>_Suspicion_Report.md, the
+                        detailed exports and Agency_Rank_Over_Time.md/.csv
+            batch_size: Rows per streamed batch
+            workers: Report rendering processes (1 renders in-process)
+            export_format: Per-search export as 'csv' or 'parquet'
+            partition_by: Split the Parquet exports by 'matched_state' or
+                          'suspicion_level'
+
+        Returns:
+            config_id (and 'rank_comparison') -> report path
+        """
+        datasets = self.get_report_datasets()
+        if not datasets:
+            raise ValueError(f'No enabled datasets in {self.CONFIG_TABLE}')
+        os.makedirs(output_dir, exist_ok=True)
+        report_files = {
+            dataset.config_id: os.path.join(output_dir, f'{dataset.config_id}_Suspicion_Report.md')
+            for dataset in datasets
+        }
+        summaries = {dataset.config_id: StreamingSummary(self) for dataset in datasets}
+        exports = {
+            config_id: self.detailed_export(path, export_format, partition_by)
+            for config_id, path in report_files.items()
+        }
+        totals = None
+        try:
+            for batch in self.fetch_batches(batch_size, datasets):
+                batch = self.analyze_data(batch)
+                for config_id, rows in batch.groupby('dataset_id', observed=True, sort=False):
+                    summaries[config_id].update(rows)
+                    exports[config_id].write(rows)
+                totals = self._add_agency_totals(batch, totals)
+            for export in exports.values():
+                export.close()
+        except Exception:
+            for export in exports.values():
+                export.abort()
+            raise
+
+        jobs = []
+        for dataset in datasets:
+            if summaries[dataset.config_id].high_risk is None:
+                logger.warning(f"{dataset.config_id}: no searches in {dataset.table_id}; no report written")
+                continue
+            stats, high_risk, high_risk_total = summaries[dataset.config_id].result()
+            jobs.append((self.spec, dataset, stats, high_risk, high_risk_total, report_files[dataset.config_id]))
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                written = list(executor.map(_render_dataset_report, jobs))
+        else:
+            written = [_render_dataset_report(job) for job in jobs]
+        paths = dict(zip([job[1].config_id for job in jobs], written))
+
+        if totals is not None:
+            ranks = self.agency_ranks(totals, datasets)
+            ranks.to_csv(os.path.join(output_dir, 'Agency_Rank_Over_Time.csv'), index=False)
+            paths['rank_comparison'] = os.path.join(output_dir, 'Agency_Rank_Over_Time.md')
+            with open(paths['rank_comparison'], 'w') as f:
+                f.write(self.generate_rank_comparison(ranks, datasets))
+
+        for _, dataset, stats, *_ in jobs:
+            logger.info(
+                f"{dataset.config_id}: {stats['total_searches']} searches, "
+                f"{stats['high_suspicion'] + stats['very_high_suspicion']} high risk (60%+)"
+            )
+        logger.info(f"Reports for {len(jobs)} datasets saved to {output_dir}")
+        return paths
+
+
+def _render_dataset_report(job: Tuple) -> str:
+    """Render and save one dataset's report (ProcessPoolExecutor worker for run_all)"""
+    spec, dataset, stats, high_risk, high_risk_total, output_file = job
+    analyzer = SuspicionRankingAnalyzer(client=object(), spec=spec)  # No storage needed
+    report = analyzer.generate_markdown_report(stats, high_risk, high_risk_total,
+                                               data_period=dataset.label, source_table=dataset.table_id)
+    with open(output_file, 'w') as f:
+        f.write(report)
+    return output_file
+
+
+class StreamingSummary:
+    """
+    Running report aggregates over scored batches
+
+    Per-search counts are summed, distinct agencies are kept as exact name
+    sets (bounded by the number of agencies, not searches) and the
+    high-risk table is a top-N merged batch by batch, so result() equals
+    the in-memory statistics and high-risk table for the same rows.
+    """
+
+    def __init__(self, analyzer: SuspicionRankingAnalyzer,
+                 min_score: int = SuspicionRankingAnalyzer.HIGH_RISK_MIN_SCORE,
+                 top_n: int = SuspicionRankingAnalyzer.HIGH_RISK_TOP_N):
+        self.analyzer = analyzer
+        self.min_score = min_score
+        self.top_n = top_n
+        self.counts: Dict[str, int] = {}
+        self.agencies: Set[str] = set()
+        self.participating_agencies: Set[str] = set()
+        self.high_risk: Optional[pd.DataFrame] = None
+        self.high_risk_total = 0
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Fold one scored batch into the aggregates"""
+        participating = self.analyzer._participating(df)
+        for key, value in self.analyzer._search_counts(df, participating).items():
+            self.counts[key] = self.counts.get(key, 0) + int(value)
+        self.agencies.update(df['org_name'].dropna().unique().tolist())
+        self.participating_agencies.update(df.loc[participating, 'org_name'].dropna().unique().tolist())
+
+        high_risk = self.analyzer.get_high_risk_searches(df, min_score=self.min_score)
+        self.high_risk_total += len(high_risk)
+        if self.high_risk is not None:
+            # Earlier rows first, so the stable sort keeps the in-memory tie order
+            high_risk = pd.concat([self.high_risk, high_risk], ignore_index=True)
+            high_risk = self.analyzer.get_high_risk_searches(high_risk, min_score=self.min_score)
+        self.high_risk = high_risk.head(self.top_n)
+
+    def result(self) -> Tuple[Dict, pd.DataFrame, int]:
+        """(summary statistics, top-N high-risk searches, total high-risk searches)"""
+        if self.high_risk is None:
+            raise ValueError('No rows to summarize')
+        counts = dict(self.counts, unique_agencies=len(self.agencies),
+                      participating_agencies=len(self.participating_agencies))
+        return self.analyzer._summary_statistics(counts), self.high_risk, self.high_risk_total
+
 
 if __name__ == '__main__':
-    analyzer = SuspicionRankingAnalyzer()
-    report = analyzer.run(output_file='Colorado_AG_Suspicion_Report.md')
-    print("\n✓ Report generated successfully!")
+    parser = argparse.ArgumentParser(description='Colorado AG suspicion ranking report')
+    parser.add_argument('--render-sql', action='store_true',
+                        help='Regenerate the scoring view in sql/27_suspicion_ranking_analysis.sql from the spec')
+    parser.add_argument('--check-sql', action='store_true',
+                        help='Exit non-zero if the SQL view is out of date with the spec')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--pushdown', action='store_true',
+                      help='Score and aggregate in the warehouse; transfer only counts and the top-N rows')
+    mode.add_argument('--stream', action='store_true',
+                      help='Fetch and score in fixed-size batches with constant memory')
+    mode.add_argument('--all-datasets', action='store_true',
+                      help='Stream every enabled dataset_pipeline_config dataset in one pass and '
+                           'compare agency ranks across them')
+    parser.add_argument('--output-dir', default='suspicion_reports',
+                        help='Report directory with --all-datasets (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Report rendering processes with --all-datasets (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=SuspicionRankingAnalyzer.STREAM_BATCH_SIZE,
+                        help='Rows per batch with --stream / --all-datasets (default: %(default)s)')
+    parser.add_argument('--export-format', choices=['csv', 'parquet'], default='csv',
+                        help='Per-search detailed export format (default: csv)')
+    parser.add_argument('--partition-by', choices=['matched_state', 'suspicion_level'],
+                        help='Partition the Parquet export into one directory per value')
+    args = parser.parse_args()
+    if args.partition_by and args.export_format != 'parquet':
+        parser.error('--partition-by requires --export-format parquet')
+
+    if args.render_sql or args.check_sql:
+        analyzer = SuspicionRankingAnalyzer(client=object())  # No storage needed
+        changed = analyzer.write_view_sql(check=args.check_sql)
+        if args.check_sql and changed:
+            sys.exit('SQL view is out of date; run: python suspicion_ranking_report.py --render-sql')
+        print('✓ SQL view is up to date' if not changed else '✓ SQL view regenerated')
+    elif args.all_datasets:
+        analyzer = SuspicionRankingAnalyzer()
+        paths = analyzer.run_all(output_dir=args.output_dir, batch_size=args.batch_size, workers=args.workers,
+                                 export_format=args.export_format, partition_by=args.partition_by)
+        print(f"\n✓ {len(paths)} reports generated in {args.output_dir}")
+    else:
+        analyzer = SuspicionRankingAnalyzer()
+        report = analyzer.run(output_file='Colorado_AG_Suspicion_Report.md', pushdown=args.pushdown,
+                              stream=args.stream, batch_size=args.batch_size,
+                              export_format=args.export_format, partition_by=args.partition_by)
+        print("\n✓ Report generated successfully!")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental agency discovery (BigQueryManager.discover_agencies).
+
+A fake client serves dataset_pipeline_config rows and table metadata and
+records the discovery query, so no GCP credentials are needed.
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from google.cloud import bigquery
+
+from geocode_agencies import BigQueryManager
+
+OLD = datetime(2025, 11, 1, tzinfo=timezone.utc)
+NEW = datetime(2025, 12, 1, tzinfo=timezone.utc)
+
+
+class FakeJob:
+    def __init__(self, rows):
+        self.rows = rows
+        self.total_bytes_processed = 1234
+        self.total_bytes_billed = 10485760
+
+    def result(self):
+        return iter(self.rows)
+
+
+class FakeClient:
+    def __init__(self, config_rows, tables, discovery_rows):
+        self.config_rows = config_rows
+        self.tables = tables
+        self.discovery_rows = discovery_rows
+        self.queries = []
+
+    def get_table(self, table_id):
+        return self.tables[table_id]
+
+    def query(self, sql, job_config=None):
+        self.queries.append((sql, job_config))
+        if sql.lstrip().startswith('UPDATE'):
+            return FakeJob([])
+        if 'dataset_pipeline_config' in sql:
+            return FakeJob(self.config_rows)
+        return FakeJob(self.discovery_rows)
+
+
+def table(modified, partition_field=None):
+    return SimpleNamespace(
+        modified=modified,
+        time_partitioning=SimpleNamespace(field=partition_field) if partition_field else None,
+        schema=[bigquery.SchemaField('ingested_on', 'DATE'), bigquery.SchemaField('org_name', 'STRING')],
+    )
+
+
+def config_row(config_id, table_name, column=None, high_water=None, last_modified=None):
+    return {
+        'config_id': config_id,
+        'table_id': f'durango-deflock.DurangoPD.{table_name}',
+        'geocode_watermark_column': column,
+        'geocode_high_water_mark': high_water,
+        'geocode_last_modified': last_modified,
+    }
+
+
+def test_incremental_discovery_and_watermarks():
+    client = FakeClient(
+        config_rows=[
+            config_row('oct', 'October2025', last_modified=OLD),  # unchanged -> skipped
+            config_row('live', 'Live', high_water=OLD, last_modified=OLD),  # new partitions only
+            config_row('dec', 'December2025'),  # never discovered -> full scan
+        ],
+        tables={
+            'durango-deflock.DurangoPD.October2025': table(OLD),
+            'durango-deflock.DurangoPD.Live': table(NEW, partition_field='ingested_on'),
+            'durango-deflock.DurangoPD.December2025': table(NEW),
+        },
+        discovery_rows=[
+            {'kind': 'agency', 'org_name': 'Pueblo CO PD', 'source_index': None, 'high_water': None},
+            {'kind': 'agency', 'org_name': 'Alamosa CO SO', 'source_index': None, 'high_water': None},
+            {'kind': 'watermark', 'org_name': None, 'source_index': 0, 'high_water': NEW},
+            {'kind': 'watermark', 'org_name': None, 'source_index': 1, 'high_water': None},
+        ],
+    )
+    bq = BigQueryManager(client=client)
+
+    discovery = bq.discover_agencies(bq.get_discovery_sources())
+    assert discovery.agencies == ['Alamosa CO SO', 'Pueblo CO PD']
+    assert discovery.skipped == ['oct']
+    assert discovery.scanned == ['live', 'dec']
+    assert discovery.bytes_processed == 1234
+    assert discovery.watermarks == {'live': (NEW, NEW), 'dec': (None, NEW)}
+
+    sql, job_config = client.queries[-1]
+    assert 'October2025' not in sql
+    # Partition column pruned with a typed parameter, not a literal
+    assert 'WHERE ingested_on >= @high_water_0' in sql
+    [param] = job_config.query_parameters
+    assert (param.name, param.type_, param.value) == ('high_water_0', 'DATE', OLD.date())
+    # Failed geocodes are still retried and the anti-join is a LEFT JOIN
+    assert 'FROM `durango-deflock.FlockML.agency_locations` GROUP BY org_name' in sql
+    assert 'LEFT JOIN geocoded g' in sql and 'NOT IN' not in sql
+
+    assert bq.commit_watermarks(discovery)
+    update_sql, update_config = client.queries[-1]
+    assert 'UPDATE `durango-deflock.FlockML.dataset_pipeline_config`' in update_sql
+    assert len(update_config.query_parameters) == 2 * 3  # config_id, high_water, last_modified
+
+
+def test_unchanged_sources_only_retry_failed():
+    client = FakeClient(
+        config_rows=[config_row('oct', 'October2025', last_modified=OLD)],
+        tables={'durango-deflock.DurangoPD.October2025': table(OLD)},
+        discovery_rows=[],
+    )
+    bq = BigQueryManager(client=client)
+    discovery = bq.discover_agencies(bq.get_discovery_sources())
+    assert discovery.agencies == [] and discovery.skipped == ['oct']
+    assert len(client.queries) == 2  # Config read + retry-only scan of agency_locations
+
+    # A full scan ignores the recorded watermark
+    discovery = bq.discover_agencies(bq.get_discovery_sources(full_scan=True))
+    assert discovery.scanned == ['oct'] and discovery.skipped == []
+
+
+if __name__ == '__main__':
+    test_incremental_discovery_and_watermarks()
+    test_unchanged_sources_only_retry_failed()
+    print('✓ All agency discovery tests passed')
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the local agency rule classifier (AgencyRuleClassifier).
+
+Covers whole-word matching (no "us" inside "Campus"), longest/most specific
+rule selection, conflicting rules, and county rules derived from a small
+gazetteer.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from agency_rules import AgencyRuleClassifier
+from gazetteer import GazetteerIndex
+
+
+def classify(rules, name):
+    match = rules.classify(name)
+    return (match.state, match.kind, match.city) if match else None
+
+
+def test_builtin_rules():
+    rules = AgencyRuleClassifier()
+    assert classify(rules, 'FBI Field Office') == ('DC', 'federal', None)
+    assert classify(rules, 'U.S. Marshals Service') == ('DC', 'federal', None)
+    assert classify(rules, 'Fort Lewis College Police') == ('CO', 'university', 'Durango')
+    assert classify(rules, "Tohono O'odham Nation Police") == ('AZ', 'tribal', 'Sells')
+    assert classify(rules, 'MARTA Police') == ('GA', 'transit', 'Atlanta')
+    # A place rule beats the federal keyword it contains
+    assert classify(rules, 'National City Police') == ('CA', 'city', 'National City')
+    # Whole words only: "Campus" does not contain the word "us"
+    assert classify(rules, 'Campus Police Department') is None
+    # Equally specific rules for different states are left for the LLM
+    assert classify(rules, 'MARTA BART Joint Task Force') is None
+    assert rules.stats == {'matched': 6, 'unmatched': 1, 'ambiguous': 1}
+    # Repeat lookups (run_geocoding, then the LLM classifier) count once
+    rules.classify('Campus Police Department')
+    assert rules.stats['unmatched'] == 1
+
+
+def test_places_and_ambiguous_words_are_not_federal():
+    rules = AgencyRuleClassifier()
+    assert classify(rules, 'Federal Way Police Department') == ('WA', 'city', 'Federal Way')
+    assert classify(rules, 'Federal Heights CO PD') == ('CO', 'city', 'Federal Heights')
+    # Bare federal words need an agency word next to them
+    assert classify(rules, 'ICE Enforcement and Removal') == ('DC', 'federal', None)
+    assert classify(rules, 'US Marshals Service') == ('DC', 'federal', None)
+    assert classify(rules, 'National Guard Counterdrug') == ('DC', 'federal', None)
+    assert classify(rules, 'National Bank Security') is None
+    assert classify(rules, 'Us Vs Them Task Unit') is None
+    # Short acronyms that are also common words or names are not rules
+    assert classify(rules, 'Dart County SO') is None
+    assert classify(rules, 'Mit Township PD') is None
+    assert classify(rules, 'NYPD Intelligence') == ('NY', 'city', 'New York')
+    assert classify(rules, 'LASD Transit Bureau') == ('CA', 'county', 'Los Angeles')
+
+
+def test_unique_county_rules():
+    gazetteer = GazetteerIndex([
+        ('AZ', 'Maricopa County', 33.3, -112.5),
+        ('TX', 'Harris County', 29.9, -95.4),
+        ('GA', 'Harris County', 32.7, -84.9),
+        ('LA', 'Orleans Parish', 30.0, -90.0),
+        ('CO', 'Durango', 37.3, -107.9),
+    ])
+    rules = AgencyRuleClassifier(rules=[])
+    assert rules.add_unique_counties(gazetteer) == 2
+    assert classify(rules, "Maricopa County Sheriff's Office") == ('AZ', 'county', None)
+    assert classify(rules, 'Orleans Parish Sheriff') == ('LA', 'county', None)
+    assert classify(rules, 'Harris County Constable') is None
+
+
+if __name__ == '__main__':
+    test_builtin_rules()
+    test_places_and_ambiguous_words_are_not_federal()
+    test_unique_county_rules()
+    print('✓ All agency rule tests passed')
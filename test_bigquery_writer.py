@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Tests for batched BigQuery writes (BufferedRowWriter / BigQueryManager).
+
+Uses a fake client that records every insert_rows_json / load_table_from_file
+call, so no GCP credentials are needed.
+"""
+
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from geocode_agencies import BigQueryManager, BufferedRowWriter
+
+
+class FakeLoadJob:
+    def result(self):
+        return self
+
+
+class FakeQueryJob:
+    def __init__(self, affected, error=None):
+        self.num_dml_affected_rows = affected
+        self.error = error
+
+    def result(self):
+        if self.error:
+            raise self.error
+        return self
+
+
+class FakeClient:
+    """Records calls; rejects rows whose org_name starts with 'BAD'."""
+
+    def __init__(self, query_error=None):
+        self.insert_calls = []
+        self.load_calls = []
+        self.queries = []
+        self.deleted_tables = []
+        self.query_error = query_error
+
+    def query(self, sql):
+        self.queries.append(sql)
+        return FakeQueryJob(affected=sum(len(rows) for _, rows, _ in self.load_calls), error=self.query_error)
+
+    def delete_table(self, table_ref, not_found_ok=False):
+        self.deleted_tables.append(table_ref)
+
+    def insert_rows_json(self, table_ref, rows):
+        self.insert_calls.append((table_ref, list(rows)))
+        return [
+            {'index': i, 'errors': [{'reason': 'invalid'}]}
+            for i, row in enumerate(rows)
+            if row['org_name'].startswith('BAD')
+        ]
+
+    def load_table_from_file(self, f, table_ref, job_config=None):
+        rows = [json.loads(line) for line in f.read().decode('utf-8').splitlines()]
+        self.load_calls.append((table_ref, rows, job_config))
+        return FakeLoadJob()
+
+
+def insert(bq, org_name):
+    return bq.insert_agency_location(
+        org_name=org_name, city='Durango', state='CO', latitude=37.27, longitude=-107.88,
+        geocode_confidence='high', geocode_source='nominatim', display_name='Durango, CO',
+        geocode_method='original'
+    )
+
+
+def test_stream_mode_batches_by_row_count():
+    client = FakeClient()
+    bq = BigQueryManager(client=client)
+    bq.start_batch(mode='stream', max_rows=3)
+
+    for i in range(7):
+        assert insert(bq, f'Agency {i}')
+    assert [len(rows) for _, rows in client.insert_calls] == [3, 3]
+
+    writer = bq.writer
+    bq.close()
+    assert [len(rows) for _, rows in client.insert_calls] == [3, 3, 1]
+    assert writer.rows_written == 7
+    assert writer.requests == 3
+    assert client.insert_calls[0][1][0]['notes'] == '[Method: original]'
+
+
+def test_stream_mode_flushes_by_bytes():
+    client = FakeClient()
+    writer = BufferedRowWriter(client, 'p.d.t', max_rows=1000, max_bytes=200)
+    for i in range(5):
+        writer.add({'org_name': f'Agency {i}', 'notes': 'x' * 80})
+    writer.close()
+    assert all(len(rows) <= 2 for _, rows in client.insert_calls)
+    assert writer.rows_written == 5
+
+
+def test_per_row_errors_reported_in_bulk():
+    client = FakeClient()
+    bq = BigQueryManager(client=client)
+    writer = bq.start_batch(mode='stream', max_rows=10)
+    for name in ['Good 1', 'BAD 1', 'Good 2', 'BAD 2']:
+        insert(bq, name)
+    bq.close()
+
+    assert len(client.insert_calls) == 1
+    assert writer.rows_written == 2
+    assert [org_name for org_name, _ in writer.failed_rows] == ['BAD 1', 'BAD 2']
+
+
+def test_load_mode_uses_single_load_job():
+    client = FakeClient()
+    bq = BigQueryManager(client=client)
+    writer = bq.start_batch(mode='load')
+    for i in range(1200):
+        insert(bq, f'Agency {i}')
+    staging = writer._staging.name
+    bq.close()
+
+    assert client.insert_calls == []
+    assert len(client.load_calls) == 1
+    assert len(client.load_calls[0][1]) == 1200
+    assert writer.rows_written == 1200
+    assert not os.path.exists(staging)
+
+
+def test_upsert_mode_stages_then_merges():
+    client = FakeClient()
+    bq = BigQueryManager(client=client)
+    bq.start_batch(mode='upsert')
+    staging_ref = bq.staging_ref
+    for i in range(10):
+        insert(bq, f'Agency {i % 4}')
+    bq.close()
+
+    assert client.insert_calls == []
+    assert len(client.load_calls) == 1
+    assert client.load_calls[0][0] == staging_ref
+    assert client.load_calls[0][2].write_disposition == 'WRITE_TRUNCATE'
+    assert len(client.queries) == 1
+    merge = client.queries[0]
+    assert merge.lstrip().startswith(f'MERGE `{bq.table_ref}`')
+    assert f'FROM `{staging_ref}`' in merge
+    assert 'PARTITION BY org_name' in merge
+    assert client.deleted_tables == [staging_ref]
+    assert bq.upserted_rows == 10
+
+
+def test_failed_merge_marks_staged_rows_failed():
+    client = FakeClient(query_error=RuntimeError('Quota exceeded'))
+    bq = BigQueryManager(client=client)
+    writer = bq.start_batch(mode='upsert')
+    staging_ref = bq.staging_ref
+    for i in range(3):
+        insert(bq, f'Agency {i}')
+    bq.close()
+
+    assert len(client.queries) == 1
+    # Every staged row is reported, and the staging table is kept
+    assert [org_name for org_name, _ in writer.failed_rows] == ['Agency 0', 'Agency 1', 'Agency 2']
+    assert all('Quota exceeded' in errors for _, errors in writer.failed_rows)
+    assert client.deleted_tables == []
+    assert bq.upserted_rows == 0
+    assert bq.staging_ref is None and bq.writer is None
+
+
+def test_without_batch_inserts_immediately():
+    client = FakeClient()
+    bq = BigQueryManager(client=client)
+    assert insert(bq, 'Agency')
+    assert not insert(bq, 'BAD agency')
+    assert len(client.insert_calls) == 2
+
+
+if __name__ == '__main__':
+    test_stream_mode_batches_by_row_count()
+    test_stream_mode_flushes_by_bytes()
+    test_per_row_errors_reported_in_bulk()
+    test_load_mode_uses_single_load_job()
+    test_upsert_mode_stages_then_merges()
+    test_failed_merge_marks_staged_rows_failed()
+    test_without_batch_inserts_immediately()
+    print('✓ All BigQuery writer tests passed')
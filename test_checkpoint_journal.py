@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the geocoding checkpoint journal (CheckpointJournal).
+
+Checks that journal state survives a reopen (including a line truncated by
+a crash), that unwritten rows are reported for replay, that rows whose
+BigQuery load job failed stay pending, and that compaction keeps exactly
+one line per agency.
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from geocode_agencies import BigQueryManager, CheckpointJournal
+
+
+class FailingLoadClient:
+    """BigQuery client whose load jobs always fail."""
+
+    def load_table_from_file(self, f, table_ref, job_config=None):
+        raise RuntimeError('Load job failed: quota exceeded')
+
+    def delete_table(self, table_ref, not_found_ok=False):
+        pass
+
+
+ROW = {
+    'org_name': 'Houston TX PD', 'city': 'Houston', 'state': 'TX', 'latitude': 29.76,
+    'longitude': -95.37, 'geocode_confidence': 'high', 'geocode_source': 'nominatim',
+    'display_name': 'Houston, TX', 'geocode_method': 'original', 'notes': None
+}
+
+
+def write_interrupted_run(path):
+    journal = CheckpointJournal(path)
+    journal.start_run(['Houston TX PD', 'Denver CO PD', 'Garbage name'])
+    journal.record_parsed('Houston TX PD', 'Houston', 'TX', 'parser')
+    journal.record_parsed('Denver CO PD', 'Denver', 'CO', 'parser')
+    journal.record_geocoded('Houston TX PD', ROW)
+    journal.close()
+    # Simulate a crash in the middle of writing the next record
+    with open(path, 'a') as f:
+        f.write('{"stage": "parsed", "org_na')
+
+
+def test_reopen_resumes_interrupted_run():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal.jsonl')
+        write_interrupted_run(path)
+
+        journal = CheckpointJournal(path)
+        assert journal.skipped_lines == 1
+        assert journal.run_agencies == ['Houston TX PD', 'Denver CO PD', 'Garbage name']
+        assert journal.stage('Houston TX PD') == 'geocoded'
+        assert journal.parsed('Denver CO PD') == ('Denver', 'CO', 'parser')
+        assert journal.stage('Garbage name') is None
+        assert journal.pending_rows() == {'Houston TX PD': ROW}
+
+        journal.record_written(['Houston TX PD'])
+        journal.finish_run()
+        journal.close()
+
+        journal = CheckpointJournal(path)
+        assert journal.run_agencies is None
+        assert journal.pending_rows() == {}
+        journal.close()
+
+
+def test_failed_load_job_keeps_rows_pending():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal.jsonl')
+        journal = CheckpointJournal(path)
+        denver = dict(ROW, org_name='Denver CO PD', city='Denver', state='CO')
+        journal.record_geocoded('Houston TX PD', ROW)
+        journal.record_geocoded('Denver CO PD', denver)
+
+        # Replay the pending rows the way run_geocoding does
+        for mode in ('load', 'upsert'):
+            bq = BigQueryManager(client=FailingLoadClient())
+            writer = bq.start_batch(mode=mode)
+            for row in journal.pending_rows().values():
+                bq.insert_agency_location(**row)
+            bq.close()
+            assert sorted(org_name for org_name, _ in writer.failed_rows) == ['Denver CO PD', 'Houston TX PD']
+            assert writer.succeeded(journal.pending_rows()) == []
+            journal.record_written(writer.succeeded(journal.pending_rows()))
+        journal.close()
+
+        journal = CheckpointJournal(path)
+        assert journal.pending_rows() == {'Houston TX PD': ROW, 'Denver CO PD': denver}
+        journal.close()
+
+
+def test_compact_keeps_latest_stage_per_agency():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal.jsonl')
+        write_interrupted_run(path)
+
+        journal = CheckpointJournal(path)
+        journal.compact()
+        journal.record_written(['Houston TX PD'])
+        journal.close()
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        assert [r['stage'] for r in records] == ['run', 'geocoded', 'parsed', 'written']
+        assert records[1]['row'] == ROW
+
+        journal = CheckpointJournal(path)
+        journal.compact()
+        journal.close()
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        assert [(r['stage'], r['org_name']) for r in records[1:]] == [
+            ('written', 'Houston TX PD'), ('parsed', 'Denver CO PD')
+        ]
+        assert records[1]['row'] == ROW
+
+
+if __name__ == '__main__':
+    test_reopen_resumes_interrupted_run()
+    test_failed_load_job_keeps_rows_pending()
+    test_compact_keeps_latest_stage_per_agency()
+    print('✓ All checkpoint journal tests passed')
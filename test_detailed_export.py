@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the suspicion report's detailed export (detailed_export.DetailedExport).
+
+Writes scored synthetic searches as CSV and as partitioned Parquet, reads
+the Parquet dataset back, and checks that a rerun only rewrites the
+partitions whose rows changed.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+import pandas as pd
+import pytest
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+from benchmark_suspicion_scoring import make_synthetic_searches
+from detailed_export import DetailedExport, MANIFEST_FILE, PART_FILE
+from suspicion_ranking_report import SuspicionRankingAnalyzer
+
+COLUMNS = SuspicionRankingAnalyzer.DETAILED_COLUMNS
+
+
+def scored_searches(rows=3_000, seed=11):
+    analyzer = SuspicionRankingAnalyzer(client=object())
+    df = make_synthetic_searches(rows, seed)
+    df['matched_agency'] = df['org_name'].str.upper()
+    df['matched_state'] = pd.Series(['CO', 'NM', 'UT', None], dtype=object)[df.index % 4].to_numpy()
+    df['matched_state'] = df['matched_state'].astype('category')
+    return analyzer, analyzer.analyze_data(df)
+
+
+def export(path, df, batch_size=700, **kwargs):
+    writer = DetailedExport(path, COLUMNS, **kwargs)
+    for start in range(0, len(df), batch_size):
+        writer.write(df.iloc[start:start + batch_size])
+    return writer.close()
+
+
+def test_csv_batches_match_single_write():
+    _, df = scored_searches()
+    with tempfile.TemporaryDirectory() as tmp:
+        export(os.path.join(tmp, 'batched.csv'), df)
+        df[COLUMNS].to_csv(os.path.join(tmp, 'single.csv'), index=False)
+        with open(os.path.join(tmp, 'batched.csv')) as a, open(os.path.join(tmp, 'single.csv')) as b:
+            assert a.read() == b.read()
+    with pytest.raises(ValueError):
+        DetailedExport('x.csv', COLUMNS, partition_by='matched_state')
+
+
+# Row-hash sums wrap past 2**64; that must not surface as numpy overflow warnings
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+def test_partitioned_parquet_round_trip_and_rerun():
+    analyzer, df = scored_searches()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'detailed')
+        export(path, df, fmt='parquet', partition_by='matched_state')
+        partitions = sorted(name for name in os.listdir(path) if name != MANIFEST_FILE)
+        assert partitions == ['matched_state=CO', 'matched_state=NM', 'matched_state=UT',
+                              'matched_state=__HIVE_DEFAULT_PARTITION__']
+        # Dictionary-encoded, zstd-compressed string columns
+        column = pq.ParquetFile(os.path.join(path, 'matched_state=CO', PART_FILE)).metadata.row_group(0).column(0)
+        assert column.compression == 'ZSTD' and 'RLE_DICTIONARY' in column.encodings
+
+        colorado = pd.read_parquet(os.path.join(path, 'matched_state=CO', PART_FILE))
+        expected = df[df['matched_state'] == 'CO']
+        assert list(colorado.columns) == [c for c in COLUMNS if c != 'matched_state']
+        assert list(colorado['org_name']) == list(expected['org_name'])
+        assert list(colorado['suspicion_score']) == list(expected['suspicion_score'])
+        assert list(colorado['risk_factors']) == list(expected['risk_factors'])
+
+        # Same rows in another order and batching: nothing is rewritten
+        mtimes = {name: os.stat(os.path.join(path, name, PART_FILE)).st_mtime_ns for name in partitions}
+        counts = export(path, df.iloc[::-1], batch_size=1_000, fmt='parquet', partition_by='matched_state')
+        assert counts == {'written': 0, 'unchanged': 4, 'removed': 0}
+        assert mtimes == {name: os.stat(os.path.join(path, name, PART_FILE)).st_mtime_ns for name in partitions}
+
+        # One changed state is rewritten, a vanished one is removed
+        changed = df[df['matched_state'] != 'UT'].copy()
+        changed.loc[changed['matched_state'] == 'NM', 'suspicion_score'] += 1
+        counts = export(path, changed, fmt='parquet', partition_by='matched_state')
+        assert counts == {'written': 1, 'unchanged': 2, 'removed': 1}
+        assert not os.path.exists(os.path.join(path, 'matched_state=UT'))
+        assert not [name for name in os.listdir(os.path.join(path, 'matched_state=CO')) if name.endswith('.tmp')]
+
+        counts = export(os.path.join(tmp, 'levels'), df, fmt='parquet', partition_by='suspicion_level',
+                        spec=analyzer.spec)
+        assert counts['written'] == df['suspicion_score'].map(analyzer.spec.level).nunique()
+        assert 'suspicion_level=Very%20High%20Suspicion' in os.listdir(os.path.join(tmp, 'levels'))
+
+
+if __name__ == '__main__':
+    test_csv_batches_match_single_write()
+    test_partitioned_parquet_round_trip_and_rerun()
+    print('✓ All detailed export tests passed')
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline gazetteer (gazetteer.GazetteerIndex) and the local
+geocoding tier built on it (GazetteerBackend, NominatimGeocoder._tag_method).
+
+Uses a small inline gazetteer, so no Census files or network are needed.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from gazetteer import GazetteerIndex, edit_distance, normalize_place, strip_lsad
+from geocode_agencies import GazetteerBackend, NominatimGeocoder
+
+PLACES = [
+    ('TX', 'Houston', 29.79, -95.39),
+    ('TX', 'Austin', 30.30, -97.75),
+    ('OH', 'Cleveland', 41.48, -81.68),
+    ('OH', 'Cleveland Heights', 41.51, -81.56),
+    ('MS', 'Bay St. Louis', 30.31, -89.34),
+    ('CO', 'Durango', 37.28, -107.87),
+    ('CO', 'Denver', 39.76, -104.88),
+    ('TX', 'Harris County', 29.86, -95.39),
+    ('TX', 'Houston', 0.0, 0.0),  # Duplicate key: the first entry wins
+]
+
+
+def make_index():
+    return GazetteerIndex(PLACES)
+
+
+def test_normalization_and_file_loading():
+    assert strip_lsad('Kansas City city') == 'Kansas City'
+    assert strip_lsad('Aspen Park CDP') == 'Aspen Park'
+    assert normalize_place('Bay St. Louis') == 'bay saint louis'
+    assert edit_distance('houstn', 'houston', 2) == 1
+    assert edit_distance('austin', 'houston', 1) == 2  # Capped at limit + 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'places.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('USPS\tGEOID\tNAME\tINTPTLAT\tINTPTLONG \n')
+            f.write('TX\t4835000\tHouston city\t29.786\t-95.389\n')
+            f.write('CO\t0820000\tDenver city\t39.762\t-104.876\n')
+            f.write('CO\t0800000\tBroken row\tnot-a-number\t0\n')
+        index = GazetteerIndex.from_files([path])
+    assert len(index) == 2
+    assert index.lookup('houston', 'tx')['latitude'] == 29.786
+
+
+def test_index_lookups():
+    index = make_index()
+    assert len(index) == 8
+
+    # Exact: normalized key, first duplicate wins
+    houston = index.lookup('HOUSTON', 'tx')
+    assert houston == {'name': 'Houston', 'state': 'TX', 'latitude': 29.79, 'longitude': -95.39}
+    assert index.lookup('Bay Saint Louis', 'MS')['name'] == 'Bay St. Louis'
+    assert index.lookup('Houston', 'OH') is None
+
+    # Prefix: autocomplete within a state, and the longest whole-word prefix
+    assert [e['name'] for e in index.complete('Cleve', 'OH')] == ['Cleveland', 'Cleveland Heights']
+    assert index.lookup_prefix('Cleveland Heights Unit', 'OH')['name'] == 'Cleveland Heights'
+    assert index.lookup_prefix('Cleveland Division', 'OH')['name'] == 'Cleveland'
+    assert index.lookup_prefix('Cleveland', 'OH') is None  # A prefix must drop a word
+
+    # Trigram candidates stay in the queried state, best first
+    candidates = index.fuzzy_candidates('Houstn', 'TX')
+    assert index.names[candidates[0][0]] == 'Houston'
+    assert all(index.keys[i].startswith('TX|') for i, _ in candidates)
+    assert index.fuzzy_candidates('Houston', 'WY') == []
+
+    # Edit distance: within the length-scaled budget only
+    assert index.lookup_fuzzy('Houstn', 'TX')['distance'] == 1
+    assert index.lookup_fuzzy('Hoostn', 'TX') is None  # 2 edits on a 6-letter name
+    assert index.lookup_fuzzy('Hoostn', 'TX', max_distance=2)['name'] == 'Houston'
+    assert index.lookup_fuzzy('Houstn', 'OH') is None
+
+
+def test_backend_resolve():
+    backend = GazetteerBackend(make_index())
+    exact = backend.resolve(['Cleveland Division', 'Cleveland'], 'OH')
+    assert (exact['match_type'], exact['matched_city'], exact['geocode_confidence']) == ('exact', 'Cleveland', 'high')
+    assert exact['geocode_source'] == 'gazetteer'
+
+    prefix = backend.resolve(['Cleveland Heights Unit'], 'OH')
+    assert (prefix['match_type'], prefix['matched_city'], prefix['geocode_confidence']) == (
+        'prefix', 'Cleveland Heights', 'medium')
+
+    fuzzy = backend.resolve(['Durrango Task Force', 'Durrango'], 'CO')
+    assert (fuzzy['match_type'], fuzzy['matched_city']) == ('fuzzy', 'Durango')
+
+    assert backend.resolve(['Springfield'], 'CO') is None
+    assert backend.lookup('Denver', 'CO')['latitude'] == 39.76
+
+
+def test_geocode_method_tags():
+    geocoder = NominatimGeocoder(backends=[GazetteerBackend(make_index())])
+
+    original = geocoder.geocode('Houston', 'TX')
+    assert original['geocode_method'] == 'original'
+    assert 'original_city' not in original
+
+    stripped = geocoder.geocode('Cleveland Division', 'OH')
+    assert stripped['geocode_method'] == 'suffix_stripped'
+    assert (stripped['original_city'], stripped['stripped_city']) == ('Cleveland Division', 'Cleveland')
+
+    prefix = geocoder.geocode('Cleveland Heights Unit', 'OH')
+    assert prefix['geocode_method'] == 'suffix_stripped'
+    assert prefix['stripped_city'] == 'Cleveland Heights'
+
+    fuzzy = geocoder.geocode('Houstn Police', 'TX')
+    assert fuzzy['geocode_method'] == 'fuzzy'
+    assert (fuzzy['original_city'], fuzzy['matched_city']) == ('Houstn Police', 'Houston')
+
+    assert geocoder.backend_hits == {'gazetteer': 4}
+    assert geocoder.network_calls == 0
+
+
+if __name__ == '__main__':
+    test_normalization_and_file_loading()
+    test_index_lookups()
+    test_backend_resolve()
+    test_geocode_method_tags()
+    print('✓ All gazetteer tests passed')
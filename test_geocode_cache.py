@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent geocode cache (GeocodeCache) in front of Nominatim.
+
+Geocodes the same locations in two runs that share one SQLite cache file,
+with the geocoder's HTTP session replaced by a stub, and checks that the
+second run answers found and not-found places from the cache without any
+HTTP call, while transient failures (HTTP errors, timeouts) are never
+cached and are retried.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+import requests
+
+from geocode_agencies import GeocodeCache, NominatimGeocoder
+
+
+class StubResponse:
+    def __init__(self, status_code, results=None):
+        self.status_code = status_code
+        self._results = results
+
+    def json(self):
+        return self._results
+
+
+class StubSession:
+    """Stands in for requests.Session: answers by city, records every query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def get(self, url, params=None, timeout=None):
+        query = params['q']
+        self.queries.append(query)
+        if query.startswith('Timeout'):
+            raise requests.exceptions.Timeout('read timed out')
+        if query.startswith('Broken'):
+            return StubResponse(502)
+        if query.startswith('Nowhere'):
+            return StubResponse(200, [])
+        return StubResponse(200, [{'lat': '39.7', 'lon': '-105.0', 'importance': 0.7, 'display_name': query}])
+
+
+LOCATIONS = [('Denver', 'CO'), ('Boulder Police', 'CO'), ('Nowhere', 'CO'), ('Broken', 'CO'), ('Timeout', 'CO')]
+
+
+def run(cache):
+    """One geocoding run; returns (results by location, HTTP queries made)."""
+    geocoder = NominatimGeocoder(cache=cache, rate_limit=1000.0)
+    geocoder.session = StubSession()
+    results = {location: geocoder.geocode(*location) for location in LOCATIONS}
+    return results, geocoder.session.queries
+
+
+def test_second_run_is_served_from_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'geocode_cache.sqlite3')
+
+        cache = GeocodeCache(path)
+        first, queries = run(cache)
+        assert len(queries) == 5
+        assert cache.stats['writes'] == 3  # Denver, Boulder and the negative Nowhere
+        cache.close()
+
+        cache = GeocodeCache(path)
+        second, queries = run(cache)
+        # Only the transient failures go back to the network
+        assert queries == ['Broken, CO, USA', 'Timeout, CO, USA']
+        assert (cache.stats['hits'], cache.stats['negative_hits'], cache.stats['misses']) == (2, 1, 2)
+        assert second == first
+        assert second[('Boulder Police', 'CO')]['geocode_method'] == 'suffix_stripped'
+        assert second[('Nowhere', 'CO')]['geocode_method'] == 'state_level'
+        cache.close()
+
+        # Expired negative entries are fetched again
+        cache = GeocodeCache(path, negative_ttl=0)
+        _, queries = run(cache)
+        assert queries == ['Nowhere, CO, USA', 'Broken, CO, USA', 'Timeout, CO, USA']
+        assert cache.stats['expired'] == 1
+        cache.close()
+
+
+def test_keys_are_normalized():
+    cache = GeocodeCache(':memory:')
+    cache.put('Denver,  CO, USA', {'latitude': 39.7, 'longitude': -105.0})
+    assert cache.get('denver, co, usa') == (True, {'latitude': 39.7, 'longitude': -105.0})
+    assert cache.get('Boulder, CO, USA') == (False, None)
+    cache.close()
+
+
+if __name__ == '__main__':
+    test_second_run_is_served_from_cache()
+    test_keys_are_normalized()
+    print('✓ All geocode cache tests passed')
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Rate limiter test for the concurrent geocoding engine.
+
+Runs NominatimGeocoder.geocode_many against a local stub Nominatim server
+and checks that:
+1. Total wall time approaches N / rate (workers overlap request latency)
+2. The server never sees more requests in any 1-second window than the
+   token bucket allows (rate + burst capacity)
+3. Duplicate locations in one run share a single request, while transient
+   failures (HTTP errors) are not memoized and are queried again
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from geocode_agencies import NominatimGeocoder, TokenBucket
+from stage_profiler import PROFILER
+
+STUB_LATENCY = 0.2  # Simulated server latency (seconds)
+
+
+class StubNominatimHandler(BaseHTTPRequestHandler):
+    """Answers every search with one fixed result after a fixed latency."""
+
+    request_times = []
+    queries = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        with self.lock:
+            self.request_times.append(time.monotonic())
+            self.queries.append(query)
+            # "Flaky" places fail with a 503 on their first request
+            failing = query.startswith('Flaky') and self.queries.count(query) == 1
+        time.sleep(STUB_LATENCY)
+
+        if failing:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        results = [] if query.startswith('Nowhere') else [{
+            'lat': '37.0', 'lon': '-105.0', 'importance': 0.6, 'display_name': query
+        }]
+        body = json.dumps(results).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def max_requests_per_window(times, window: float = 1.0) -> int:
+    """Largest number of requests seen in any sliding window."""
+    times = sorted(times)
+    best = 0
+    start = 0
+    for end, t in enumerate(times):
+        while t - times[start] > window:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubNominatimHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    StubNominatimHandler.request_times = []
+    StubNominatimHandler.queries = []
+    return server
+
+
+def run_rate_limited_lookups():
+    """Geocode against the stub server; returns (elapsed seconds, peak req/s)."""
+    rate = 20.0
+    n = 60
+
+    server = start_server()
+    PROFILER.reset()
+
+    try:
+        geocoder = NominatimGeocoder(
+            base_url=f'http://127.0.0.1:{server.server_port}/search',
+            limiter=TokenBucket(rate),
+            max_workers=8
+        )
+        locations = [(f'City{i}', 'CO') for i in range(n)]
+
+        start = time.monotonic()
+        results = list(geocoder.geocode_many(locations))
+        elapsed = time.monotonic() - start
+    finally:
+        server.shutdown()
+
+    assert len(results) == n
+    assert all(result['geocode_method'] == 'original' for _, result, _ in results)
+    assert geocoder.network_calls == n
+
+    # Serial requests would take n * (1/rate + latency); overlapping brings it to ~n/rate
+    expected = n / rate
+    assert elapsed < expected + 2 * STUB_LATENCY + 0.5, f'too slow: {elapsed:.2f}s vs {expected:.2f}s'
+    assert elapsed >= (n - 1) / rate - 0.05, f'faster than the rate limit allows: {elapsed:.2f}s'
+
+    # Window of 1s admits at most rate + capacity requests
+    peak = max_requests_per_window(StubNominatimHandler.request_times)
+    assert peak <= rate + 1, f'rate limit exceeded: {peak} requests in 1s'
+
+    # Profiler splits each lookup into rate-limit sleep and request latency
+    stages = PROFILER.report()['stages']
+    assert stages['geocode.request']['count'] == n
+    assert stages['geocode.request']['p50_ms'] >= STUB_LATENCY * 1000
+    assert stages['geocode.rate_limit_wait']['count'] == n
+    assert stages['geocode.single']['count'] == n
+
+    return elapsed, peak
+
+
+def test_geocode_many_respects_rate_limit():
+    """Wall time ~ N / rate and the limit is never exceeded."""
+    run_rate_limited_lookups()
+
+
+def test_token_bucket_burst_and_refill():
+    bucket = TokenBucket(rate=50.0, capacity=3.0)
+    # The full burst passes at once, the next request waits one refill
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert 0.015 <= bucket.acquire() <= 0.05
+    # Requests larger than the capacity are capped instead of starving
+    assert bucket.acquire(10.0) <= 3.0 / 50.0 + 0.01
+    assert bucket.total_wait > 0
+
+
+def test_duplicate_locations_share_one_request():
+    server = start_server()
+    try:
+        geocoder = NominatimGeocoder(
+            base_url=f'http://127.0.0.1:{server.server_port}/search', rate_limit=1000.0, max_workers=8
+        )
+        # Each location three times, and twice more as suffixed names
+        # that strip to the same query
+        locations = [(f'City{i}', 'CO') for i in range(6)] * 3
+        locations += [(f'City{i} Police Department', 'CO') for i in range(6)] * 2
+        results = list(geocoder.geocode_many(locations))
+    finally:
+        server.shutdown()
+
+    assert geocoder.network_calls == 6
+    assert sorted(StubNominatimHandler.queries) == [f'City{i}, CO, USA' for i in range(6)]
+    assert (geocoder.query_attempts, geocoder.memo_hits) == (30, 24)
+    assert all(result['display_name'] == f'{city.split()[0]}, CO, USA' for (city, _), result, _ in results)
+    # Fanned-out results are copies: tagging one does not leak into another
+    suffixed = [result for (city, _), result, _ in results if ' ' in city]
+    assert all(result['geocode_method'] == 'suffix_stripped' for result in suffixed)
+    assert all(result['geocode_method'] == 'original' for (city, _), result, _ in results if ' ' not in city)
+
+
+def test_transient_failures_are_not_memoized():
+    server = start_server()
+    try:
+        geocoder = NominatimGeocoder(base_url=f'http://127.0.0.1:{server.server_port}/search', rate_limit=1000.0)
+        # 503: this lookup falls back to the state, the next one asks again
+        assert geocoder.geocode('Flaky', 'CO')['geocode_method'] == 'state_level'
+        assert geocoder.geocode('Flaky', 'CO')['geocode_method'] == 'original'
+        assert geocoder.geocode('Flaky', 'CO')['geocode_method'] == 'original'
+        # "No such place" is a definitive answer and stays memoized
+        assert geocoder.geocode('Nowhere', 'CO')['geocode_method'] == 'state_level'
+        assert geocoder.geocode('Nowhere', 'CO')['geocode_method'] == 'state_level'
+    finally:
+        server.shutdown()
+
+    assert StubNominatimHandler.queries == ['Flaky, CO, USA'] * 2 + ['Nowhere, CO, USA']
+    assert (geocoder.network_calls, geocoder.memo_hits) == (3, 2)
+
+
+if __name__ == '__main__':
+    test_token_bucket_burst_and_refill()
+    test_duplicate_locations_share_one_request()
+    test_transient_failures_are_not_memoized()
+    elapsed, peak = run_rate_limited_lookups()
+    print(f'✓ 60 lookups at 20 req/s in {elapsed:.2f}s (peak {peak} req in any 1s window)')
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Tests for batched LLM state classification (LLMStateClassifier.classify_many).
+
+Runs the classifier against a local fake Anthropic endpoint that implements
+the Messages and Message Batches routes with simulated latency, a batch
+that stays in progress for a few polls, and partial failures (an errored
+batch request, a reply missing names, malformed result lines, an
+overloaded prompt), and checks
+that every name is classified in a handful of round trips, that a batch
+which never ends is cancelled rather than resubmitted, and that the
+persistent cache stores real answers but not transient failures.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from geocode_agencies import LLMStateClassifier, LLMClassificationCache
+
+STUB_LATENCY = 0.05  # Simulated server latency (seconds)
+POLLS_UNTIL_ENDED = 3
+
+
+def answer_for(prompt):
+    """Reply to a multi-name prompt: state from a trailing "(ST)", else UNKNOWN."""
+    answers = {}
+    for number, name in re.findall(r'^(\d+)\. (.*)$', prompt, re.MULTILINE):
+        match = re.search(r'\((\w\w)\)$', name)
+        if match:
+            answers[number] = {'state': match.group(1), 'confidence': 'high'}
+        else:
+            answers[number] = {'state': 'UNKNOWN', 'confidence': 'low'}
+    return answers
+
+
+def message(answers):
+    return {'content': [{'type': 'text', 'text': json.dumps(answers)}]}
+
+
+class FakeAnthropicHandler(BaseHTTPRequestHandler):
+    """Fake /v1/messages and /v1/messages/batches endpoints."""
+
+    batches = {}
+    requests_seen = []
+    stuck = False  # Batches never end (until cancelled)
+    lock = threading.Lock()
+
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        time.sleep(STUB_LATENCY)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])) or b'{}')
+        with self.lock:
+            self.requests_seen.append(('POST', self.path))
+            if self.path.endswith('/cancel'):
+                batch_id = self.path.strip('/').split('/')[3]
+                self.batches[batch_id]['canceled'] = True
+                return self._send(200, {'id': batch_id, 'processing_status': 'canceling'})
+            if self.path == '/v1/messages/batches':
+                batch_id = f'msgbatch_{len(self.batches)}'
+                self.batches[batch_id] = {'requests': body['requests'], 'polls': 0}
+                return self._send(200, {'id': batch_id, 'processing_status': 'in_progress'})
+
+            # Synchronous prompt: the first one is rejected as overloaded
+            if len([r for r in self.requests_seen if r == ('POST', '/v1/messages')]) == 1:
+                self.send_response(529)
+                self.send_header('retry-after', '0.05')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        prompt = body['messages'][0]['content']
+        if prompt.startswith('Organization name: '):
+            match = re.search(r'\((\w\w)\)$', prompt)
+            return self._send(200, {'content': [{'type': 'text', 'text': match.group(1) if match else 'UNKNOWN'}]})
+        return self._send(200, message(answer_for(prompt)))
+
+    def do_GET(self):
+        time.sleep(STUB_LATENCY)
+        with self.lock:
+            self.requests_seen.append(('GET', self.path))
+            parts = self.path.strip('/').split('/')
+            batch_id = parts[3]
+            batch = self.batches[batch_id]
+            first_batch = batch_id == 'msgbatch_0'
+
+            if parts[-1] == 'results':
+                lines = []
+                for i, request in enumerate(batch['requests']):
+                    if first_batch and i == 1:
+                        result = {'type': 'errored', 'error': {'type': 'api_error'}}
+                    else:
+                        answers = answer_for(request['params']['messages'][0]['content'])
+                        if first_batch and i == 0:
+                            answers.pop('2')  # Model skipped a name
+                        result = {'type': 'succeeded', 'message': message(answers)}
+                    line = json.dumps({'custom_id': request['custom_id'], 'result': result})
+                    if first_batch and i == 2:
+                        line = line[:60]  # Truncated line
+                    lines.append(line)
+                if first_batch:
+                    lines.append(json.dumps({'custom_id': 'chunk-x', 'result': None}))
+                return self._send(200, '\n'.join(lines), 'application/binary')
+
+            batch['polls'] += 1
+            if batch['polls'] < POLLS_UNTIL_ENDED or self.stuck:
+                return self._send(200, {'id': batch_id, 'processing_status': 'in_progress'})
+            host = f'http://{self.headers["Host"]}'
+            return self._send(200, {
+                'id': batch_id, 'processing_status': 'ended',
+                'results_url': f'{host}/v1/messages/batches/{batch_id}/results'
+            })
+
+    def log_message(self, format, *args):
+        pass
+
+
+NAMES = [f'Agency {i} ({state})' for i, state in enumerate(['TX', 'CO', 'AL', 'WY', 'OH'] * 5)]
+NAMES += ['Mystery Task Force', 'FBI Field Office', 'Unit (ZZ)']
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeAnthropicHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FakeAnthropicHandler.batches = {}
+    FakeAnthropicHandler.requests_seen = []
+    FakeAnthropicHandler.stuck = False
+    return server
+
+
+def make_classifier(server, cache=None):
+    classifier = LLMStateClassifier(
+        api_key='test-key', api_url=f'http://127.0.0.1:{server.server_port}/v1/messages', cache=cache
+    )
+    classifier.BATCH_PROMPT_SIZE = 10
+    classifier.BATCH_POLL_INTERVAL = 0.01
+    classifier.BACKOFF_BASE = 0.01
+    return classifier
+
+
+def run_classification(mode, cache=None, retries=None, check=True):
+    """Classify NAMES via the fake server; returns (results, classifier, requests seen)."""
+    server = start_server()
+    try:
+        classifier = make_classifier(server, cache)
+        if retries is not None:
+            # Disable both the HTTP retry and the retry round
+            classifier.MAX_RETRIES = classifier.BATCH_RETRIES = retries
+        results = classifier.classify_many(NAMES, mode=mode)
+    finally:
+        server.shutdown()
+
+    expected = {name: re.search(r'\((\w\w)\)$', name).group(1) for name in NAMES[:25]}
+    expected.update({'Mystery Task Force': None, 'FBI Field Office': 'DC', 'Unit (ZZ)': None})
+    if check:
+        assert results == expected
+    return results, classifier, list(FakeAnthropicHandler.requests_seen)
+
+
+def test_batch_mode_recovers_partial_failures():
+    _, classifier, seen = run_classification('batch')
+    # Round 1: 3 prompts in one batch; prompt 1 errors, prompt 0 drops a name
+    # and prompt 2's result line is truncated (plus one junk line).
+    # Round 2 resubmits only those 18 names as a second 2-prompt batch.
+    submits = [path for method, path in seen if method == 'POST']
+    assert submits == ['/v1/messages/batches', '/v1/messages/batches']
+    retried = FakeAnthropicHandler.batches['msgbatch_1']['requests']
+    assert sum(len(answer_for(r['params']['messages'][0]['content'])) for r in retried) == 18
+    assert classifier.api_requests == len(seen) == 2 * (1 + POLLS_UNTIL_ENDED + 1)
+
+
+def test_batch_timeout_cancels_without_resubmitting():
+    server = start_server()
+    FakeAnthropicHandler.stuck = True
+    try:
+        classifier = LLMStateClassifier(
+            api_key='test-key', api_url=f'http://127.0.0.1:{server.server_port}/v1/messages', batch_timeout=0.3
+        )
+        classifier.BATCH_POLL_INTERVAL = 0.01
+        results = classifier.classify_many(NAMES[:5], mode='batch')
+    finally:
+        server.shutdown()
+
+    assert results == dict.fromkeys(NAMES[:5])
+    assert classifier.cache == {}  # Left for the next run
+    submits = [path for method, path in FakeAnthropicHandler.requests_seen if method == 'POST']
+    assert submits == ['/v1/messages/batches', '/v1/messages/batches/msgbatch_0/cancel']
+    assert FakeAnthropicHandler.batches['msgbatch_0']['canceled']
+
+
+def test_prompts_mode_uses_one_request_per_chunk():
+    _, classifier, seen = run_classification('prompts')
+    # 3 prompts (one overloaded) + 1 retry for the overloaded chunk
+    assert seen == [('POST', '/v1/messages')] * 4
+    assert classifier.api_requests == 4
+    stats = classifier.run_stats()
+    assert (stats['rate_limited'], stats['retries'], stats['succeeded'], stats['errors']) == (1, 1, 3, 0)
+
+
+def test_backoff_honors_retry_after_in_full():
+    classifier = LLMStateClassifier(api_key='test-key')
+    response = requests.Response()
+    response.headers['retry-after'] = '120'
+    # Longer than BACKOFF_MAX, but the server asked for it
+    assert 120 <= classifier._backoff(0, response) <= 120 + classifier.BACKOFF_BASE / 4
+    response.headers['retry-after'] = 'soon'
+    assert classifier._backoff(0, response) <= classifier.BACKOFF_BASE
+    # Without retry-after the exponential delay is capped
+    assert classifier.BACKOFF_MAX / 2 <= classifier._backoff(20, None) <= classifier.BACKOFF_MAX
+
+
+def test_classify_stream_runs_concurrently_and_retries():
+    names = NAMES[:20]
+    server = start_server()
+    try:
+        classifier = make_classifier(server)
+        start = time.monotonic()
+        results = dict(classifier.classify_stream(names, max_workers=8))
+        elapsed = time.monotonic() - start
+    finally:
+        server.shutdown()
+
+    assert results == {name: re.search(r'\((\w\w)\)$', name).group(1) for name in names}
+    # 20 requests + 1 retry after a 529 with retry-after
+    stats = classifier.run_stats()
+    assert stats['api_requests'] == 21
+    assert (stats['rate_limited'], stats['retries'], stats['classified']) == (1, 1, 20)
+    serial = 21 * STUB_LATENCY
+    assert elapsed < serial * 0.6, f'not concurrent: {elapsed:.2f}s vs {serial:.2f}s serial'
+
+
+def test_persistent_cache_skips_answered_names():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'llm_cache.sqlite3')
+
+        # Without retries the overloaded first prompt leaves 10 names unanswered
+        cache = LLMClassificationCache(path)
+        results, _, seen = run_classification('prompts', cache=cache, retries=0, check=False)
+        cache.close()
+        assert len(seen) == 3
+        assert sum(state is None for state in results.values()) == 12
+
+        with sqlite3.connect(path) as conn:
+            rows = dict(conn.execute('SELECT org_key, confidence FROM llm_state_cache').fetchall())
+        # 17 names answered by two prompts; errors and the federal rule are not stored
+        assert len(rows) == 17
+        assert rows['agency 10 (tx)'] == 'high'
+        assert rows['mystery task force'] == 'low'
+        assert 'agency 0 (tx)' not in rows
+        assert 'fbi field office' not in rows
+
+        # Next run warm-loads the answers and only asks about the failed prompt
+        cache = LLMClassificationCache(path)
+        _, classifier, seen = run_classification('prompts', cache=cache)
+        assert len(classifier.cache) == 17 + 10
+        assert seen == [('POST', '/v1/messages')] * 2  # Overloaded again, then retried after backoff
+        cache.close()
+
+
+if __name__ == '__main__':
+    test_batch_mode_recovers_partial_failures()
+    test_batch_timeout_cancels_without_resubmitting()
+    test_prompts_mode_uses_one_request_per_chunk()
+    test_backoff_honors_retry_after_in_full()
+    test_classify_stream_runs_concurrently_and_retries()
+    test_persistent_cache_skips_answered_names()
+    print(f'✓ {len(NAMES)} names classified in batch and multi-prompt modes')
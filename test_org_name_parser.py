@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Differential test for the compiled OrgNameParser.
+
+Builds a large synthetic org_name corpus covering every pattern (valid and
+invalid state codes, territory codes, state-name fallbacks, junk input) and
+checks that OrgNameParser.parse returns exactly what the original
+sequential re.match / sorted substring scan implementation returned, and
+that the columnar OrgNameParser.parse_many agrees with per-name parse()
+for list, pandas and Arrow inputs, nulls included.
+"""
+
+import os
+import re
+import sys
+import random
+import itertools
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+import pytest
+
+from geocode_agencies import OrgNameParser, ParsedOrgName, ParsedOrgNameColumns
+
+
+def reference_parse(org_name):
+    """Original (pre-compilation) OrgNameParser.parse implementation."""
+    if not org_name or not isinstance(org_name, str):
+        return None
+
+    org_name = org_name.strip()
+
+    for pattern, confidence in OrgNameParser.PATTERNS:
+        match = re.match(pattern, org_name)
+        if match:
+            group1 = match.group(1).strip()
+            group2 = match.group(2).strip().upper()
+            if len(group1) == 2 and group1 in OrgNameParser.VALID_STATES:
+                state, city = group1, group2
+            else:
+                city, state = group1, group2
+            if state not in OrgNameParser.VALID_STATES:
+                continue
+            agency = 'Police Department'
+            if 'Sheriff' in org_name or 'SO' in org_name:
+                agency = 'Sheriff Office'
+            return ParsedOrgName(city=city, state=state, agency=agency, confidence=confidence)
+
+    org_lower = org_name.lower()
+    extracted_state = None
+    for state_name in sorted(OrgNameParser.STATE_NAMES.keys(), key=len, reverse=True):
+        if state_name in org_lower:
+            extracted_state = OrgNameParser.STATE_NAMES[state_name]
+            break
+
+    if extracted_state:
+        state_name = None
+        for name, abbrev in OrgNameParser.STATE_NAMES.items():
+            if abbrev == extracted_state:
+                state_name = name.title()
+                break
+        agency = 'Police Department'
+        if 'Sheriff' in org_name or 'SO' in org_name:
+            agency = 'Sheriff Office'
+        return ParsedOrgName(
+            city=state_name or extracted_state,
+            state=extracted_state,
+            agency=agency,
+            confidence='low'
+        )
+
+    return None
+
+
+def build_corpus(seed: int = 1234, random_names: int = 20000):
+    """Generate a deterministic corpus of org_name strings."""
+    cities = [
+        'Houston', 'Denver', 'Bay St. Louis', 'Port St. Lucie', 'Amberley Village',
+        'New York', 'Cleveland', 'Harris', 'Kings', 'Blaine', 'Bienville', 'Washington',
+        'Salem', 'Arlington', 'Aztec', 'Alma', 'Winston-Salem', 'Al', 'Ok', 'Co',
+        'Kansas City', 'West Virginia', 'Virginia Beach', 'Durango', 'la Plata',
+    ]
+    states = sorted(OrgNameParser.VALID_STATES) + ['ZZ', 'XX', 'QQ', 'Tx', 'tx']
+    agencies = [
+        'PD', 'P', 'Police', 'PoliceD', 'Sheriff', 'SO', 'Police Dept', 'Department',
+        'Dept', 'Division', 'Bureau', 'Division of Police', 'Division of Sheriff',
+    ]
+    templates = [
+        '{city} {st} {agency}',
+        '{city} County {st} {agency}',
+        '{city} Parish {st} {agency}',
+        '{city} CO {st} {agency}',
+        '{city} {agency} - {st}',
+        '{city} {agency}-{st}',
+        '{city} {agency} ({st})',
+        '{st} - {city} {agency}',
+        '{st}-{city} {agency}',
+        '{city} {st}',
+        '  {city} {st} {agency}  ',
+    ]
+
+    corpus = []
+    for template, city, st, agency in itertools.product(templates, cities, states, agencies):
+        corpus.append(template.format(city=city, st=st, agency=agency))
+
+    # State-name fallback cases, including overlapping names
+    fallbacks = [
+        '{name} Department of Corrections', '{name} State Patrol', 'University of {name} Police',
+        'Arkansas Kansas Task Force', 'West Virginia State Police', 'Virginia and West Virginia Joint',
+        'New Mexico / Mexico Liaison', 'Southern {name} Sheriff',
+    ]
+    for template in fallbacks:
+        for name in OrgNameParser.STATE_NAMES:
+            corpus.append(template.format(name=name.title()))
+            corpus.append(template.format(name=name.upper()))
+
+    # Random token soup to exercise non-matching paths
+    rng = random.Random(seed)
+    tokens = cities + states + agencies + ['County', 'Parish', 'of', '-', '(', ')', 'CO', 'the', 'Ohio', 'Iowa']
+    for _ in range(random_names):
+        corpus.append(' '.join(rng.choice(tokens) for _ in range(rng.randint(1, 6))))
+
+    corpus.extend(['', '   ', None, 123, 'pd', 'ICE', 'FBI National Academy'])
+    return corpus
+
+
+def test_parse_matches_reference():
+    """Compiled parser must agree with the reference on every corpus entry."""
+    corpus = build_corpus()
+    mismatches = []
+    for name in corpus:
+        expected = reference_parse(name)
+        actual = OrgNameParser.parse(name)
+        if expected != actual:
+            mismatches.append((name, expected, actual))
+
+    assert not mismatches, f'{len(mismatches)} mismatches, first: {mismatches[:5]}'
+
+
+def assert_columns_match(columns, names):
+    """parse_many columns must equal parse() of each input row."""
+    assert len(columns) == len(names)
+    for field in ParsedOrgNameColumns.FIELDS:
+        expected = [getattr(OrgNameParser.parse(name), field, None) for name in names]
+        assert list(getattr(columns, field)) == expected, field
+
+
+def test_parse_many_matches_parse():
+    """Columnar parsing agrees with parse() and scatters nulls to None."""
+    names = [name for name in build_corpus(random_names=2000) if name is None or isinstance(name, str)]
+    names = names[::7] + [None, 'Houston TX PD', None, 'Houston TX PD']
+
+    columns = OrgNameParser.parse_many(names)
+    assert_columns_match(columns, names)
+    assert columns.unique_count == len({name for name in names if name is not None})
+    assert columns.index is None
+
+    pd = pytest.importorskip('pandas')
+    series = pd.Series(names, index=range(100, 100 + len(names)))
+    columns = OrgNameParser.parse_many(series)
+    assert_columns_match(columns, names)
+    assert list(columns.index) == list(series.index)
+    assert list(columns.to_pandas().index) == list(series.index)
+    assert_columns_match(OrgNameParser.parse_many(series.astype('category')), names)
+
+    index = pd.Index(names)
+    columns = OrgNameParser.parse_many(index)
+    assert_columns_match(columns, names)
+    assert columns.index is None
+
+    pa = pytest.importorskip('pyarrow')
+    array = pa.array(names, type=pa.string())
+    assert_columns_match(OrgNameParser.parse_many(array), names)
+    half = len(names) // 2
+    chunked = pa.chunked_array([names[:half], names[half:]], type=pa.string())
+    assert_columns_match(OrgNameParser.parse_many(chunked), names)
+
+
+if __name__ == '__main__':
+    corpus = build_corpus()
+    print(f'Corpus size: {len(corpus)}')
+    test_parse_matches_reference()
+    test_parse_many_matches_parse()
+    print('✓ Compiled parser matches reference implementation')
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the staged producer/consumer pipeline (StagePipeline).
+
+Checks that stages overlap, that bounded queues hold back a fast producer
+behind a slow consumer, batching in the sink, and failure handling.
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from stage_pipeline import StagePipeline
+
+
+def test_backpressure_and_batching():
+    pipeline = StagePipeline(queue_size=5)
+    in_flight = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+    batches = []
+
+    def classify(item):
+        with lock:
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        pipeline.send('write', item * 2)
+
+    def write(batch):
+        time.sleep(0.002)  # Slow sink
+        with lock:
+            in_flight['now'] -= len(batch)
+        batches.append(batch)
+
+    pipeline.add_stage('classify', classify, workers=4)
+    pipeline.add_stage('write', write, batch_size=10, batch_wait=0.05)
+    pipeline.run({'classify': range(300)})
+
+    written = sorted(value for batch in batches for value in batch)
+    assert written == [i * 2 for i in range(300)]
+    assert max(len(batch) for batch in batches) <= 10
+    # Items between classify and the end of write: the write queue, one
+    # batch being written and one send per classify worker
+    assert in_flight['max'] <= 5 + 10 + 4, in_flight['max']
+
+    report = pipeline.report()
+    assert report['classify']['items'] == 300
+    assert report['write']['items'] == 300
+    assert report['write']['max_queue_depth'] <= 5
+    assert report['classify']['blocked_seconds'] > 0
+    assert report['write']['utilization'] > report['classify']['utilization']
+
+
+def test_failure_stops_sources_but_flushes_completed_work():
+    pipeline = StagePipeline(queue_size=2)
+    written = []
+
+    def geocode(item):
+        if item == 3:
+            raise RuntimeError('geocoder down')
+        pipeline.send('write', item)
+
+    pipeline.add_stage('geocode', geocode)
+    pipeline.add_stage('write', written.extend, batch_size=100)
+    try:
+        pipeline.run({'geocode': range(1000)})
+    except RuntimeError as e:
+        assert str(e) == 'geocoder down'
+    else:
+        raise AssertionError('expected the stage error to be re-raised')
+
+    assert written == [0, 1, 2]
+    assert pipeline.report()['geocode']['items'] < 1000
+
+
+if __name__ == '__main__':
+    test_backpressure_and_batching()
+    test_failure_stops_sources_but_flushes_completed_work()
+    print('✓ All stage pipeline tests passed')
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-stage run profiler (StageProfiler).
+
+Checks histogram bucketing, percentile bounds, item counts, concurrent
+recording and the JSON report.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+from stage_profiler import StageProfiler
+
+
+def test_histogram_and_percentiles():
+    profiler = StageProfiler()
+    for _ in range(90):
+        profiler.record('geocode.request', 0.004)  # 4ms -> le_5ms
+    for _ in range(10):
+        profiler.record('geocode.request', 0.2)  # 200ms -> le_250ms
+    profiler.record('parse.parse', 0.05, items=1000)
+
+    stages = profiler.report()['stages']
+    request = stages['geocode.request']
+    assert request['count'] == 100
+    assert request['histogram'] == {'le_5ms': 90, 'le_250ms': 10}
+    assert request['p50_ms'] == 5
+    assert request['p95_ms'] == 250
+    assert request['max_ms'] == 200.0
+    assert stages['parse.parse']['per_item_ms'] == 0.05
+
+
+def test_concurrent_records_and_report_file():
+    profiler = StageProfiler()
+
+    def work():
+        for _ in range(1000):
+            with profiler.stage('llm.request'):
+                pass
+            profiler.count('llm.calls')
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    profiler.set_counters({'hits': 3}, prefix='geocode_cache.')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'report.json')
+        profiler.write_report(path)
+        with open(path) as f:
+            report = json.load(f)
+
+    assert report['stages']['llm.request']['count'] == 8000
+    assert report['counters'] == {'geocode_cache.hits': 3, 'llm.calls': 8000}
+    assert report['wall_seconds'] > 0
+
+
+if __name__ == '__main__':
+    test_histogram_and_percentiles()
+    test_concurrent_records_and_report_file()
+    print('✓ All stage profiler tests passed')
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the local DuckDB storage backend (storage_backend.DuckDBClient).
+
+Builds Parquet/CSV exports in a temp directory and runs the geocoder's
+BigQueryManager and the suspicion report against them - real SQL, no GCP.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+import pandas as pd
+import pytest
+
+duckdb = pytest.importorskip('duckdb')
+
+from geocode_agencies import BigQueryManager
+from storage_backend import DuckDBClient, translate_sql
+from suspicion_ranking_report import SuspicionRankingAnalyzer
+
+
+def write_exports(data_dir):
+    os.makedirs(os.path.join(data_dir, 'DurangoPD'))
+    os.makedirs(os.path.join(data_dir, 'FlockML'))
+    pd.DataFrame({
+        'org_name': ['Pueblo CO PD', 'Alamosa CO SO', 'Pueblo CO PD'],
+        'case_num': ['24-001', None, ''],
+        'reason': ['theft', 'AOA request', 'other'],
+        'reason_category': ['Property', 'Interagency', 'OTHER'],
+        'reason_bucket': ['Valid_Reason', 'Invalid_Reason', 'OTHER'],
+        'classification_timestamp': pd.to_datetime(['2025-10-01'] * 3),
+    }).to_parquet(os.path.join(data_dir, 'DurangoPD', 'October2025_classified.parquet'))
+    pd.DataFrame({
+        'org_name': ['Alamosa CO SO'],
+        'is_participating_agency': [True],
+        'matched_agency': ['Alamosa County Sheriff'],
+        'matched_state': ['CO'],
+        'matched_type': ['sheriff'],
+    }).to_csv(os.path.join(data_dir, 'FlockML', 'org_name_rule_based_matches.csv'), index=False)
+    pd.DataFrame({
+        'config_id': ['oct'],
+        'dataset_project': ['durango-deflock'],
+        'dataset_name': ['DurangoPD'],
+        'source_table_name': ['October2025_classified'],
+        'enabled': [True],
+        'priority': [1],
+        'owner': ['colin'],
+        'geocode_watermark_column': pd.Series([None], dtype='object'),
+        'geocode_high_water_mark': pd.Series([None], dtype='datetime64[us]'),
+        'geocode_last_modified': pd.Series([None], dtype='datetime64[us]'),
+    }).to_parquet(os.path.join(data_dir, 'FlockML', 'dataset_pipeline_config.parquet'))
+
+
+def test_geocoder_runs_against_local_exports():
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_exports(data_dir)
+        client = DuckDBClient(data_dir)
+        bq = BigQueryManager(client=client)
+        bq.ensure_table()
+
+        discovery = bq.discover_agencies(bq.get_discovery_sources())
+        assert discovery.agencies == ['Alamosa CO SO', 'Pueblo CO PD']
+        assert discovery.scanned == ['oct']
+
+        # Upsert: staging load job + MERGE (QUALIFY) into a new table
+        bq.start_batch('upsert')
+        bq.insert_agency_location('Pueblo CO PD', 'Pueblo', 'CO', 38.25, -104.6, 'high', 'nominatim', 'Pueblo')
+        bq.insert_agency_location('Alamosa CO SO', 'Alamosa', 'CO', None, None, None, 'nominatim', None)
+        bq.close()
+        assert bq.compact_table()
+        stats = bq.get_geocoding_stats()
+        assert (stats['total'], stats['geocoded'], stats['high_confidence']) == (2, 1, 1)
+
+        # Watermarks land in the (now materialized) config export, so the
+        # next run skips the unchanged table and only retries the failure
+        assert bq.commit_watermarks(discovery)
+        client.close()
+        client = DuckDBClient(data_dir)
+        bq = BigQueryManager(client=client)
+        discovery = bq.discover_agencies(bq.get_discovery_sources())
+        assert discovery.skipped == ['oct']
+        assert discovery.agencies == ['Alamosa CO SO']
+        client.close()
+
+
+def test_suspicion_report_and_sql_translation():
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_exports(data_dir)
+        analyzer = SuspicionRankingAnalyzer(client=DuckDBClient(data_dir, database=':memory:'))
+        df = analyzer.analyze_data(analyzer.fetch_data())
+        assert 'classification_timestamp' not in df.columns
+        assert set(df.columns) >= set(analyzer.needed_columns())
+        assert isinstance(df['reason_category'].dtype, pd.CategoricalDtype)
+        assert isinstance(df['reason'].dtype, pd.StringDtype)
+        scores = dict(zip(df['reason'], df['suspicion_score']))
+        assert scores == {'theft': 0, 'AOA request': 100, 'other': 40}
+
+    sql = translate_sql(
+        "SELECT COUNTIF(x), TIMESTAMP_DIFF(CURRENT_TIMESTAMP(), t, SECOND) "
+        "FROM `p.FlockML.agency_locations` WHERE d >= DATE_SUB(CURRENT_DATE(), INTERVAL 7 DAY) AND id = @id"
+    )
+    assert sql == (
+        "SELECT count_if(x), date_diff('SECOND', t, CURRENT_TIMESTAMP) "
+        'FROM "FlockML"."agency_locations" WHERE d >= (CURRENT_DATE - INTERVAL 7 DAY) AND id = $id'
+    )
+    # Only parameter positions are rewritten, not '@' inside literals or comments
+    assert translate_sql("SELECT 'ops@agency.gov' AS a, @y, @@x -- by @z") == (
+        "SELECT 'ops@agency.gov' AS a, $y, @@x -- by @z"
+    )
+
+
+if __name__ == '__main__':
+    test_geocoder_runs_against_local_exports()
+    test_suspicion_report_and_sql_translation()
+    print('✓ All storage backend tests passed')
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tests for suspicion scoring (scoring_spec.ScoringSpec and
+SuspicionRankingAnalyzer.analyze_data).
+
+The vectorized path must match the row-wise reference exactly, including
+nulls, whitespace, case variants and missing columns, and the generated SQL
+view must score the same as Python and match sql/27. Pushdown, streaming and
+all-datasets reports must match the in-memory report.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_suspicion_scoring import make_synthetic_searches
+from scoring_spec import ScoringSpec
+from suspicion_ranking_report import SuspicionRankingAnalyzer
+
+SPEC = ScoringSpec.load()
+
+
+def assert_same_scores(df):
+    analyzer = SuspicionRankingAnalyzer(client=object())
+    vectorized = analyzer.analyze_data(df.copy())
+    rowwise = analyzer.analyze_data_rowwise(df.copy())
+    pd.testing.assert_frame_equal(vectorized, rowwise)
+    return vectorized
+
+
+def test_vectorized_matches_rowwise():
+    df = make_synthetic_searches(20_000, seed=7)
+    # Float NaN column values and pandas nullable booleans
+    df.loc[::11, 'reason'] = np.nan
+    df['is_participating_agency'] = df['is_participating_agency'].astype('boolean')
+    scored = assert_same_scores(df)
+    assert scored['suspicion_score'].dtype == np.int64
+    # Every combination of factors shows up in 20k rows
+    assert scored['suspicion_score'].nunique() == len(set(SPEC.scores))
+
+    scored = assert_same_scores(pd.DataFrame({
+        'case_num': ['  ', 'REDACTED', '24-1', None, 'Null'],
+        'reason': ['x', 'AOA', None, 'Aoa', 'x'],
+        'reason_category': [' OTHER ', 'interagency ', None, 'Property', 'other'],
+        'reason_bucket': ['Valid_Reason', None, 'Case_Number', ' OTHER', 'Valid_Reason'],
+        'is_participating_agency': [True, False, None, True, 1],
+    }))
+    assert list(scored['suspicion_score']) == [80, 20, 10, 100, 70]
+    assert scored['risk_factors'][2] == 'Invalid/ambiguous reason'
+
+
+def test_missing_columns_and_mask_tables():
+    df = pd.DataFrame({'org_name': ['A', 'B'], 'case_num': ['24-1', None]})
+    scored = assert_same_scores(df)
+    assert list(scored['risk_factors']) == ['None', 'No case number provided']
+
+    assert SPEC.scores[0b1111] == 100
+    assert SPEC.labels[0b0101] == 'Participating in ICE collaboration|AOA/Interagency reason'
+    assert [SPEC.level(score) for score in (0, 30, 31, 99, 100)] == [
+        'No Suspicion', 'Low Suspicion', 'Moderate Suspicion', 'High Suspicion', 'Very High Suspicion'
+    ]
+    with pytest.raises(ValueError):
+        ScoringSpec.from_dict({'factors': [{'name': 'x', 'points': 5, 'when': {'column': 'a', 'like': 'b'}}],
+                               'levels': [{'label': 'All'}]})
+
+
+def test_generated_sql_matches_python():
+    analyzer = SuspicionRankingAnalyzer(client=object())
+    assert not analyzer.write_view_sql(check=True), 'run: python suspicion_ranking_report.py --render-sql'
+
+    pytest.importorskip('duckdb')
+    from storage_backend import DuckDBClient
+
+    df = make_synthetic_searches(5_000, seed=3)
+    client = DuckDBClient(database=':memory:')
+    client._conn.register('searches_df', df)
+    scored_sql = client.query(SPEC.scoring_query('SELECT * FROM searches_df')).to_dataframe()
+    scored = analyzer.analyze_data(df.copy())
+    assert list(scored_sql['suspicion_score']) == list(scored['suspicion_score'])
+    assert list(scored_sql['risk_factors']) == list(scored['risk_factors'])
+    assert list(scored_sql['suspicion_category']) == [SPEC.level(score) for score in scored['suspicion_score']]
+
+    # The view keeps its factor flags; they add up to the score
+    flagged = client.query(SPEC.scoring_query('SELECT * FROM searches_df', keep_flags=True)).to_dataframe()
+    points = sum(flagged[f'factor_{factor.name}'].astype(int) * factor.points for factor in SPEC.factors)
+    assert list(points.clip(upper=SPEC.max_score)) == list(scored['suspicion_score'])
+
+
+def test_pushdown_and_stream_reports_match_in_memory():
+    pytest.importorskip('duckdb')
+    from storage_backend import DuckDBClient
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        searches = make_synthetic_searches(4_000, seed=5)
+        searches['classification_timestamp'] = pd.Timestamp('2025-10-01')
+        matches = searches[['org_name']].drop_duplicates().iloc[::3].copy()
+        matches['is_participating_agency'] = True
+        matches['matched_agency'] = matches['org_name'].str.upper()
+        matches['matched_state'] = 'CO'
+        matches['matched_type'] = 'police'
+        searches = searches.drop(columns='is_participating_agency')
+        os.makedirs(os.path.join(data_dir, 'DurangoPD'))
+        os.makedirs(os.path.join(data_dir, 'FlockML'))
+        searches.to_parquet(os.path.join(data_dir, 'DurangoPD', 'October2025_classified.parquet'))
+        matches.to_parquet(os.path.join(data_dir, 'FlockML', 'org_name_rule_based_matches.parquet'))
+
+        reports = []
+        for mode in ('memory', 'pushdown', 'stream'):
+            analyzer = SuspicionRankingAnalyzer(client=DuckDBClient(data_dir, database=':memory:'))
+            output = os.path.join(data_dir, f'report_{mode}.md')
+            report = analyzer.run(output_file=output, pushdown=mode == 'pushdown',
+                                  stream=mode == 'stream', batch_size=700)
+            reports.append([line for line in report.splitlines() if 'Report Generated' not in line])
+        assert reports[0] == reports[1] == reports[2]
+        assert '**Total High-Risk Searches**' in '\n'.join(reports[1])
+        assert not os.path.exists(os.path.join(data_dir, 'report_pushdown_detailed_data.csv'))
+        # Batch-by-batch CSV appends match the single in-memory export
+        with open(os.path.join(data_dir, 'report_memory_detailed_data.csv')) as f:
+            expected = f.read()
+        with open(os.path.join(data_dir, 'report_stream_detailed_data.csv')) as f:
+            assert f.read() == expected
+
+
+def test_all_datasets_match_single_runs():
+    pytest.importorskip('duckdb')
+    from storage_backend import DuckDBClient
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.makedirs(os.path.join(data_dir, 'DurangoPD'))
+        os.makedirs(os.path.join(data_dir, 'FlockML'))
+        names = set()
+        for seed, table in enumerate(['October2025', 'September2025']):
+            searches = make_synthetic_searches(3_000, seed=seed).drop(columns='is_participating_agency')
+            searches['classification_timestamp'] = pd.Timestamp('2025-10-01')
+            searches.to_parquet(os.path.join(data_dir, 'DurangoPD', f'{table}_classified.parquet'))
+            names.update(searches['org_name'].dropna())
+        matches = pd.DataFrame({'org_name': sorted(names)[::3]})
+        matches['is_participating_agency'] = True
+        matches['matched_agency'] = matches['org_name'].str.upper()
+        matches['matched_state'] = 'CO'
+        matches['matched_type'] = 'police'
+        matches.to_parquet(os.path.join(data_dir, 'FlockML', 'org_name_rule_based_matches.parquet'))
+        pd.DataFrame({
+            'config_id': ['durango-oct-2025', 'durango-sep-2025', 'durango-old'],
+            'dataset_project': 'durango-deflock',
+            'dataset_name': 'DurangoPD',
+            'source_table_name': ['October2025', 'September2025', 'June2024'],
+            'enabled': [True, True, False],
+            'priority': [1, 10, 2],
+            'output_dataset_name': pd.Series([None] * 3, dtype='string'),
+            'output_suffix': '_classified',
+            'description': ['Durango PD October 2025', 'Durango PD September 2025', None],
+        }).to_parquet(os.path.join(data_dir, 'FlockML', 'dataset_pipeline_config.parquet'))
+
+        analyzer = SuspicionRankingAnalyzer(client=DuckDBClient(data_dir, database=':memory:'))
+        single = analyzer.run(output_file=os.path.join(data_dir, 'october.md'))
+        output_dir = os.path.join(data_dir, 'reports')
+        paths = analyzer.run_all(output_dir=output_dir, batch_size=1_000, workers=2)
+        assert sorted(paths) == ['durango-oct-2025', 'durango-sep-2025', 'rank_comparison']
+
+        with open(paths['durango-oct-2025']) as f:
+            batch = f.read()
+        assert ([line for line in batch.splitlines() if 'Report Generated' not in line]
+                == [line for line in single.splitlines() if 'Report Generated' not in line])
+        # Same rows; scan order may differ between the two queries
+        with open(os.path.join(data_dir, 'october_detailed_data.csv')) as a, \
+                open(os.path.join(output_dir, 'durango-oct-2025_Suspicion_Report_detailed_data.csv')) as b:
+            assert sorted(a) == sorted(b)
+        with open(paths['durango-sep-2025']) as f:
+            assert '**Data Period**: September 2025' in f.read()
+
+        ranks = pd.read_csv(os.path.join(output_dir, 'Agency_Rank_Over_Time.csv'))
+        # Chronological, and each dataset ranks 1..n
+        assert list(ranks['dataset_id'].unique()) == ['durango-sep-2025', 'durango-oct-2025']
+        for _, group in ranks.groupby('dataset_id'):
+            assert list(group['rank']) == list(range(1, len(group) + 1))
+            assert group['high_risk_searches'].is_monotonic_decreasing
+        with open(paths['rank_comparison']) as f:
+            assert '| Agency | September 2025 | October 2025 | High-Risk Searches |' in f.read()
+
+
+if __name__ == '__main__':
+    test_vectorized_matches_rowwise()
+    test_missing_columns_and_mask_tables()
+    test_generated_sql_matches_python()
+    test_pushdown_and_stream_reports_match_in_memory()
+    test_all_datasets_match_single_runs()
+    print('✓ All suspicion scoring tests passed')